@@ -0,0 +1,45 @@
+"""List filter indexes
+
+Revision ID: 3f7a2c9d1b64
+Revises: 8c1f4e6b2a90
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7a2c9d1b64'
+down_revision: Union[str, None] = '8c1f4e6b2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Индексы фильтров и сортировок списков: название, таблица, столбцы, классы операторов
+INDEXES = (
+    ('ix_products_price_id', 'products', ['price', 'id'], None),
+    ('ix_products_created_ad_id', 'products', ['created_ad', 'id'], None),
+    ('ix_products_name_pattern', 'products', ['name'], {'name': 'text_pattern_ops'}),
+    ('ix_users_created_ad_id', 'users', ['created_ad', 'id'], None),
+    ('ix_users_first_name_pattern', 'users', ['first_name'], {'first_name': 'text_pattern_ops'}),
+    ('ix_users_last_name_pattern', 'users', ['last_name'], {'last_name': 'text_pattern_ops'}),
+    ('ix_orders_created_ad_id', 'orders', ['created_ad', 'id'], None),
+)
+
+
+def upgrade() -> None:
+    # Индексы создаются без блокировки записи в таблицы
+    with op.get_context().autocommit_block():
+        for name, table, columns, ops in INDEXES:
+            op.create_index(
+                name, table, columns, postgresql_ops=ops or {},
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,62 @@
+"""Orders filter indexes
+
+Revision ID: 5d2e9c41a7f3
+Revises: b2066cd8c550
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e9c41a7f3'
+down_revision: Union[str, None] = 'b2066cd8c550'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Индексы создаются и удаляются CONCURRENTLY, чтобы не блокировать запись в таблицы.
+# Такие команды нельзя выполнять внутри транзакции, поэтому используется autocommit_block.
+ORDERS_INDEXES = [
+    ('ix_orders_user_id_id', ['user_id', 'id']),
+    ('ix_orders_product_id_id', ['product_id', 'id']),
+    ('ix_orders_status_id', ['status', 'id']),
+    ('ix_orders_order_date', ['order_date']),
+    ('ix_orders_status_order_date', ['status', 'order_date']),
+]
+
+# Индексы по первичным ключам дублируют индексы ограничений PRIMARY KEY
+REDUNDANT_INDEXES = [
+    ('ix_orders_id', 'orders'),
+    ('ix_products_id', 'products'),
+    ('ix_users_id', 'users'),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns in ORDERS_INDEXES:
+            op.create_index(
+                name, 'orders', columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+        for name, table in REDUNDANT_INDEXES:
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in REDUNDANT_INDEXES:
+            op.create_index(
+                name, table, ['id'], unique=False,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+        for name, _ in reversed(ORDERS_INDEXES):
+            op.drop_index(
+                name, table_name='orders', postgresql_concurrently=True, if_exists=True,
+            )
@@ -0,0 +1,57 @@
+"""Products name unique
+
+Revision ID: 8c1f4e6b2a90
+Revises: 5d2e9c41a7f3
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1f4e6b2a90'
+down_revision: Union[str, None] = '5d2e9c41a7f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Повторяющиеся названия товаров (кроме первого по id) дополняются id товара:
+    # записи не удаляются, так как на них могут ссылаться заказы
+    op.execute(
+        """
+        UPDATE products SET name = products.name || ' (' || products.id || ')'
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY name ORDER BY id) AS position
+            FROM products WHERE name IS NOT NULL
+        ) AS duplicates
+        WHERE products.id = duplicates.id AND duplicates.position > 1
+        """
+    )
+    # Уникальный индекс создается рядом с существующим и заменяет его,
+    # поэтому таблица не остается без индекса по названию.
+    # autocommit_block фиксирует предыдущие изменения перед командами CONCURRENTLY.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_name_unique', 'products', ['name'], unique=True,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_products_name', table_name='products', postgresql_concurrently=True, if_exists=True,
+        )
+        op.execute('ALTER INDEX ix_products_name_unique RENAME TO ix_products_name')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_name_plain', 'products', ['name'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_products_name', table_name='products', postgresql_concurrently=True, if_exists=True,
+        )
+        op.execute('ALTER INDEX ix_products_name_plain RENAME TO ix_products_name')
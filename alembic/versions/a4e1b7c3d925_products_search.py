@@ -0,0 +1,51 @@
+"""Products search
+
+Revision ID: a4e1b7c3d925
+Revises: 3f7a2c9d1b64
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e1b7c3d925'
+down_revision: Union[str, None] = '3f7a2c9d1b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # Расширение для поиска по сходству триграмм (входит в contrib, есть в образе postgres)
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Добавление вычисляемого столбца перезаписывает таблицу под эксклюзивной блокировкой
+    op.add_column(
+        'products',
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_search_vector', 'products', ['search_vector'], postgresql_using='gin',
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_products_name_trgm', 'products', ['name'], postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'}, postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_products_name_trgm', table_name='products', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_products_search_vector', table_name='products', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('products', 'search_vector')
+    # Расширение pg_trgm не удаляется: его могут использовать другие объекты базы данных
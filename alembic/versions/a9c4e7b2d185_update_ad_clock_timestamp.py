@@ -0,0 +1,38 @@
+"""Update_ad from clock_timestamp
+
+Revision ID: a9c4e7b2d185
+Revises: d8f3a1c6b527
+Create Date: 2026-10-19 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c4e7b2d185'
+down_revision: Union[str, None] = 'd8f3a1c6b527'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _set_update_ad(now: str) -> str:
+    return f"""
+    CREATE OR REPLACE FUNCTION set_update_ad() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.update_ad := timezone('utc', {now});
+        RETURN NEW;
+    END
+    $$"""
+
+
+def upgrade() -> None:
+    # now() - время начала транзакции: изменение записи долгой транзакцией, зафиксированное
+    # после более позднего изменения, получало бы меньшее время. clock_timestamp() - время
+    # самого изменения, поэтому время изменения записи не уменьшается.
+    op.execute(_set_update_ad("clock_timestamp()"))
+
+
+def downgrade() -> None:
+    op.execute(_set_update_ad("now()"))
@@ -0,0 +1,36 @@
+"""Created_ad not null
+
+Revision ID: b5d8e2f9c614
+Revises: f4a9c2d7e1b3
+Create Date: 2026-10-18 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d8e2f9c614'
+down_revision: Union[str, None] = 'f4a9c2d7e1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('users', 'products', 'orders')
+
+
+def upgrade() -> None:
+    # Записи без времени добавления (импорт через COPY до появления значения по умолчанию)
+    # получают время последнего изменения
+    for table in TABLES:
+        op.execute(
+            f"UPDATE {table} SET created_ad = coalesce(update_ad, timezone('utc', now())) "
+            f"WHERE created_ad IS NULL"
+        )
+        op.alter_column(table, 'created_ad', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.alter_column(table, 'created_ad', existing_type=sa.DateTime(), nullable=True)
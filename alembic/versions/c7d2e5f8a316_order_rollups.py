@@ -0,0 +1,107 @@
+"""Order rollups
+
+Revision ID: c7d2e5f8a316
+Revises: a4e1b7c3d925
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e5f8a316'
+down_revision: Union[str, None] = 'a4e1b7c3d925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ORDER_DAY = "coalesce(order_date, created_ad)::date"
+
+# Сводные таблицы и столбец заказа, по которому они группируются
+ROLLUPS = (
+    ('order_rollup_products', 'product_id'),
+    ('order_rollup_users', 'user_id'),
+)
+
+# Строки, измененные командой (таблицы переходов триггера), и их вклад в количество заказов
+CHANGES = {
+    'INSERT': (('new_rows', 1),),
+    'UPDATE': (('new_rows', 1), ('old_rows', -1)),
+    'DELETE': (('old_rows', -1),),
+}
+
+
+def _apply_changes(table: str, key: str, sources) -> str:
+    """Команда, добавляющая к строкам сводной таблицы изменение количества заказов."""
+    changes = " UNION ALL ".join(
+        f"SELECT {ORDER_DAY} AS day, {key}, status, {delta} AS delta FROM {rows}"
+        for rows, delta in sources
+    )
+    # Строки обновляются в порядке ключа: одновременные команды не блокируют друг друга взаимно
+    return f"""
+        INSERT INTO {table} AS rollup (day, {key}, status, orders_count)
+        SELECT day, {key}, status, sum(delta) FROM ({changes}) AS changes
+        GROUP BY day, {key}, status
+        HAVING sum(delta) <> 0
+        ORDER BY day, {key}, status
+        ON CONFLICT (day, {key}, status)
+        DO UPDATE SET orders_count = rollup.orders_count + excluded.orders_count;"""
+
+
+def _trigger_function() -> str:
+    branches = []
+    for operation, sources in CHANGES.items():
+        statements = "".join(_apply_changes(table, key, sources) for table, key in ROLLUPS)
+        branches.append(f"IF TG_OP = '{operation}' THEN{statements}\n    END IF;")
+    return f"""
+    CREATE FUNCTION orders_rollup() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+    {chr(10).join('    ' + branch for branch in branches)}
+        RETURN NULL;
+    END
+    $$"""
+
+
+def upgrade() -> None:
+    for table, key in ROLLUPS:
+        op.create_table(
+            table,
+            sa.Column('day', sa.Date()),
+            sa.Column(key, sa.Integer()),
+            sa.Column('status', sa.String()),
+            sa.Column('orders_count', sa.Integer(), nullable=False, server_default='0'),
+        )
+        op.create_index(
+            f'ux_{table}_key', table, ['day', key, 'status'], unique=True, postgresql_nulls_not_distinct=True,
+        )
+
+    # Триггеры уровня команды: пакетная операция или импорт обновляют сводные таблицы
+    # одной командой на таблицу, а не на каждую строку заказа
+    op.execute(_trigger_function())
+    for operation, sources in CHANGES.items():
+        referencing = " ".join(
+            f"{'NEW' if rows == 'new_rows' else 'OLD'} TABLE AS {rows}" for rows, _ in sources
+        )
+        op.execute(
+            f"CREATE TRIGGER orders_rollup_{operation.lower()} AFTER {operation} ON orders "
+            f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION orders_rollup()"
+        )
+
+    # Начальное заполнение: заказы не изменяются до завершения миграции
+    op.execute("LOCK TABLE orders IN SHARE MODE")
+    for table, key in ROLLUPS:
+        op.execute(
+            f"INSERT INTO {table} (day, {key}, status, orders_count) "
+            f"SELECT {ORDER_DAY}, {key}, status, count(*) FROM orders GROUP BY 1, 2, 3"
+        )
+
+
+def downgrade() -> None:
+    for operation in reversed(CHANGES):
+        op.execute(f"DROP TRIGGER IF EXISTS orders_rollup_{operation.lower()} ON orders")
+    op.execute("DROP FUNCTION IF EXISTS orders_rollup()")
+    for table, _ in reversed(ROLLUPS):
+        op.drop_index(f'ux_{table}_key', table_name=table)
+        op.drop_table(table)
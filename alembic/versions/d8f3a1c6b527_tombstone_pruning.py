@@ -0,0 +1,31 @@
+"""Tombstone pruning horizons
+
+Revision ID: d8f3a1c6b527
+Revises: b5d8e2f9c614
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f3a1c6b527'
+down_revision: Union[str, None] = 'b5d8e2f9c614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'deleted_records_pruned',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('change_xid', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('deleted_records_pruned')
@@ -0,0 +1,52 @@
+"""Database timestamps
+
+Revision ID: e3b8f1a6c472
+Revises: c7d2e5f8a316
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b8f1a6c472'
+down_revision: Union[str, None] = 'c7d2e5f8a316'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('users', 'products', 'orders')
+UTC_NOW = "timezone('utc', now())"
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.alter_column(table, 'created_ad', server_default=sa.text(UTC_NOW))
+        # Записи, которые не изменялись, получают время изменения, равное времени добавления
+        op.execute(f"UPDATE {table} SET update_ad = coalesce(created_ad, {UTC_NOW}) WHERE update_ad IS NULL")
+        op.alter_column(table, 'update_ad', server_default=sa.text(UTC_NOW), nullable=False)
+
+    # Время изменения устанавливается при любом UPDATE, в том числе в обход репозиториев
+    op.execute(f"""
+    CREATE FUNCTION set_update_ad() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.update_ad := {UTC_NOW};
+        RETURN NEW;
+    END
+    $$""")
+    for table in TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_set_update_ad BEFORE UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION set_update_ad()"
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_set_update_ad ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS set_update_ad()")
+    for table in reversed(TABLES):
+        op.alter_column(table, 'update_ad', server_default=None, nullable=True)
+        op.alter_column(table, 'created_ad', server_default=None)
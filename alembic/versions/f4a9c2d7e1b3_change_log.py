@@ -0,0 +1,88 @@
+"""Change log for delta sync
+
+Revision ID: f4a9c2d7e1b3
+Revises: e3b8f1a6c472
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a9c2d7e1b3'
+down_revision: Union[str, None] = 'e3b8f1a6c472'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('users', 'products', 'orders')
+CURRENT_XID = "pg_current_xact_id()::text::bigint"
+
+
+def upgrade() -> None:
+    # Столбец с постоянным значением по умолчанию добавляется без перезаписи таблицы.
+    # Существующие записи получают номер 0 и выдаются при первой синхронизации.
+    for table in TABLES:
+        op.add_column(table, sa.Column('change_xid', sa.BigInteger(), nullable=False, server_default='0'))
+
+    op.create_table(
+        'deleted_records',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('record_id', sa.Integer(), nullable=False),
+        sa.Column('change_xid', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_ad', sa.DateTime(), nullable=False, server_default=sa.text("timezone('utc', now())")),
+    )
+    op.create_index(
+        'ix_deleted_records_table_name_change_xid', 'deleted_records', ['table_name', 'change_xid', 'record_id'],
+    )
+
+    op.execute(f"""
+    CREATE FUNCTION track_change() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.change_xid := {CURRENT_XID};
+        RETURN NEW;
+    END
+    $$""")
+    # Удаленные строки оставляют запись в журнале (одной командой на команду DELETE)
+    op.execute(f"""
+    CREATE FUNCTION record_deletes() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO deleted_records (table_name, record_id, change_xid)
+        SELECT TG_TABLE_NAME, id, {CURRENT_XID} FROM old_rows;
+        RETURN NULL;
+    END
+    $$""")
+    for table in TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_track_change BEFORE INSERT OR UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION track_change()"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_record_deletes AFTER DELETE ON {table} "
+            f"REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION record_deletes()"
+        )
+
+    # Индексы создаются без блокировки записи в таблицы
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(
+                f'ix_{table}_change_xid_id', table, ['change_xid', 'id'],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in reversed(TABLES):
+            op.drop_index(f'ix_{table}_change_xid_id', table_name=table, postgresql_concurrently=True, if_exists=True)
+    for table in reversed(TABLES):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_record_deletes ON {table}")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_track_change ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS record_deletes()")
+    op.execute("DROP FUNCTION IF EXISTS track_change()")
+    op.drop_index('ix_deleted_records_table_name_change_xid', table_name='deleted_records')
+    op.drop_table('deleted_records')
+    for table in reversed(TABLES):
+        op.drop_column(table, 'change_xid')
@@ -0,0 +1,125 @@
+"""Команды обслуживания приложения.
+
+Пример использования:
+
+```
+python -m app.cli import products catalog.csv
+python -m app.cli check-indexes
+python -m app.cli rebuild-rollups
+python -m app.cli prune-tombstones --days 30
+python -m app.cli profile-header /api/v1/orders/
+```
+"""
+import argparse
+import asyncio
+import datetime
+import sys
+import time
+
+from app.core.csv_import import import_csv
+from app.core.database.changes import prune_tombstones
+from app.core.database.database import dispose_engine, init_engine
+from app.core.database.explain import find_full_scans
+from app.core.profiler import sign_profile_request
+from app.modules.analytics.repository import AnalyticsRepository
+from app.modules.orders.repository import OrderRepository
+from app.modules.orders.schemas import OrderCreate
+from app.modules.products.repository import ProductRepository
+from app.modules.products.schemas import ProductCreate
+from app.modules.users.repository import UserRepository
+from app.modules.users.schemas import UserImport
+
+# Таблицы, доступные для импорта: репозиторий и схема проверки строк
+IMPORTS = {
+    "users": (UserRepository, UserImport),
+    "products": (ProductRepository, ProductCreate),
+    "orders": (OrderRepository, OrderCreate),
+}
+
+
+async def import_command(args: argparse.Namespace) -> None:
+    """Импортировать CSV-файл в таблицу через COPY."""
+    repository, schema = IMPORTS[args.table]
+    with open(args.path, "rb") as file:
+        result = await import_csv(repository, schema, file)
+    print(f"Добавлено: {result['inserted']}, пропущено: {result['skipped']}")
+
+
+async def check_indexes_command(args: argparse.Namespace) -> None:
+    """Проверить, что запросы репозиториев с фильтрами используют индексы."""
+    problems = await find_full_scans([repository for repository, _ in IMPORTS.values()])
+    for problem in problems:
+        print(problem)
+    if problems:
+        sys.exit(1)
+    print("Все запросы с фильтрами используют индексы")
+
+
+async def rebuild_rollups_command(args: argparse.Namespace) -> None:
+    """Пересчитать сводные таблицы аналитики по заказам."""
+    counts = await AnalyticsRepository.rebuild()
+    for table, rows in counts.items():
+        print(f"{table}: {rows} строк")
+
+
+async def prune_tombstones_command(args: argparse.Namespace) -> None:
+    """Удалить записи об удаленных строках старше срока хранения."""
+    retention = datetime.timedelta(days=args.days) if args.days is not None else None
+    print(f"Удалено записей: {await prune_tombstones(retention)}")
+
+
+async def profile_header_command(args: argparse.Namespace) -> None:
+    """Вывести заголовок для профилирования запросов к пути."""
+    expires = int(time.time()) + args.ttl
+    print(f"X-Profile: {sign_profile_request(args.path, expires)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Импорт CSV-файла через COPY")
+    import_parser.add_argument("table", choices=IMPORTS)
+    import_parser.add_argument("path", help="Путь к CSV-файлу")
+    import_parser.set_defaults(handler=import_command)
+
+    check_parser = commands.add_parser(
+        "check-indexes", help="Проверка, что запросы с фильтрами используют индексы"
+    )
+    check_parser.set_defaults(handler=check_indexes_command)
+
+    rebuild_parser = commands.add_parser(
+        "rebuild-rollups", help="Пересчет сводных таблиц аналитики по заказам"
+    )
+    rebuild_parser.set_defaults(handler=rebuild_rollups_command)
+
+    prune_parser = commands.add_parser(
+        "prune-tombstones", help="Очистка журнала удалений старше срока хранения"
+    )
+    prune_parser.add_argument(
+        "--days", type=int, help="Срок хранения в днях (по умолчанию CHANGES_TOMBSTONE_RETENTION_DAYS)"
+    )
+    prune_parser.set_defaults(handler=prune_tombstones_command)
+
+    profile_parser = commands.add_parser(
+        "profile-header", help="Подписанный заголовок X-Profile для профилирования запросов"
+    )
+    profile_parser.add_argument("path", help="Путь запроса, например /api/v1/orders/")
+    profile_parser.add_argument("--ttl", type=int, default=3600, help="Срок действия в секундах")
+    profile_parser.set_defaults(handler=profile_header_command)
+
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Выполнить команду с движком базы данных текущего процесса."""
+    init_engine()
+    try:
+        await args.handler(args)
+    finally:
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from app.core.config.config import settings
+
+
+class CacheBackend:
+    """Базовый класс хранилища кэша.
+
+    Хранит значения в виде байтов (сериализованные pydantic-схемы) с временем жизни.
+    """
+
+    async def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        """Увеличить числовое значение ключа на единицу (ключ без времени жизни)."""
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """Кэш в памяти процесса с вытеснением давно неиспользуемых записей.
+
+    Не требует внешних сервисов, но у каждого воркера свой экземпляр.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        # Счетчики (версии таблиц) хранятся отдельно и не вытесняются
+        self._counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        if key in self._counters:
+            return str(self._counters[key]).encode()
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+            self._counters.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+class RedisCache(CacheBackend):
+    """Кэш в Redis, общий для всех воркеров и экземпляров приложения.
+
+    Счетчики версий таблиц хранятся без времени жизни, поэтому Redis следует
+    настроить с политикой вытеснения volatile-* (вытесняются только ключи с TTL).
+    """
+
+    def __init__(self, host: str, port: int, db: int = 0):
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError(
+                "Для CACHE_BACKEND=redis установите пакет redis (poetry install -E redis)"
+            ) from None
+        self._client = redis.Redis(host=host, port=port, db=db)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self._client.set(key, value, ex=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._client.delete(*keys)
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+
+@lru_cache
+def get_cache() -> CacheBackend | None:
+    """Получить хранилище кэша, выбранное в настройках (None, если кэш отключен)."""
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryCache(settings.CACHE_MAX_ENTRIES)
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(settings.REDIS_HOST, settings.REDIS_PORT, settings.REDIS_DB)
+    return None
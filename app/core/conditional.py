@@ -0,0 +1,95 @@
+"""Условные GET-запросы (If-None-Match / If-Modified-Since) и ответ 304.
+
+Валидаторы ответа строятся по версии данных репозитория
+(`BaseRepository.version`): количеству записей, наибольшему `update_ad` и
+сумме `change_xid`. Столбцы поддерживаются базой данных (значения по умолчанию
+и триггеры), поэтому любое добавление, изменение или удаление записей меняет
+версию, в том числе изменение транзакцией, зафиксированной позже более новой. Проверка версии - один агрегатный запрос без чтения
+и сериализации записей, при совпадении клиент получает пустой ответ 304.
+
+Пример использования:
+
+```python
+@router.get("/")
+async def read_items(request: Request):
+    headers = validators(await ItemRepository.version())
+    if not_modified(request, headers):
+        return not_modified_response(headers)
+    response = await paginate_response(ItemRepository, Item)
+    response.headers.update(headers)
+    return response
+```
+"""
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Ответ можно сохранить, но перед использованием клиент должен проверить его актуальность
+CACHE_CONTROL = "no-cache"
+
+
+def _utc(value: datetime.datetime) -> datetime.datetime:
+    """Время в UTC (время без часового пояса в базе данных хранится в UTC)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+
+def validators(*versions: tuple, last_modified: bool = False) -> dict[str, str]:
+    """Заголовки-валидаторы ответа по версиям данных.
+
+    Args:
+        versions (tuple): Версии данных (`BaseRepository.version`) всех
+            таблиц, из которых сформирован ответ.
+        last_modified (bool): Добавить заголовок Last-Modified. Подходит только
+            для одной записи: удаление записи из списка не увеличивает
+            наибольшее время изменения, его отражает только ETag.
+
+    Returns:
+        dict[str, str]: Заголовки ETag (слабый), Cache-Control и, при необходимости, Last-Modified.
+    """
+    digest = hashlib.sha1(repr(versions).encode()).hexdigest()[:20]
+    headers = {"ETag": f'W/"{digest}"', "Cache-Control": CACHE_CONTROL}
+    if last_modified:
+        modified = [version[1] for version in versions if version[1] is not None]
+        if modified:
+            headers["Last-Modified"] = format_datetime(_utc(max(modified)).replace(microsecond=0), usegmt=True)
+    return headers
+
+
+def _opaque(etag: str) -> str:
+    """Значение ETag без признака слабого валидатора (для слабого сравнения)."""
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def not_modified(request: Request, headers: dict[str, str]) -> bool:
+    """Проверить, что у клиента актуальная версия ответа.
+
+    Если запрос содержит If-None-Match, сравниваются ETag (слабое сравнение),
+    If-Modified-Since в этом случае не учитывается (RFC 9110, 13.2.2).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        etag = _opaque(headers["ETag"])
+        return any(_opaque(value) == etag for value in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("Last-Modified")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return parsedate_to_datetime(last_modified) <= _utc(since)
+
+
+def not_modified_response(headers: dict[str, str]) -> Response:
+    """Ответ 304 Not Modified с заголовками-валидаторами."""
+    return Response(status_code=304, headers=headers)
@@ -42,6 +42,27 @@ def parse_cors(v: Any) -> list[str] | str:
     raise ValueError(v)
 
 
+def parse_hosts(v: Any) -> list[str]:
+    """
+    Парсит список хостов из строки через запятую или списка.
+
+    Args:
+        v: Значение для парсинга (строка `host1,host2:5433` или список).
+
+    Returns:
+        Список хостов без пробелов и пустых элементов.
+
+    Raises:
+        ValueError: Если значение не является строкой или списком.
+    """
+
+    if isinstance(v, str):
+        v = v.split(",")
+    if isinstance(v, list):
+        return [host.strip() for host in v if host.strip()]
+    raise ValueError(v)
+
+
 class Settings(BaseSettings):
     """
     Класс конфигурации приложения.
@@ -57,10 +78,35 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"  # Версия API (строка)
     SECRET_KEY: str = secrets.token_urlsafe(32)  # Секретный ключ (генерируется автоматически)
     REDIS_HOST: str = 'localhost'
+    REDIS_PORT: int = 6379  # Порт Redis
+    REDIS_DB: int = 0  # Номер базы данных Redis
+
+    # Кэш чтения репозиториев: none - отключен, memory - в памяти процесса, redis - общий в Redis
+    CACHE_BACKEND: Literal["none", "memory", "redis"] = "none"
+    CACHE_TTL: int = 60  # Время жизни записей кэша в секундах
+    CACHE_MAX_ENTRIES: int = 10_000  # Максимальное количество записей кэша в памяти процесса
+
+    # Объединение одинаковых одновременных чтений репозиториев (single-flight)
+    SINGLEFLIGHT_ENABLED: bool = True
+    SINGLEFLIGHT_TTL: float = 0  # Сколько секунд отдавать результат завершенного чтения (0 - не отдавать)
+
+    # Хэширование паролей scrypt (см. app/modules/users/security.py): параметры стоимости
+    # и количество потоков, в которых вычисляются хэши
+    PASSWORD_SCRYPT_N: int = 2 ** 14  # Стоимость по памяти и времени (степень двойки)
+    PASSWORD_SCRYPT_R: int = 8  # Размер блока
+    PASSWORD_SCRYPT_P: int = 1  # Параллелизм
+    # Наибольшие параметры стоимости сохраненного хэша: хэш с большими параметрами не проверяется
+    PASSWORD_SCRYPT_MAX_N: int = 2 ** 17
+    PASSWORD_SCRYPT_MAX_R: int = 16
+    PASSWORD_SCRYPT_MAX_P: int = 4
+    PASSWORD_HASH_WORKERS: int = 2  # Потоков хэширования в воркере
 
     # Время жизни токена доступа в минутах (8 дней)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
 
+    # Каталог отчетов профилирования запросов (см. app/core/profiler.py), не задан - профилирование отключено
+    PROFILER_DIR: str | None = None
+
     DOMAIN: str = "localhost"  # Домен приложения
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"  # Окружение (local, staging, production)
 
@@ -90,6 +136,56 @@ class Settings(BaseSettings):
     POSTGRES_USER: str  # Пользователь базы данных PostgreSQL
     POSTGRES_PASSWORD: str  # Пароль пользователя базы данных PostgreSQL
     POSTGRES_DB: str = ""  # База данных PostgreSQL
+    # Реплики для чтения: хосты через запятую, с необязательным портом (replica1,replica2:5433)
+    POSTGRES_REPLICAS: Annotated[list[str] | str, BeforeValidator(parse_hosts)] = []
+    DB_REPLICA_CHECK_INTERVAL: float = 5  # Период проверки доступности реплик в секундах
+
+    # Пул соединений с базой данных. Пул создается в каждом воркере gunicorn,
+    # поэтому общее число соединений равно размеру пула, умноженному на число воркеров.
+    # У основного сервера и каждой реплики свой пул, бюджет соединений действует для каждого сервера.
+    DB_MAX_CONNECTIONS: int = 80  # Бюджет соединений приложения с одним сервером (меньше max_connections PostgreSQL)
+    DB_POOL_SIZE: int | None = None  # Размер пула воркера (по умолчанию из бюджета соединений)
+    DB_MAX_OVERFLOW: int = 0  # Дополнительные соединения сверх размера пула (входят в бюджет)
+    DB_POOL_TIMEOUT: float = 30  # Время ожидания свободного соединения в секундах
+    DB_POOL_RECYCLE: int = 1800  # Время жизни соединения в секундах
+    DB_POOL_PRE_PING: bool = True  # Проверка соединения перед выдачей из пула
+    WEB_CONCURRENCY: int = 1  # Количество воркеров (выставляется gunicorn_conf.py)
+    # Соединения, открываемые и прогреваемые при запуске воркера (по умолчанию весь пул, 0 - без прогрева)
+    DB_WARMUP_CONNECTIONS: int | None = None
+    # Срок хранения записей об удаленных строках для синхронизации клиентов (см. app/core/database/changes.py)
+    CHANGES_TOMBSTONE_RETENTION_DAYS: int = 30
+
+    @computed_field  # Поле, вычисляемое автоматически
+    @property
+    def db_pool_size(self) -> int:
+        """
+        Возвращает размер пула соединений одного воркера.
+
+        Если DB_POOL_SIZE не задан, бюджет соединений делится между воркерами
+        с учетом дополнительных соединений (DB_MAX_OVERFLOW). Если бюджета не
+        хватает даже на одно соединение воркера, он будет превышен
+        (см. `db_connections_per_server`).
+
+        Returns:
+            Размер пула соединений (не меньше 1).
+        """
+
+        if self.DB_POOL_SIZE:
+            return self.DB_POOL_SIZE
+        per_worker = self.DB_MAX_CONNECTIONS // max(self.WEB_CONCURRENCY, 1)
+        return max(per_worker - self.DB_MAX_OVERFLOW, 1)
+
+    @computed_field  # Поле, вычисляемое автоматически
+    @property
+    def db_connections_per_server(self) -> int:
+        """
+        Возвращает наибольшее число соединений всех воркеров с одним сервером.
+
+        Returns:
+            Размер пула и дополнительные соединения, умноженные на число воркеров.
+        """
+
+        return max(self.WEB_CONCURRENCY, 1) * (self.db_pool_size + self.DB_MAX_OVERFLOW)
 
     @computed_field  # Поле, вычисляемое автоматически
     @property
@@ -110,5 +206,30 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    @computed_field  # Поле, вычисляемое автоматически
+    @property
+    def replica_database_uris(self) -> list[str]:
+        """
+        Возвращает строки подключения к репликам PostgreSQL.
+
+        Пользователь, пароль и база данных реплик совпадают с основным сервером.
+
+        Returns:
+            Список строк подключения (пустой, если реплики не заданы).
+        """
+
+        uris = []
+        for replica in self.POSTGRES_REPLICAS:
+            host, _, port = replica.partition(":")
+            uris.append(str(MultiHostUrl.build(
+                scheme="postgresql+asyncpg",
+                username=self.POSTGRES_USER,
+                password=self.POSTGRES_PASSWORD,
+                host=host,
+                port=int(port) if port else self.POSTGRES_PORT,
+                path=self.POSTGRES_DB,
+            )))
+        return uris
+
 
 settings = Settings()  # type: ignore
\ No newline at end of file
@@ -0,0 +1,71 @@
+import asyncio
+import csv
+import io
+import itertools
+from typing import IO
+
+from pydantic import BaseModel, ValidationError
+
+
+class CsvRecords:
+    """Записи CSV-файла, проверенные pydantic-схемой.
+
+    Асинхронная итерация отдает части записей - списки кортежей значений в
+    порядке `columns` (поля схемы) - и подходит для передачи в
+    `BaseRepository.copy_import`. Чтение файла и проверка схемой выполняются
+    в отдельном потоке частями по `chunk_size` строк и не блокируют цикл
+    событий. Строки, не прошедшие проверку схемы, пропускаются и учитываются
+    в `invalid`.
+    """
+
+    def __init__(self, file: IO[str], schema: type[BaseModel], chunk_size: int = 5000):
+        self.file = file
+        self.schema = schema
+        self.chunk_size = chunk_size
+        self.columns = list(schema.model_fields)
+        self.total = 0  # Количество прочитанных строк (без заголовка)
+        self.invalid = 0  # Количество строк, не прошедших проверку схемы
+
+    async def __aiter__(self):
+        reader = csv.DictReader(self.file)
+        while batch := await asyncio.to_thread(self._read_batch, reader):
+            yield batch
+
+    def _read_batch(self, reader: csv.DictReader) -> list[tuple] | None:
+        """Прочитать и проверить очередные `chunk_size` строк (None - файл прочитан)."""
+        rows = list(itertools.islice(reader, self.chunk_size))
+        if not rows:
+            return None
+        self.total += len(rows)
+        batch = []
+        for row in rows:
+            try:
+                item = self.schema.model_validate(row)
+            except ValidationError:
+                self.invalid += 1
+                continue
+            batch.append(tuple(getattr(item, name) for name in self.columns))
+        return batch
+
+
+async def import_csv(repository, schema: type[BaseModel], file: IO[bytes]) -> dict:
+    """Импортировать CSV-файл в таблицу репозитория через COPY.
+
+    Первая строка файла - заголовок с названиями полей схемы.
+
+    Args:
+        repository: Класс репозитория (наследник BaseRepository).
+        schema: Pydantic-схема создания записи, по которой проверяются строки.
+        file: Бинарный файл с данными в кодировке UTF-8.
+
+    Returns:
+        dict: Количество добавленных (`inserted`) и пропущенных (`skipped`) строк.
+    """
+    text_file = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        records = CsvRecords(text_file, schema)
+        inserted = await repository.copy_import(records, records.columns)
+    finally:
+        # Файл принадлежит вызывающему коду и не должен закрываться вместе с оберткой
+        text_file.detach()
+    return {"inserted": inserted, "skipped": records.total - inserted}
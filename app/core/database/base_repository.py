@@ -1,6 +1,186 @@
-from sqlalchemy import select, insert, delete, update
-
-from .database import async_session_maker
+import asyncio
+import contextlib
+import datetime
+import functools
+import hashlib
+import json
+import logging
+import secrets
+from collections import Counter
+from typing import Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy import (
+    select, insert, delete, update, func, exists, or_, text, table, column, any_, bindparam, literal_column,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.orm import joinedload, noload
+
+from app.core.cache import get_cache
+from app.core.config.config import settings
+from app.core.dataloader import BatchLoader
+from app.core.metrics import REPOSITORY_READS
+from app.core.singleflight import SingleFlight
+from .database import async_session_maker, current_session, on_commit, session_scope
+from .explain import SAMPLE_VALUES
+from .filters import DEFAULT_SORT, compile_filters, compile_sort
+
+logger = logging.getLogger(__name__)
+
+# Репозитории приложения (наследники BaseRepository с заданной моделью)
+# в порядке объявления. Используется при прогреве соединений (см. warmup.py).
+registry: list[type["BaseRepository"]] = []
+
+
+def _chunks(items: list, size: int):
+    """Разбить список на части не длиннее `size` элементов."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+@functools.lru_cache
+def _type_adapter(value_type) -> TypeAdapter:
+    """Получить (и запомнить) TypeAdapter для типа значения кэша."""
+    return TypeAdapter(value_type)
+
+
+def _instances(value, result: str) -> list:
+    """Экземпляры моделей в результате метода чтения (см. `cached`)."""
+    if result == "one":
+        return [] if value is None else [value]
+    if result == "list":
+        return value
+    if result == "page":
+        return value[0]
+    return []
+
+
+def _schema_copies(schema, value, result: str):
+    """Результат метода чтения, в котором записи заменены новыми экземплярами схемы.
+
+    Значения полей берутся из атрибутов записей без валидации (см. `dump_trusted`),
+    поэтому копирование дешевле проверки схемой. Экземпляры схемы не меняются.
+    """
+    def copy(item):
+        if item is None or isinstance(item, schema):
+            return item
+        return schema.model_construct(**{name: getattr(item, name) for name in schema.model_fields})
+
+    if result == "one":
+        return copy(value)
+    if result == "list":
+        return [copy(item) for item in value]
+    if result == "page":
+        return [copy(item) for item in value[0]], value[1]
+    return value
+
+
+def cached(result: str):
+    """Декоратор чтения через кэш для методов репозитория.
+
+    Если в настройках включен кэш (CACHE_BACKEND) и у репозитория задана схема
+    `schema`, результат метода сохраняется в кэше в виде сериализованной схемы и
+    возвращается из кэша до истечения `cache_ttl` или до изменения данных
+    (см. `BaseRepository._invalidate`). Метод репозитория со схемой всегда
+    возвращает экземпляры схемы: и из кэша, и без него (в том числе в сессии,
+    изменявшей данные), поэтому тип результата не зависит от настроек кэша.
+
+    Args:
+        result (str): Вид результата метода: "one" - запись или None,
+            "list" - список записей, "page" - список записей и курсор, "count" - число,
+            "version" - версия данных (см. `BaseRepository.version`).
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(cls, *args, **filters):
+            cache = cls._get_cache()
+            if cache is None:
+                value = await method(cls, *args, **filters)
+                return value if cls.schema is None else _schema_copies(cls.schema, value, result)
+
+            adapter = _type_adapter({
+                "one": Optional[cls.schema],
+                "list": list[cls.schema],
+                "page": tuple[list[cls.schema], Optional[int]],
+                "count": int,
+                "version": tuple[int, Optional[datetime.datetime], int],
+            }[result])
+            try:
+                key = await cls._cache_key(cache, method.__name__, args, filters)
+                value = await cache.get(key)
+            except Exception:
+                logger.exception("Ошибка чтения кэша, запрос выполняется без кэша")
+                return await method(cls, *args, **filters)
+            if value is not None:
+                return adapter.validate_json(value)
+
+            value = await method(cls, *args, **filters)
+            if value is None:
+                # Отсутствие записи не кэшируется: она может быть создана в любой момент
+                return None
+            value = adapter.validate_python(value, from_attributes=True)
+            try:
+                await cache.set(key, adapter.dump_json(value), cls.cache_ttl or settings.CACHE_TTL)
+            except Exception:
+                logger.exception("Ошибка записи в кэш")
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+# Объединение одинаковых одновременных чтений репозиториев в процессе воркера
+single_flight = SingleFlight()
+
+# Загрузчики записей по ID для вызовов вне сессии запроса (см. BaseRepository._loader)
+_loaders: dict[type, BatchLoader] = {}
+
+
+def coalesced(result: str):
+    """Декоратор объединения одинаковых одновременных чтений для методов репозитория.
+
+    Одновременные вызовы метода с одинаковыми аргументами у репозитория со схемой
+    `schema` выполняют один запрос к базе данных (см. `SingleFlight`). Полученные
+    записи отсоединяются от сессии ведущего запроса (expunge), чтобы ее откат
+    не затронул записи, переданные другим запросам, а каждый вызов получает
+    собственные экземпляры схемы: записи не разделяются между запросами.
+    Чтения в сессии, изменявшей данные, не объединяются: они должны видеть
+    собственные незафиксированные изменения. Недавние результаты (SINGLEFLIGHT_TTL)
+    сбрасываются при фиксации изменений таблицы (см. `BaseRepository._invalidate`).
+
+    Args:
+        result (str): Вид результата метода (см. `cached`).
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(cls, *args, **filters):
+            session = current_session.get()
+            if (
+                not settings.SINGLEFLIGHT_ENABLED
+                or cls.schema is None
+                or (session is not None and session.info.get("writes"))
+            ):
+                return await method(cls, *args, **filters)
+
+            async def call():
+                value = await method(cls, *args, **filters)
+                if session is not None:
+                    for instance in _instances(value, result):
+                        if instance in session:
+                            session.expunge(instance)
+                return value
+
+            key = (cls, method.__name__, json.dumps([args, filters], sort_keys=True, default=str))
+            value, outcome = await single_flight.do(key, call, settings.SINGLEFLIGHT_TTL)
+            REPOSITORY_READS.labels(cls.model.__tablename__, method.__name__, outcome).inc()
+            return _schema_copies(cls.schema, value, result)
+
+        return wrapper
+
+    return decorator
 
 
 class BaseRepository:
@@ -33,13 +213,240 @@ class BaseRepository:
    """
 
     model = None  # Обязательное поле - модель SQLAlchemy, для которой предназначен репозиторий
+    bulk_chunk_size = 1000  # Количество записей в одной команде пакетных операций
+    stream_chunk_size = 1000  # Количество строк, получаемых из курсора за один раз при выгрузке
+    unique_fields: tuple[str, ...] = ()  # Поля, значения которых не должны повторяться (проверяются при импорте)
+    filter_fields: tuple[str, ...] = ()  # Поля, по которым фильтруются выборки (должны быть проиндексированы)
+    filter_spec = None  # Фильтры и сортировки списка в параметрах запроса (FilterSpec, см. filters.py)
+    # Pydantic-схема записи: методы чтения возвращают ее экземпляры, задание схемы
+    # включает кэширование чтения (см. CACHE_BACKEND) и объединение одинаковых чтений
+    schema = None
+    cache_ttl: int | None = None  # Время жизни записей кэша в секундах (по умолчанию CACHE_TTL)
+    # Опции загрузки связанных объектов для запросов чтения. По умолчанию связи не загружаются
+    # и равны None: ленивая загрузка в асинхронной сессии невозможна.
+    load_options: tuple = (noload("*"),)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Производные репозитории (см. expand) модель не переопределяют и не регистрируются
+        if cls.__dict__.get("model") is not None:
+            registry.append(cls)
+
+    @classmethod
+    def _select(cls):
+        """Запрос выборки записей модели с опциями загрузки связей репозитория."""
+        return select(cls.model).options(*cls.load_options)
+
+    @classmethod
+    def _where(cls, filters: dict) -> list:
+        """Условия WHERE для фильтров: `поле` - равенство, `поле__операция` - см. filters.LOOKUPS."""
+        return compile_filters(cls.model, filters)
+
+    @classmethod
+    def _one_query(cls, filters: dict):
+        """Запрос `get_one`: выборка записей по фильтрам."""
+        return cls._select().where(*cls._where(filters))
+
+    @classmethod
+    def _page_query(cls, limit: int, offset: int, sort: str, filters: dict):
+        """Запрос `get_page`: страница записей по фильтрам с сортировкой (LIMIT/OFFSET)."""
+        return (
+            cls._select()
+            .where(*cls._where(filters))
+            .order_by(*compile_sort(cls.model, sort))
+            .limit(limit)
+            .offset(offset)
+        )
+
+    @classmethod
+    def _page_after_query(cls, limit: int, cursor: int | None, filters: dict):
+        """Запрос `get_page_after`: страница по курсору с одной лишней записью.
+
+        Лишняя запись показывает, есть ли следующая страница.
+        """
+        query = cls._select().where(*cls._where(filters))
+        if cursor is not None:
+            query = query.where(cls.model.id < cursor)
+        return query.order_by(cls.model.id.desc()).limit(limit + 1)
+
+    @classmethod
+    def _count_query(cls, filters: dict):
+        """Запрос `count`: количество записей по фильтрам."""
+        return select(func.count()).select_from(cls.model).where(*cls._where(filters))
+
+    @classmethod
+    @functools.cache
+    def expand(cls, *relations: str):
+        """Получить репозиторий, загружающий указанные связи модели.
+
+        Связанные объекты загружаются тем же запросом (LEFT OUTER JOIN),
+        без отдельного запроса на каждую запись. Результаты такого
+        репозитория не кэшируются: они зависят от данных других таблиц.
+
+        Args:
+            relations (str): Названия связей модели (relationship).
+
+        Returns:
+            type[BaseRepository]: Наследник репозитория с опциями загрузки связей.
+
+        Raises:
+            ValueError: Если у модели нет связи с указанным названием.
+        """
+        unknown = set(relations) - set(cls.model.__mapper__.relationships.keys())
+        if unknown:
+            raise ValueError(f"Неизвестные связи: {', '.join(sorted(unknown))}")
+        options = tuple(joinedload(getattr(cls.model, name)) for name in relations)
+        return type(
+            f"{cls.__name__}Expanded",
+            (cls,),
+            {"load_options": options + (noload("*"),), "schema": None},
+        )
+
+    @classmethod
+    def _get_cache(cls):
+        """Получить хранилище кэша для чтения или None, если кэш не используется."""
+        if cls.schema is None:
+            return None
+        session = current_session.get()
+        if session is not None and session.info.get("writes"):
+            # В транзакции запроса есть незафиксированные изменения - читаем только из базы данных
+            return None
+        return get_cache()
+
+    @classmethod
+    def _cache_prefix(cls) -> str:
+        return f"repository:{cls.model.__tablename__}"
+
+    @classmethod
+    async def _cache_key(cls, cache, method: str, args: tuple, filters: dict) -> str:
+        """Сформировать ключ кэша для вызова метода чтения.
+
+        Запись по ID хранится под постоянным ключом и сбрасывается точечно при
+        ее изменении. Остальные выборки (списки, страницы, поиск по другим полям)
+        хранятся под номером версии таблицы, который увеличивается при любом
+        изменении данных.
+        """
+        if method == "get_one" and list(filters) == ["id"]:
+            return f"{cls._cache_prefix()}:id:{filters['id']}"
+        version = await cache.get(f"{cls._cache_prefix()}:version")
+        params = json.dumps([args, filters], sort_keys=True, default=str)
+        digest = hashlib.sha1(params.encode()).hexdigest()
+        return f"{cls._cache_prefix()}:v{int(version or 0)}:{method}:{digest}"
+
+    @classmethod
+    def _invalidate(cls, session, ids=()) -> None:
+        """Сбросить кэш и недавние результаты объединенных чтений после фиксации изменений таблицы.
+
+        Args:
+            session: Сессия, в которой изменены данные.
+            ids: ID измененных или удаленных записей.
+        """
+        if cls.schema is None:
+            return
+        cache = get_cache()
+        keys = [f"{cls._cache_prefix()}:id:{model_id}" for model_id in ids]
+
+        async def invalidate():
+            single_flight.forget(lambda key: key[0].model is cls.model)
+            if cache is None:
+                return
+            try:
+                await cache.incr(f"{cls._cache_prefix()}:version")
+                if keys:
+                    await cache.delete(*keys)
+            except Exception:
+                logger.exception("Ошибка сброса кэша")
+
+        on_commit(session, invalidate)
+
+    @classmethod
+    async def warm_up(cls) -> None:
+        """Выполнить основные запросы чтения репозитория.
+
+        Запросы выполняются с заведомо отсутствующими значениями фильтров, чтобы
+        SQLAlchemy скомпилировал их, а драйвер подготовил (prepare) на соединении
+        текущей сессии до первых запросов пользователей. Вызывается в сессии,
+        помеченной как изменявшая данные, поэтому кэш чтения не используется.
+        """
+        await cls.get_one(id=0)
+        await cls.get_last()
+        await cls.get_page(1)
+        await cls.get_page_after(1)
+        await cls.get_page_after(1, 0)
+        await cls.count()
+        await cls.version()
+        for field in cls.filter_fields:
+            value = SAMPLE_VALUES[getattr(cls.model, field).type.python_type]
+            await cls.get_page(1, **{field: value})
+            await cls.get_page_after(1, **{field: value})
+            await cls.get_page_after(1, 0, **{field: value})
+            await cls.count(**{field: value})
+        for field in cls.unique_fields:
+            value = SAMPLE_VALUES[getattr(cls.model, field).type.python_type]
+            await cls.get_one(**{field: value})
+
+    @classmethod
+    def _loader(cls) -> BatchLoader:
+        """Загрузчик записей по ID текущей сессии запроса (или общий вне запроса)."""
+        session = current_session.get()
+        loaders = session.info.setdefault("loaders", {}) if session is not None else _loaders
+        loader = loaders.get(cls)
+        if loader is None:
+            loader = loaders[cls] = BatchLoader(cls._load_by_ids)
+        return loader
+
+    @classmethod
+    async def _load_by_ids(cls, ids: list) -> dict:
+        """Получить записи по списку ID одним запросом `WHERE id = ANY(:ids)`.
+
+        Массив передается одним параметром, поэтому запрос не зависит от
+        количества ID и готовится драйвером один раз.
+        """
+        async with cls._session_lock():
+            async with session_scope() as session:
+                ids_param = bindparam("ids", ids, type_=ARRAY(cls.model.id.type))
+                query = cls._select().where(cls.model.id == any_(ids_param))
+                result = await session.execute(query)
+                return {item.id: item for item in result.scalars().all()}
+
+    @staticmethod
+    def _session_lock():
+        """Блокировка сессии запроса для пакетов загрузчиков.
+
+        Пакеты загрузчиков разных репозиториев выполняются отдельными задачами,
+        а сессия не допускает одновременных команд, поэтому пакеты одной сессии
+        запроса выполняются по очереди. Вне запроса у каждого пакета своя сессия.
+        """
+        session = current_session.get()
+        if session is None:
+            return contextlib.nullcontext()
+        return session.info.setdefault("loader_lock", asyncio.Lock())
+
+    @classmethod
+    async def get_many(cls, ids: list[int]) -> list:
+        """Получить записи по списку ID.
+
+        Запрос объединяется с другими одновременными вызовами `get_many` и
+        `get_one(id=...)` этого репозитория (см. `BatchLoader`).
+
+        Args:
+            ids (list[int]): ID записей.
+
+        Returns:
+            list[Schema | Model]: Найденные записи в порядке `ids` (отсутствующие
+                пропускаются): экземпляры схемы `schema` или модели, если схема не задана.
+        """
+        items = [item for item in await cls._loader().load_many(ids) if item is not None]
+        return items if cls.schema is None else _schema_copies(cls.schema, items, "list")
 
     @classmethod
+    @cached("one")
+    @coalesced("one")
     async def get_one(cls, **filters):
         """Получить одну запись по заданным фильтрам.
 
-        Возвращает найденную запись (экземпляр модели)
-        или None, если запись не найдена.
+        Возвращает найденную запись (экземпляр схемы `schema`, если она
+        задана, иначе экземпляр модели) или None, если запись не найдена.
 
         Args:
             filters (dict): Словарь фильтров для поиска записи.
@@ -47,19 +454,23 @@ class BaseRepository:
                 значения - фильтруемым значениям.
 
         Returns:
-            Model | None: Экземпляр модели или None.
+            Schema | Model | None: Экземпляр схемы (модели) или None.
         """
-        async with async_session_maker() as session:
-            query = select(cls.model).filter_by(**filters)
-            result = await session.execute(query)
+        if list(filters) == ["id"]:
+            # Загрузка по ID объединяется с другими одновременными вызовами в один запрос
+            return await cls._loader().load(filters["id"])
+        async with session_scope() as session:
+            result = await session.execute(cls._one_query(filters))
             return result.scalar_one_or_none()
 
     @classmethod
+    @cached("one")
+    @coalesced("one")
     async def get_last(cls, **filters):
         """Получить последнюю запись по заданным фильтрам.
 
-        Возвращает последнюю найденную запись (экземпляр модели)
-        или None, если записей не найдено.
+        Возвращает последнюю найденную запись (экземпляр схемы `schema`, если
+        она задана, иначе экземпляр модели) или None, если записей не найдено.
 
         Args:
             filters (dict): Словарь фильтров для поиска записи.
@@ -67,12 +478,12 @@ class BaseRepository:
                 значения - фильтруемым значениям.
 
         Returns:
-            Model | None: Экземпляр модели или None.
+            Schema | Model | None: Экземпляр схемы (модели) или None.
         """
-        async with async_session_maker() as session:
+        async with session_scope() as session:
             query = (
-                select(cls.model)
-                .filter_by(**filters)
+                cls._select()
+                .where(*cls._where(filters))
                 .order_by(cls.model.id.desc())
                 .limit(1)
             )
@@ -80,34 +491,191 @@ class BaseRepository:
             return result.scalar_one_or_none()
 
     @classmethod
-    async def get_all(cls, **filters):
+    @cached("list")
+    @coalesced("list")
+    async def get_all(cls, sort: str = DEFAULT_SORT, **filters):
         """Получить все записи по заданным фильтрам.
 
-        Возвращает список найденных записей (список экземпляров модели).
+        Возвращает список найденных записей (экземпляров схемы `schema`,
+        если она задана, иначе экземпляров модели).
 
         Args:
+            sort (str): Поле сортировки (`-поле` - по убыванию).
             filters (dict): Словарь фильтров для поиска записей.
-                Ключи словаря соответствуют столбцам модели,
+                Ключи словаря соответствуют столбцам модели (равенство)
+                или имеют вид `поле__операция` (см. filters.LOOKUPS),
                 значения - фильтруемым значениям.
 
         Returns:
-            list[Model]: Список экземпляров модели.
+            list[Schema | Model]: Список экземпляров схемы (модели).
         """
-        async with async_session_maker() as session:
+        async with session_scope() as session:
             query = (
-                select(cls.model)
-                .filter_by(**filters)
-                .order_by(cls.model.id.desc())
+                cls._select()
+                .where(*cls._where(filters))
+                .order_by(*compile_sort(cls.model, sort))
             )
             result = await session.execute(query)
             return result.scalars().all()
 
+    @classmethod
+    @cached("list")
+    @coalesced("list")
+    async def get_page(cls, limit: int, offset: int = 0, sort: str = DEFAULT_SORT, **filters):
+        """Получить страницу записей по заданным фильтрам (LIMIT/OFFSET).
+
+        В отличие от `get_all` ограничение выборки выполняется на стороне
+        базы данных, поэтому в память попадает только запрошенная страница.
+
+        Args:
+            limit (int): Количество записей на странице.
+            offset (int): Количество пропускаемых записей.
+            sort (str): Поле сортировки (`-поле` - по убыванию).
+            filters (dict): Словарь фильтров для поиска записей (см. `get_all`).
+
+        Returns:
+            list[Schema | Model]: Список экземпляров схемы (модели).
+        """
+        async with session_scope() as session:
+            result = await session.execute(cls._page_query(limit, offset, sort, filters))
+            return result.scalars().all()
+
+    @classmethod
+    @cached("page")
+    @coalesced("page")
+    async def get_page_after(cls, limit: int, cursor: int | None = None, **filters):
+        """Получить страницу записей по курсору (keyset-пагинация по `id`).
+
+        Записи упорядочены по убыванию `id`, курсор - это `id` последней
+        записи предыдущей страницы. Стоимость запроса не зависит от номера
+        страницы: база данных сразу переходит к нужному месту индекса.
+
+        Args:
+            limit (int): Количество записей на странице.
+            cursor (int | None): `id` последней записи предыдущей страницы
+                или None для первой страницы.
+            filters (dict): Словарь фильтров для поиска записей.
+
+        Returns:
+            tuple[list[Schema | Model], int | None]: Список экземпляров схемы (модели) и курсор
+                следующей страницы (None, если страница последняя).
+        """
+        async with session_scope() as session:
+            result = await session.execute(cls._page_after_query(limit, cursor, filters))
+            items = result.scalars().all()
+            if len(items) > limit:
+                items = items[:limit]
+                return items, items[-1].id
+            return items, None
+
+    @classmethod
+    async def stream(cls, **filters):
+        """Построчно выгрузить записи по заданным фильтрам.
+
+        Асинхронный генератор, отдающий записи частями по `stream_chunk_size`
+        строк через серверный курсор, поэтому потребление памяти не зависит
+        от размера таблицы. Использует собственную сессию: выгрузка продолжается
+        после завершения обработчика запроса и его unit of work.
+
+        Args:
+            filters (dict): Словарь фильтров для поиска записей.
+
+        Yields:
+            list[Row]: Очередная часть строк таблицы (доступ к столбцам через атрибуты).
+        """
+        # Столбцы, не загружаемые по умолчанию (deferred), в выгрузку не входят
+        columns = [attribute.columns[0] for attribute in cls.model.__mapper__.column_attrs if not attribute.deferred]
+        async with async_session_maker() as session:
+            query = (
+                select(*columns)
+                .where(*cls._where(filters))
+                .order_by(cls.model.id)
+                .execution_options(yield_per=cls.stream_chunk_size)
+            )
+            result = await session.stream(query)
+            async for partition in result.partitions():
+                yield partition
+
+    @classmethod
+    @cached("count")
+    @coalesced("count")
+    async def count(cls, **filters) -> int:
+        """Получить количество записей по заданным фильтрам.
+
+        Args:
+            filters (dict): Словарь фильтров для поиска записей.
+
+        Returns:
+            int: Количество записей.
+        """
+        async with session_scope() as session:
+            result = await session.execute(cls._count_query(filters))
+            return result.scalar_one()
+
+    @classmethod
+    @cached("version")
+    @coalesced("version")
+    async def version(cls, **filters) -> tuple[int, Optional[datetime.datetime], int]:
+        """Получить версию данных: количество записей, наибольшее время их изменения
+        и сумму номеров изменивших их транзакций.
+
+        Время изменения `update_ad` и номер транзакции `change_xid` устанавливаются
+        базой данных при добавлении и любом изменении записи, поэтому версия меняется
+        при каждом изменении выборки, в том числе при удалении записи (уменьшается
+        количество). Транзакция, начатая раньше, может зафиксироваться позже и не
+        увеличить наибольшее время изменения, но номер транзакции измененной записи
+        меняется всегда, поэтому меняется и их сумма.
+        Используется для условных запросов (ETag, см. app/core/conditional.py).
+
+        Args:
+            filters (dict): Словарь фильтров для поиска записей.
+
+        Returns:
+            tuple[int, datetime | None, int]: Количество записей, наибольший `update_ad`
+                и сумма `change_xid`.
+        """
+        async with session_scope() as session:
+            query = (
+                select(
+                    func.count(),
+                    func.max(cls.model.update_ad),
+                    func.coalesce(func.sum(cls.model.change_xid), 0),
+                )
+                .select_from(cls.model)
+                .where(*cls._where(filters))
+            )
+            result = await session.execute(query)
+            count, modified, changes = result.one()
+            return count, modified, int(changes)
+
+    @classmethod
+    async def get_existing(cls, field: str, values: list) -> set:
+        """Получить значения поля, которые уже есть в базе данных.
+
+        Позволяет одним запросом проверить уникальность пачки записей.
+
+        Args:
+            field (str): Название столбца модели.
+            values (list): Проверяемые значения.
+
+        Returns:
+            set: Значения из `values`, для которых в таблице уже есть записи.
+        """
+        if not values:
+            return set()
+        column = getattr(cls.model, field)
+        async with session_scope() as session:
+            query = select(column).where(column.in_(set(values)))
+            result = await session.execute(query)
+            return set(result.scalars().all())
+
     @classmethod
     async def create(cls, **data):
         """Создать новую запись в базе данных.
 
         Создает новую запись на основе переданных данных и
-        возвращает ее (экземпляр модели).
+        возвращает ее (экземпляр модели). Запись возвращается
+        той же командой INSERT ... RETURNING, без повторного запроса.
 
         Args:
             data (dict): Словарь данных для создания новой записи.
@@ -117,40 +685,299 @@ class BaseRepository:
         Returns:
             Model: Экземпляр созданной модели.
         """
-        async with async_session_maker() as session:
-            query = insert(cls.model).values(**data)
-            await session.execute(query)
-            await session.commit()
-            # Возвращаем только что созданную запись для удобства
-            return await session.get(cls.model, data.get("id"))
+        async with session_scope(commit=True) as session:
+            query = insert(cls.model).values(**data).returning(cls.model)
+            result = await session.execute(query)
+            cls._invalidate(session)
+            return result.scalar_one()
+
+    @classmethod
+    def _conflict_target(cls) -> list[str]:
+        """Столбцы уникального индекса для INSERT ... ON CONFLICT."""
+        if not cls.unique_fields:
+            raise ValueError(f"У репозитория {cls.__name__} не заданы unique_fields")
+        return list(cls.unique_fields)
+
+    @classmethod
+    async def create_or_ignore(cls, **data):
+        """Создать запись, если записи с такими же значениями `unique_fields` еще нет.
+
+        Проверка и вставка выполняются одной командой
+        INSERT ... ON CONFLICT DO NOTHING RETURNING, поэтому результат верен
+        и при одновременных запросах (уникальность обеспечивает индекс базы данных).
+
+        Args:
+            data (dict): Словарь данных для создания новой записи.
+
+        Returns:
+            Model | None: Созданная запись или None, если такая запись уже есть.
+        """
+        async with session_scope(commit=True) as session:
+            query = (
+                pg_insert(cls.model)
+                .values(**data)
+                .on_conflict_do_nothing(index_elements=cls._conflict_target())
+                .returning(cls.model)
+            )
+            result = await session.execute(query)
+            item = result.scalar_one_or_none()
+            if item is not None:
+                cls._invalidate(session)
+            return item
+
+    @classmethod
+    async def upsert(cls, **data):
+        """Создать запись или обновить существующую с такими же значениями `unique_fields`.
+
+        Одна команда INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+
+        Args:
+            data (dict): Словарь данных записи (должен содержать `unique_fields`).
+
+        Returns:
+            tuple[Model, bool]: Запись и признак того, что она была создана.
+        """
+        target = cls._conflict_target()
+        query = pg_insert(cls.model).values(**data)
+        changes = {name: query.excluded[name] for name in data if name not in target}
+        query = (
+            query
+            # Без изменяемых полей обновление ничего не меняет, но позволяет вернуть запись
+            .on_conflict_do_update(index_elements=target, set_=changes or {target[0]: query.excluded[target[0]]})
+            # xmax = 0 только у строки, вставленной этой командой
+            .returning(cls.model, literal_column("xmax = 0").label("created"))
+        )
+        async with session_scope(commit=True) as session:
+            result = await session.execute(query)
+            item, created = result.one()
+            cls._invalidate(session, [item.id])
+            return item, created
 
     @classmethod
     async def update(cls, model_id: int, **data):
         """Обновить существующую запись по ее ID.
 
-        Обновляет запись с указанным ID на основе переданных данных.
+        Обновляет запись с указанным ID на основе переданных данных
+        и возвращает ее одной командой UPDATE ... RETURNING. Время изменения
+        `update_ad` устанавливает триггер базы данных (как и при пакетном
+        обновлении и upsert).
 
         Args:
             model_id (int): ID записи для обновления.
             data (dict): Словарь данных для обновления записи.
                 Ключи словаря соответствуют столбцам модели,
                 значения - новыми данными для записи.
+
+        Returns:
+            Model | None: Обновленный экземпляр модели или None, если запись не найдена.
         """
-        async with async_session_maker() as session:
-            query = update(cls.model).where(cls.model.id == model_id).values(**data)
-            await session.execute(query)
-            await session.commit()
+        async with session_scope(commit=True) as session:
+            query = (
+                update(cls.model)
+                .where(cls.model.id == model_id)
+                .values(**data)
+                .returning(cls.model)
+            )
+            result = await session.execute(query)
+            cls._invalidate(session, [model_id])
+            return result.scalar_one_or_none()
 
     @classmethod
-    async def delete(cls, **filters):
+    async def delete(cls, **filters) -> int:
         """Удалить записи по заданным фильтрам.
 
-                Args:
-                    filters (dict): Словарь фильтров для удаления записей.
-                        Ключи словаря соответствуют столбцам модели,
-                        значения - фильтруемым значениям.
-                """
-        async with async_session_maker() as session:
-            query = delete(cls.model).filter_by(**filters)
-            await session.execute(query)
-            await session.commit()
\ No newline at end of file
+        ID удаленных записей сохраняются триггером базы данных в журнале
+        изменений (см. app/core/database/changes.py).
+
+        Args:
+            filters (dict): Словарь фильтров для удаления записей.
+                Ключи словаря соответствуют столбцам модели,
+                значения - фильтруемым значениям.
+
+        Returns:
+            int: Количество удаленных записей (0, если ничего не найдено).
+        """
+        async with session_scope(commit=True) as session:
+            query = delete(cls.model).where(*cls._where(filters)).returning(cls.model.id)
+            result = await session.execute(query)
+            ids = result.scalars().all()
+            cls._invalidate(session, ids)
+            return len(ids)
+
+    @classmethod
+    async def bulk_create(cls, rows: list[dict]) -> list[int]:
+        """Создать несколько записей пакетно.
+
+        Записи вставляются многострочными INSERT ... VALUES по
+        `bulk_chunk_size` строк. Вне запроса с unit of work каждая
+        часть фиксируется отдельной транзакцией.
+
+        Args:
+            rows (list[dict]): Данные новых записей.
+
+        Returns:
+            list[int]: ID созданных записей.
+        """
+        ids = []
+        for chunk in _chunks(rows, cls.bulk_chunk_size):
+            async with session_scope(commit=True) as session:
+                query = insert(cls.model).returning(cls.model.id)
+                result = await session.execute(query, chunk)
+                ids.extend(result.scalars().all())
+                cls._invalidate(session)
+        return ids
+
+    @classmethod
+    async def bulk_create_or_ignore(cls, rows: list[dict]) -> list[dict]:
+        """Создать несколько записей, пропуская нарушающие уникальность `unique_fields`.
+
+        Записи вставляются командами INSERT ... ON CONFLICT DO NOTHING по
+        `bulk_chunk_size` строк. Пропускаются записи, уже существующие в базе,
+        и повторы внутри `rows` (добавляется первая из повторяющихся записей).
+
+        Args:
+            rows (list[dict]): Данные новых записей.
+
+        Returns:
+            list[dict]: Записи, которые не были добавлены.
+        """
+        target = cls._conflict_target()
+        returning = [getattr(cls.model, name) for name in target]
+        ignored = []
+        for chunk in _chunks(rows, cls.bulk_chunk_size):
+            async with session_scope(commit=True) as session:
+                query = pg_insert(cls.model).on_conflict_do_nothing(index_elements=target).returning(*returning)
+                result = await session.execute(query, chunk)
+                inserted = Counter(tuple(row) for row in result.all())
+                cls._invalidate(session)
+            for row in chunk:
+                key = tuple(row.get(name) for name in target)
+                if inserted[key]:
+                    inserted[key] -= 1
+                else:
+                    ignored.append(row)
+        return ignored
+
+    @classmethod
+    async def bulk_update(cls, rows: list[dict]) -> list[int]:
+        """Обновить несколько записей пакетно.
+
+        Каждая запись должна содержать ключ `id`. Часть из `bulk_chunk_size`
+        строк обновляется одной командой UPDATE ... FROM unnest(массивы
+        значений) ... RETURNING id: по массиву-параметру на столбец, поэтому
+        видно, какие записи действительно найдены и обновлены.
+
+        Args:
+            rows (list[dict]): Данные для обновления записей.
+
+        Returns:
+            list[int]: ID обновленных записей (ID, которых нет в базе, отсутствуют).
+        """
+        table_columns = cls.model.__table__.c
+        ids = []
+        for chunk in _chunks(rows, cls.bulk_chunk_size):
+            # Записи с разным набором полей обновляются отдельными командами
+            groups = {}
+            for row in chunk:
+                groups.setdefault(tuple(name for name in row if name != "id"), []).append(row)
+            async with session_scope(commit=True) as session:
+                for fields, group in groups.items():
+                    types = {name: table_columns[name].type for name in ("id", *fields)}
+                    arrays = [
+                        bindparam(f"v_{name}", [row[name] for row in group], type_=ARRAY(type_))
+                        for name, type_ in types.items()
+                    ]
+                    columns = [column(name, type_) for name, type_ in types.items()]
+                    data = func.unnest(*arrays).table_valued(*columns).render_derived("data")
+                    query = (
+                        update(cls.model)
+                        .where(cls.model.id == data.c.id)
+                        .values({name: data.c[name] for name in fields})
+                        .returning(cls.model.id)
+                    )
+                    result = await session.execute(query)
+                    ids.extend(result.scalars().all())
+                cls._invalidate(session, [row["id"] for row in chunk])
+        return ids
+
+    @classmethod
+    async def bulk_delete(cls, ids: list[int]) -> int:
+        """Удалить несколько записей по их ID.
+
+        Args:
+            ids (list[int]): ID удаляемых записей.
+
+        Returns:
+            int: Количество удаленных записей.
+        """
+        deleted = 0
+        for chunk in _chunks(ids, cls.bulk_chunk_size):
+            async with session_scope(commit=True) as session:
+                query = (
+                    delete(cls.model)
+                    .where(cls.model.id.in_(chunk))
+                    .returning(cls.model.id)
+                )
+                result = await session.execute(query)
+                deleted_ids = result.scalars().all()
+                cls._invalidate(session, deleted_ids)
+                deleted += len(deleted_ids)
+        return deleted
+
+    @classmethod
+    async def copy_import(cls, batches, columns: list[str]) -> int:
+        """Загрузить большой объем записей через COPY.
+
+        Части записей по мере получения копируются командой COPY (asyncpg
+        `copy_records_to_table`) во временную таблицу, после чего одной
+        командой INSERT ... SELECT переносятся в основную. При переносе пропускаются записи, нарушающие
+        уникальность `unique_fields` (как в базе, так и внутри загрузки), и
+        записи со ссылками на несуществующие строки (внешние ключи).
+
+        Args:
+            batches: Асинхронно итерируемый набор частей записей - списков
+                кортежей значений (например, `CsvRecords`).
+            columns (list[str]): Названия столбцов в порядке значений кортежей.
+
+        Returns:
+            int: Количество добавленных записей.
+        """
+        target = cls.model.__table__
+        stage = table(f"_import_{target.name}_{secrets.token_hex(4)}", *[column(name) for name in columns])
+
+        async with session_scope(commit=True) as session:
+            # Временная таблица с теми же типами столбцов, удаляется при фиксации транзакции
+            await session.execute(text(
+                f"CREATE TEMP TABLE {stage.name} ON COMMIT DROP AS "
+                f"SELECT {', '.join(columns)} FROM {target.name} WITH NO DATA"
+            ))
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+            async for batch in batches:
+                # Пустая часть (все строки отклонены схемой) не требует команды COPY
+                if batch:
+                    await raw_connection.driver_connection.copy_records_to_table(
+                        stage.name, records=batch, columns=columns
+                    )
+
+            query = select(*[stage.c[name] for name in columns])
+            for field in cls.unique_fields:
+                query = query.where(~exists().where(target.c[field] == stage.c[field]))
+            for foreign_key in target.foreign_keys:
+                name = foreign_key.parent.name
+                if name in columns:
+                    query = query.where(or_(
+                        stage.c[name].is_(None),
+                        exists().where(foreign_key.column == stage.c[name]),
+                    ))
+            if cls.unique_fields:
+                unique_columns = [stage.c[field] for field in cls.unique_fields]
+                query = query.distinct(*unique_columns).order_by(*unique_columns)
+
+            query = pg_insert(target).from_select(columns, query)
+            if cls.unique_fields:
+                # Записи, добавленные одновременно с импортом другими запросами, также пропускаются
+                query = query.on_conflict_do_nothing(index_elements=list(cls.unique_fields))
+            result = await session.execute(query)
+            cls._invalidate(session)
+            return result.rowcount
@@ -0,0 +1,243 @@
+"""Журнал изменений таблиц для синхронизации клиентов (delta sync).
+
+Каждая строка таблиц приложения хранит в столбце `change_xid` номер
+транзакции, последней добавившей или изменившей ее (триггер базы данных,
+см. миграцию f4a9c2d7e1b3). Удаленные строки оставляют запись в таблице
+`deleted_records` с номером удалившей транзакции. Клиент получает изменения
+после курсора - позиции (номер транзакции, id) последнего полученного
+изменения - в порядке индексов `(change_xid, id)`, поэтому объем
+синхронизации зависит от количества изменений, а не от размера таблицы.
+
+Номера транзакций назначаются при начале записи, а фиксируются транзакции
+в другом порядке. Чтобы изменение долгой транзакции не оказалось позади уже
+выданного курсора, выдаются только изменения транзакций с номером меньше
+xmin текущего снимка (`pg_snapshot_xmin`): все они уже завершены, и набор
+таких изменений больше не пополняется. Изменения незавершенных транзакций
+будут выданы при следующем запросе.
+
+Записи об удалениях хранятся `CHANGES_TOMBSTONE_RETENTION_DAYS` дней и
+удаляются командой `python -m app.cli prune-tombstones` (см. `prune_tombstones`).
+Для каждой таблицы запоминается наибольший номер транзакции удаленных записей
+(`deleted_records_pruned`). Курсор хранит горизонт начала синхронизации: клиент,
+начавший синхронизацию после очистки, удаленных записей не получал, а клиенту,
+курсор которого старше очистки, возвращается 410 Gone - ему нужна полная
+синхронизация с начала журнала.
+"""
+import datetime
+from typing import Generic, NamedTuple, TypeVar
+
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, Table, delete, func, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from starlette import status
+
+from app.core.serialization import dump_trusted
+from app.core.config.config import settings
+from .database import UTC_NOW, BaseModel as DatabaseModel, session_scope
+
+# Записи об удаленных строках таблиц приложения (заполняются триггером при DELETE)
+deleted_records = Table(
+    "deleted_records",
+    DatabaseModel.metadata,
+    Column("table_name", String, nullable=False),
+    Column("record_id", Integer, nullable=False),
+    Column("change_xid", BigInteger, nullable=False),
+    Column("deleted_ad", DateTime, nullable=False, server_default=UTC_NOW),
+    Index("ix_deleted_records_table_name_change_xid", "table_name", "change_xid", "record_id"),
+)
+
+# Наибольший номер транзакции удаленных очисткой записей об удалении по таблицам
+deleted_records_pruned = Table(
+    "deleted_records_pruned",
+    DatabaseModel.metadata,
+    Column("table_name", String, primary_key=True),
+    Column("change_xid", BigInteger, nullable=False),
+)
+
+# Номер транзакции, все транзакции до которой завершены (xmin снимка текущей команды)
+SNAPSHOT_XMIN = text("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+
+class ChangeCursor(NamedTuple):
+    """Позиция в журнале изменений: номер транзакции, id записи и вид изменения.
+
+    Изменения упорядочены по первым трем полям, удаление (deleted=True) следует
+    за изменением записи с тем же номером транзакции и id. `base` - горизонт
+    первого запроса синхронизации: удаления с меньшими номерами клиенту не нужны.
+    Курсор без `base` (прежний формат из трех частей) считается начатым с начала журнала.
+    """
+    xid: int = 0
+    id: int = 0
+    deleted: bool = False
+    base: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.xid}-{self.id}-{int(self.deleted)}-{self.base}"
+
+    @classmethod
+    def parse(cls, value: str | None) -> "ChangeCursor":
+        """Разобрать курсор из параметра запроса (None - с начала журнала)."""
+        if value is None:
+            return cls()
+        try:
+            xid, record_id, deleted, *base = value.split("-")
+            if deleted not in ("0", "1") or len(base) > 1:
+                raise ValueError(value)
+            return cls(int(xid), int(record_id), deleted == "1", int(base[0]) if base else 0)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Недопустимое значение since"
+            ) from None
+
+
+T = TypeVar("T")
+
+
+class ChangesPage(BaseModel, Generic[T]):
+    """Изменения после курсора.
+
+    Клиент применяет `items` (добавленные и измененные записи, заменяют
+    локальные копии), затем удаляет записи `deleted` и сохраняет `next_cursor`
+    для следующего запроса. Пока `has_more` истинно, изменения еще есть.
+    """
+    items: list[T]
+    deleted: list[int]
+    next_cursor: str
+    has_more: bool
+
+
+async def fetch_changes(repository, limit: int, cursor: ChangeCursor) -> tuple[list, list[int], ChangeCursor, bool]:
+    """Получить до `limit` изменений таблицы репозитория после курсора.
+
+    Args:
+        repository: Класс репозитория (наследник BaseRepository).
+        limit (int): Наибольшее количество изменений.
+        cursor (ChangeCursor): Позиция последнего полученного изменения.
+
+    Returns:
+        tuple: Измененные записи, ID удаленных записей, курсор следующего
+            запроса и признак того, что изменений больше `limit`.
+    """
+    async with session_scope() as session:
+        return await _fetch_changes(session, repository, limit, cursor)
+
+
+async def _fetch_changes(session, repository, limit: int, cursor: ChangeCursor) -> tuple:
+    model = repository.model
+    # Одна граница для записей и удалений: иначе курсор мог бы пропустить изменения между границами
+    horizon = (await session.execute(select(SNAPSHOT_XMIN))).scalar_one()
+    if cursor == ChangeCursor():
+        cursor = cursor._replace(base=horizon)
+    else:
+        pruned = (await session.execute(
+            select(deleted_records_pruned.c.change_xid)
+            .where(deleted_records_pruned.c.table_name == model.__tablename__)
+        )).scalar_one_or_none()
+        # Удаления после курсора, которые могли понадобиться клиенту, уже очищены
+        if pruned is not None and pruned >= max(cursor.base, cursor.xid):
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Курсор устарел, требуется полная синхронизация (без since)",
+            )
+
+    position = tuple_(cursor.xid, cursor.id)
+    query = (
+        repository._select()
+        .add_columns(model.change_xid)
+        .where(tuple_(model.change_xid, model.id) > position, model.change_xid < horizon)
+        .order_by(model.change_xid, model.id)
+        .limit(limit + 1)
+    )
+    changed = [
+        (ChangeCursor(xid, item.id, False, cursor.base), item)
+        for item, xid in (await session.execute(query)).all()
+    ]
+
+    tombstone = tuple_(deleted_records.c.change_xid, deleted_records.c.record_id)
+    query = (
+        select(deleted_records.c.change_xid, deleted_records.c.record_id)
+        .where(
+            deleted_records.c.table_name == model.__tablename__,
+            # Удаление следует за изменением с той же позицией
+            tombstone >= position if not cursor.deleted else tombstone > position,
+            deleted_records.c.change_xid < horizon,
+        )
+        .order_by(deleted_records.c.change_xid, deleted_records.c.record_id)
+        .limit(limit + 1)
+    )
+    deleted = [
+        (ChangeCursor(xid, record_id, True, cursor.base), None)
+        for xid, record_id in (await session.execute(query)).all()
+    ]
+
+    changes = sorted(changed + deleted, key=lambda change: change[0])
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    next_cursor = changes[-1][0] if changes else cursor
+    items = [item for _, item in changes if item is not None]
+    deleted_ids = [key.id for key, item in changes if item is None]
+    return items, deleted_ids, next_cursor, has_more
+
+
+async def changes_response(repository, schema: type[BaseModel], limit: int, since: str | None) -> ORJSONResponse:
+    """Изменения таблицы репозитория после курсора в виде готового JSON-ответа.
+
+    Записи не проверяются схемой (см. `dump_trusted`), тип ответа для
+    документации задается аннотацией маршрута (`-> ChangesPage[Schema]`).
+
+    Args:
+        repository: Класс репозитория (наследник BaseRepository).
+        schema: Pydantic-схема записи, определяющая набор полей ответа.
+        limit (int): Наибольшее количество изменений.
+        since (str | None): Курсор предыдущего ответа (`next_cursor`) или None
+            для полной выгрузки таблицы с начала журнала.
+
+    Returns:
+        ORJSONResponse: Ответ со страницей изменений.
+    """
+    items, deleted, next_cursor, has_more = await fetch_changes(repository, limit, ChangeCursor.parse(since))
+    return ORJSONResponse({
+        "items": dump_trusted(schema, items),
+        "deleted": deleted,
+        "next_cursor": str(next_cursor),
+        "has_more": has_more,
+    })
+
+
+async def prune_tombstones(retention: datetime.timedelta | None = None) -> int:
+    """Удалить записи об удалениях старше срока хранения.
+
+    Очищаются только записи транзакций ниже горизонта журнала: они уже могли
+    быть выданы клиентам, и новых записей с такими номерами не появится.
+    Наибольший номер очищенной транзакции сохраняется для таблицы, чтобы
+    отклонять устаревшие курсоры (см. `fetch_changes`).
+
+    Args:
+        retention (timedelta | None): Срок хранения записей
+            (по умолчанию CHANGES_TOMBSTONE_RETENTION_DAYS).
+
+    Returns:
+        int: Количество удаленных записей.
+    """
+    if retention is None:
+        retention = datetime.timedelta(days=settings.CHANGES_TOMBSTONE_RETENTION_DAYS)
+    async with session_scope(commit=True) as session:
+        horizon = (await session.execute(select(SNAPSHOT_XMIN))).scalar_one()
+        expired = (
+            deleted_records.c.deleted_ad < func.timezone("utc", func.now(), type_=DateTime) - retention,
+            deleted_records.c.change_xid < horizon,
+        )
+        horizons = pg_insert(deleted_records_pruned).from_select(
+            ["table_name", "change_xid"],
+            select(deleted_records.c.table_name, func.max(deleted_records.c.change_xid))
+            .where(*expired)
+            .group_by(deleted_records.c.table_name),
+        )
+        await session.execute(horizons.on_conflict_do_update(
+            index_elements=["table_name"],
+            set_={"change_xid": func.greatest(deleted_records_pruned.c.change_xid, horizons.excluded.change_xid)},
+        ))
+        result = await session.execute(delete(deleted_records).where(*expired))
+        return result.rowcount
@@ -1,22 +1,97 @@
-import datetime
-from typing import AsyncGenerator
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncGenerator, Awaitable, Callable
 
-from sqlalchemy import Column, DateTime
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import BigInteger, Column, DateTime, FetchedValue, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, declared_attr, Mapped, mapped_column
 from app.core.config.config import settings
+from app.core.metrics import instrument_engine
+from app.core.database.pool import InstrumentedPool
+from app.core.database.routing import RoutingSession, replicas
 
-# Конфигурирование асинхронного движка SQLAlchemy для взаимодействия с базой данных
-engine = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+logger = logging.getLogger(__name__)
+
+# Асинхронный движок SQLAlchemy для взаимодействия с базой данных.
+# Создается не при импорте, а при запуске приложения в каждом процессе (см. init_engine):
+# пул соединений нельзя разделять между процессами, созданными через fork (preload_app в gunicorn).
+engine: AsyncEngine | None = None
 
 # Фабрика для создания асинхронных сессий базы данных.
 # Сессия - это объект, который олицетворяет собой разговор с базой данных.
 # Она предоставляет методы для выполнения запросов, добавления, обновления и удаления данных.
+# Движок подключается к фабрике в init_engine.
+# При заданных репликах (POSTGRES_REPLICAS) чтение выполняется на них (см. RoutingSession).
 async_session_maker = async_sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
+    class_=AsyncSession, sync_session_class=RoutingSession, expire_on_commit=False
 )
 
 
+def _create_engine(url: str) -> AsyncEngine:
+    """Создать движок с пулом соединений по настройкам DB_* и сбором метрик запросов."""
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    instrument_engine(engine)
+    return engine
+
+
+def init_engine() -> AsyncEngine:
+    """Создать движки и пулы соединений текущего процесса.
+
+    Вызывается при запуске приложения (lifespan) уже после fork воркера
+    и при запуске команд обслуживания (app.cli). Для каждой реплики из
+    POSTGRES_REPLICAS создается собственный движок с таким же пулом:
+    бюджет DB_MAX_CONNECTIONS действует для каждого сервера отдельно.
+
+    Returns:
+        AsyncEngine: Движок основного сервера.
+    """
+    global engine
+    if settings.db_connections_per_server > settings.DB_MAX_CONNECTIONS:
+        logger.warning(
+            "Воркеры могут открыть до %d соединений с каждым сервером базы данных, "
+            "больше бюджета DB_MAX_CONNECTIONS=%d: уменьшите WEB_CONCURRENCY, DB_POOL_SIZE "
+            "или DB_MAX_OVERFLOW",
+            settings.db_connections_per_server, settings.DB_MAX_CONNECTIONS,
+        )
+    engine = _create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    replicas.configure([_create_engine(url) for url in settings.replica_database_uris])
+    async_session_maker.configure(bind=engine)
+    return engine
+
+
+def get_engine() -> AsyncEngine:
+    """Получить движок текущего процесса.
+
+    Raises:
+        RuntimeError: Если движок еще не создан (init_engine не вызывался).
+    """
+    if engine is None:
+        raise RuntimeError("Движок базы данных не создан: вызовите init_engine()")
+    return engine
+
+
+async def dispose_engine() -> None:
+    """Закрыть соединения пулов при остановке процесса."""
+    global engine
+    await replicas.dispose()
+    if engine is not None:
+        await engine.dispose()
+        engine = None
+
+
+# Текущее время транзакции в UTC (значение по умолчанию столбцов времени)
+UTC_NOW = text("timezone('utc', now())")
+
+
 # Базовая модель для сущностей (таблиц) базы данных
 class BaseModel(DeclarativeBase):
     __abstract__ = True  # Абстрактный класс служит основой для создания конкретных моделей
@@ -28,13 +103,79 @@ class BaseModel(DeclarativeBase):
 
     # Первичный ключ таблицы (столбец, однозначно идентифицирующий каждую запись)
     id: Mapped[int] = mapped_column(primary_key=True)
-    created_ad = Column(DateTime, default=datetime.datetime.now())
-    update_ad = Column(DateTime, nullable=True, default=None)
+    # Время добавления и последнего изменения записи (UTC) устанавливает база данных:
+    # значение по умолчанию и триггер set_update_ad при любом UPDATE (см. миграцию e3b8f1a6c472)
+    created_ad = Column(DateTime, nullable=False, server_default=UTC_NOW)
+    update_ad = Column(DateTime, nullable=False, server_default=UTC_NOW, server_onupdate=FetchedValue())
+    # Номер транзакции, последней добавившей или изменившей запись (триггер track_change,
+    # см. app/core/database/changes.py). Нужен только журналу изменений, при чтении не загружается.
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default="0", server_onupdate=FetchedValue(), deferred=True
+    )
+
+
+# Сессия текущего запроса (unit of work). Заполняется зависимостью get_async_session,
+# все вызовы репозиториев внутри запроса работают в этой сессии и одной транзакции.
+current_session: ContextVar[AsyncSession | None] = ContextVar("current_session", default=None)
+
+
+def on_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Выполнить асинхронную функцию после успешной фиксации транзакции сессии.
+
+    Используется для действий, которые не должны происходить раньше фиксации
+    данных (например, сброс кэша). При откате транзакции функции не вызываются.
+    """
+    session.info.setdefault("on_commit", []).append(callback)
+
+
+async def _commit(session: AsyncSession) -> None:
+    """Зафиксировать транзакцию и выполнить отложенные через on_commit действия."""
+    await session.commit()
+    for callback in session.info.pop("on_commit", []):
+        await callback()
 
 
 # Асинхронная функция для получения сессии базы данных
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     # Создание асинхронного контекстного менеджера для сессии с помощью фабрики
     async with async_session_maker() as session:
-        # Возврат сессии в качестве асинхронного генератора
+        # Сессия становится общей для всех репозиториев в рамках запроса
+        token = current_session.set(session)
+        try:
+            # Возврат сессии в качестве асинхронного генератора
+            yield session
+            # Запрос обработан без ошибок - фиксируем транзакцию
+            await _commit(session)
+        except Exception:
+            session.info.pop("on_commit", None)
+            await session.rollback()
+            raise
+        finally:
+            current_session.reset(token)
+
+
+@asynccontextmanager
+async def session_scope(commit: bool = False) -> AsyncGenerator[AsyncSession, None]:
+    """Получить сессию для выполнения запроса к базе данных.
+
+    Внутри запроса с unit of work (см. get_async_session) возвращает сессию запроса,
+    фиксация транзакции выполняется в конце запроса. Вне его открывает отдельную сессию
+    и при `commit=True` фиксирует транзакцию при выходе.
+
+    Args:
+        commit (bool): Сессия используется для изменения данных. Помечает сессию
+            как изменявшую данные и фиксирует транзакцию отдельной сессии при выходе.
+    """
+    session = current_session.get()
+    if session is not None:
+        if commit:
+            session.info["writes"] = True
+        yield session
+        return
+
+    async with async_session_maker() as session:
+        if commit:
+            session.info["writes"] = True
         yield session
+        if commit:
+            await _commit(session)
@@ -0,0 +1,128 @@
+import datetime
+import json
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from .database import async_session_maker
+from .filters import DEFAULT_SORT
+
+# Значения фильтров по типу столбца. Значения заведомо редкие, как у типичного
+# избирательного фильтра: для частых значений планировщик вправе читать таблицу целиком.
+SAMPLE_VALUES = {
+    int: -1,
+    float: -1.0,
+    str: "~explain~",
+    datetime.datetime: datetime.datetime(1970, 1, 1),
+}
+
+
+def filter_queries(repository, field: str) -> dict:
+    """Запросы, которые BaseRepository выполняет при фильтрации по полю.
+
+    Запросы строятся теми же методами, что и в методах чтения репозитория,
+    поэтому проверяется именно то, что выполняется при обработке запросов.
+
+    Args:
+        repository: Класс репозитория (наследник BaseRepository).
+        field (str): Название столбца, по которому выполняется фильтрация.
+
+    Returns:
+        dict: Название метода репозитория и соответствующий ему запрос.
+    """
+    filters = {field: SAMPLE_VALUES[getattr(repository.model, field).type.python_type]}
+    return {
+        "get_one": repository._one_query(filters),
+        "get_page": repository._page_query(50, 50, DEFAULT_SORT, filters),
+        "get_page_after": repository._page_after_query(50, 1000, filters),
+        "count": repository._count_query(filters),
+    }
+
+
+# Фильтр репозитория для проверки операции спецификации списка (см. filters.FilterSpec)
+SPEC_LOOKUPS = {
+    "eq": lambda field, value: {field: value},
+    "in": lambda field, value: {f"{field}__in": [value]},
+    # Верхняя граница с заведомо редким значением - избирательное условие диапазона
+    "range": lambda field, value: {f"{field}__lte": value},
+    "prefix": lambda field, value: {f"{field}__prefix": value},
+}
+
+
+def spec_queries(repository) -> dict:
+    """Запросы страниц списка с фильтрами и сортировками спецификации репозитория.
+
+    Args:
+        repository: Класс репозитория с `filter_spec`.
+
+    Returns:
+        dict: Описание запроса (фильтр или сортировка) и сам запрос.
+    """
+    spec = repository.filter_spec
+    queries = {}
+    for field, operation in spec.filters.items():
+        value = SAMPLE_VALUES[getattr(repository.model, field).type.python_type]
+        filters = SPEC_LOOKUPS[operation](field, value)
+        key = ", ".join(f"{name}=..." for name in filters)
+        queries[f"get_page({key})"] = repository._page_query(50, 0, DEFAULT_SORT, filters)
+        queries[f"count({key})"] = repository._count_query(filters)
+    for field in spec.sorts:
+        for sort in (field, f"-{field}"):
+            queries[f"get_page(sort={sort})"] = repository._page_query(50, 50, sort, {})
+    return queries
+
+
+def _full_scans(plan: dict) -> list[str]:
+    """Узлы плана, читающие таблицу целиком.
+
+    Кроме Seq Scan учитывается полный обход индекса без условия поиска
+    (Index Cond) с фильтрацией строк: так планировщик выполняет сортировку
+    по первичному ключу, когда для фильтра нет подходящего индекса.
+    """
+    scans = []
+    if plan["Node Type"] == "Seq Scan":
+        scans.append(f"Seq Scan on {plan['Relation Name']}")
+    elif plan["Node Type"] in ("Index Scan", "Index Only Scan") and "Index Cond" not in plan and "Filter" in plan:
+        scans.append(f"Full {plan['Node Type']} using {plan['Index Name']}")
+    for child in plan.get("Plans", []):
+        scans.extend(_full_scans(child))
+    return scans
+
+
+async def find_full_scans(repositories) -> list[str]:
+    """Проверить, что запросы репозиториев с фильтрами обслуживаются индексами.
+
+    Для каждого поля из `filter_fields` репозитория выполняется EXPLAIN
+    запросов методов чтения, для спецификации списка `filter_spec` - запросов
+    страниц с каждым ее фильтром и сортировкой. Последовательное сканирование запрещается
+    (`enable_seqscan = off`): если планировщик все равно читает таблицу
+    целиком, подходящего индекса нет. Поэтому проверка не зависит от объема данных.
+
+    Args:
+        repositories: Проверяемые классы репозиториев.
+
+    Returns:
+        list[str]: Описания запросов, читающих таблицу целиком.
+    """
+    problems = []
+    async with async_session_maker() as session:
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        for repository in repositories:
+            queries = {
+                f"{method}({field}=...)": query
+                for field in repository.filter_fields
+                for method, query in filter_queries(repository, field).items()
+            }
+            if repository.filter_spec is not None:
+                queries.update(spec_queries(repository))
+            for description, query in queries.items():
+                sql = query.compile(
+                    dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+                )
+                result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+                plan = result.scalar_one()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                for scan in _full_scans(plan[0]["Plan"]):
+                    problems.append(f"{repository.__name__}.{description}: {scan}")
+    return problems
@@ -0,0 +1,275 @@
+"""Фильтры и сортировка списков записей, задаваемые параметрами запроса.
+
+Для каждого модуля объявляется `FilterSpec`: по каким полям и какими
+операциями можно фильтровать список и по каким полям сортировать. Параметры
+запроса преобразуются в фильтры репозитория вида `поле__операция`, которые
+компилируются в условия, обслуживаемые индексами (см. `compile_filters`):
+
+    * `eq` - `?поле=значение`: `поле = :значение`;
+    * `in` - `?поле=a,b,c`: `поле = ANY(:значения)` - один параметр-массив
+      при любом количестве значений, запрос готовится драйвером один раз;
+    * `range` - `?поле_from=...&поле_to=...`: `поле >= :from AND поле <= :to`;
+    * `prefix` - `?поле_prefix=...`: `поле LIKE 'префикс%'`, обслуживается
+      индексом с классом операторов text_pattern_ops (обычный индекс при
+      сопоставлении, отличном от C, для LIKE не используется).
+
+При создании спецификации каждая операция и сортировка проверяется по
+индексам модели: объявить фильтр или сортировку, для которых нет подходящего
+индекса, нельзя. Неизвестные параметры, значения и сортировки отклоняются
+с ошибкой, поэтому запрос к списку не превращается в чтение всей таблицы.
+"""
+import functools
+import inspect
+from typing import Any, Literal, NamedTuple, Optional
+
+from fastapi import HTTPException, Query
+from fastapi.dependencies.utils import get_flat_dependant
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import any_, literal
+from sqlalchemy.dialects.postgresql import ARRAY
+from starlette import status
+from starlette.requests import Request
+
+# Операции фильтров
+EQ = "eq"
+IN = "in"
+RANGE = "range"
+PREFIX = "prefix"
+
+MAX_VALUES = 100  # Максимальное количество значений в фильтре-списке (как размер страницы)
+DEFAULT_SORT = "-id"  # Сортировка списков по умолчанию: сначала новые записи
+
+# Классы операторов индексов, обслуживающих LIKE 'префикс%' при любом сопоставлении
+PATTERN_OPS = ("text_pattern_ops", "varchar_pattern_ops")
+
+
+def _like_prefix(value: str) -> str:
+    """Шаблон LIKE для поиска по префиксу (символы шаблона в значении экранируются)."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+# Операции фильтров репозитория (`поле__операция`) и соответствующие им условия
+LOOKUPS = {
+    "in": lambda column, value: column == any_(literal(list(value), ARRAY(column.type))),
+    "gte": lambda column, value: column >= value,
+    "lte": lambda column, value: column <= value,
+    "prefix": lambda column, value: column.like(_like_prefix(value)),
+}
+
+
+def compile_filters(model, filters: dict) -> list:
+    """Преобразовать фильтры репозитория в условия WHERE.
+
+    Args:
+        model: Модель SQLAlchemy.
+        filters (dict): Фильтры: ключ `поле` - равенство (как в `filter_by`),
+            ключ `поле__операция` - операция из LOOKUPS.
+
+    Returns:
+        list: Условия запроса.
+
+    Raises:
+        ValueError: Если у модели нет поля или операция неизвестна.
+    """
+    conditions = []
+    for key, value in filters.items():
+        field, _, lookup = key.partition("__")
+        column = getattr(model, field, None)
+        if column is None or not hasattr(column, "type"):
+            raise ValueError(f"Неизвестное поле фильтра: {field}")
+        if not lookup:
+            conditions.append(column == value)
+        elif lookup in LOOKUPS:
+            conditions.append(LOOKUPS[lookup](column, value))
+        else:
+            raise ValueError(f"Неизвестная операция фильтра: {key}")
+    return conditions
+
+
+def compile_sort(model, sort: str) -> list:
+    """Преобразовать сортировку (`поле` или `-поле` по убыванию) в ORDER BY.
+
+    Записи с одинаковым значением поля упорядочиваются по `id` в том же
+    направлении, поэтому порядок страниц однозначен.
+    """
+    field = sort.lstrip("-")
+    descending = sort.startswith("-")
+    columns = [getattr(model, field)] if field == "id" else [getattr(model, field), model.id]
+    return [column.desc() if descending else column.asc() for column in columns]
+
+
+def _leading_indexes(model) -> dict[str, set]:
+    """Столбцы, с которых начинаются B-tree индексы таблицы, и классы операторов этих индексов.
+
+    Класс операторов по умолчанию обозначается None. Индексы других типов
+    (GIN и т.п.) операции фильтров и сортировки не обслуживают.
+    """
+    table = model.__table__
+    leading: dict[str, set] = {}
+    primary_key = list(table.primary_key.columns)
+    if primary_key:
+        leading.setdefault(primary_key[0].name, set()).add(None)
+    for index in table.indexes:
+        if (index.dialect_options["postgresql"]["using"] or "btree") != "btree":
+            continue
+        column = index.expressions[0]
+        name = getattr(column, "name", None)
+        if name is None:
+            continue
+        ops = index.dialect_options["postgresql"]["ops"] or {}
+        leading.setdefault(name, set()).add(ops.get(name))
+    return leading
+
+
+# Названия параметров запроса маршрутов (по id маршрута)
+_route_params: dict[int, frozenset[str]] = {}
+
+
+def _known_params(route) -> frozenset[str]:
+    """Названия всех параметров запроса маршрута, включая параметры его зависимостей."""
+    params = _route_params.get(id(route))
+    if params is None:
+        dependant = get_flat_dependant(route.dependant)
+        params = _route_params[id(route)] = frozenset(param.alias for param in dependant.query_params)
+    return params
+
+
+class ListQuery(NamedTuple):
+    """Разобранные параметры списка: фильтры репозитория и сортировка."""
+    filters: dict[str, Any]
+    sort: str = DEFAULT_SORT
+
+
+class FilterSpec:
+    """Допустимые фильтры и сортировки списка записей модели.
+
+    Экземпляр - зависимость FastAPI: параметры запроса описываются в
+    документации и разбираются в `ListQuery`.
+
+    Пример использования:
+
+    ```python
+    class ProductRepository(BaseRepository):
+        filter_spec = FilterSpec(Product, {"price": RANGE, "name": PREFIX}, sorts=("id", "price"))
+
+    @router.get("/")
+    async def read_products(query: ListQuery = Depends(ProductRepository.filter_spec)):
+        return await paginate_response(ProductRepository, Product, sort=query.sort, **query.filters)
+    ```
+
+    Args:
+        model: Модель SQLAlchemy.
+        filters (dict): Поля и операции фильтров (EQ, IN, RANGE или PREFIX).
+        sorts (tuple): Поля, по которым можно сортировать (по возрастанию `поле`,
+            по убыванию `-поле`). Пустой кортеж - параметра сортировки нет.
+
+    Raises:
+        ValueError: Если для фильтра или сортировки нет подходящего индекса.
+    """
+
+    def __init__(self, model, filters: dict[str, str], sorts: tuple[str, ...] = ("id",)):
+        self.model = model
+        self.filters = filters
+        self.sorts = sorts
+        self._check_indexes()
+        self._adapters = {
+            field: TypeAdapter(list[self._python_type(field)])
+            for field, operation in filters.items() if operation == IN
+        }
+        self.__signature__ = self._signature()
+
+    def _python_type(self, field: str) -> type:
+        return getattr(self.model, field).type.python_type
+
+    def _check_indexes(self) -> None:
+        leading = _leading_indexes(self.model)
+        table = self.model.__tablename__
+        for field, operation in self.filters.items():
+            ops = leading.get(field, set())
+            if operation == PREFIX:
+                supported = bool(ops & set(PATTERN_OPS))
+            elif operation == RANGE:
+                supported = None in ops
+            elif operation in (EQ, IN):
+                supported = bool(ops)
+            else:
+                raise ValueError(f"Неизвестная операция фильтра {table}.{field}: {operation}")
+            if not supported:
+                raise ValueError(f"Нет индекса для фильтра {table}.{field} ({operation})")
+        for field in self.sorts:
+            if None not in leading.get(field, set()):
+                raise ValueError(f"Нет индекса для сортировки {table}.{field}")
+
+    @functools.cached_property
+    def unsorted(self) -> "FilterSpec":
+        """Спецификация с теми же фильтрами без сортировки (для курсорной пагинации и выгрузки)."""
+        return FilterSpec(self.model, self.filters, sorts=())
+
+    def _signature(self) -> inspect.Signature:
+        """Сигнатура зависимости: параметры запроса для FastAPI и документации."""
+        params = [inspect.Parameter("request", inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=Request)]
+
+        def add(name: str, annotation, description: str, **kwargs) -> None:
+            params.append(inspect.Parameter(
+                name, inspect.Parameter.KEYWORD_ONLY, annotation=annotation,
+                default=Query(None, description=description, **kwargs),
+            ))
+
+        for field, operation in self.filters.items():
+            python_type = self._python_type(field)
+            if operation == EQ:
+                add(field, Optional[python_type], f"Равно {field}")
+            elif operation == IN:
+                add(field, Optional[str], f"Значения {field} через запятую (не более {MAX_VALUES})")
+            elif operation == RANGE:
+                add(f"{field}_from", Optional[python_type], f"{field} не меньше")
+                add(f"{field}_to", Optional[python_type], f"{field} не больше")
+            elif operation == PREFIX:
+                add(f"{field}_prefix", Optional[str], f"{field} начинается с", min_length=1)
+        if self.sorts:
+            values = tuple(value for field in self.sorts for value in (field, f"-{field}"))
+            params.append(inspect.Parameter(
+                "sort", inspect.Parameter.KEYWORD_ONLY, annotation=Literal[values],
+                default=Query(DEFAULT_SORT, description="Сортировка: поле или -поле (по убыванию)"),
+            ))
+        return inspect.Signature(params)
+
+    async def __call__(self, request: Request, **params) -> ListQuery:
+        route = request.scope.get("route")
+        if route is not None:
+            unknown = set(request.query_params) - _known_params(route)
+            if unknown:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Недопустимые параметры: {', '.join(sorted(unknown))}",
+                )
+
+        filters = {}
+        for field, operation in self.filters.items():
+            if operation == EQ and params[field] is not None:
+                filters[field] = params[field]
+            elif operation == IN and params[field] is not None:
+                filters[f"{field}__in"] = self._parse_values(field, params[field])
+            elif operation == RANGE:
+                if params[f"{field}_from"] is not None:
+                    filters[f"{field}__gte"] = params[f"{field}_from"]
+                if params[f"{field}_to"] is not None:
+                    filters[f"{field}__lte"] = params[f"{field}_to"]
+            elif operation == PREFIX and params[f"{field}_prefix"] is not None:
+                filters[f"{field}__prefix"] = params[f"{field}_prefix"]
+        return ListQuery(filters, params.get("sort", DEFAULT_SORT))
+
+    def _parse_values(self, field: str, raw: str) -> list:
+        """Разобрать значения фильтра-списка (через запятую, повторы учитываются один раз)."""
+        values = list(dict.fromkeys(value.strip() for value in raw.split(",") if value.strip()))
+        if not values or len(values) > MAX_VALUES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Параметр {field} должен содержать от 1 до {MAX_VALUES} значений",
+            )
+        try:
+            return self._adapters[field].validate_python(values)
+        except ValidationError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"Недопустимое значение {field}"
+            ) from None
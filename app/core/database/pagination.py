@@ -0,0 +1,89 @@
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from fastapi_pagination.api import create_page, resolve_params
+from fastapi_pagination.bases import AbstractPage, AbstractParams, CursorRawParams
+from pydantic import BaseModel
+from starlette import status
+
+from app.core.serialization import dump_trusted
+from .filters import DEFAULT_SORT
+
+
+class PageResponse(ORJSONResponse):
+    """Ответ со страницей записей, сформированный без валидации записей схемой.
+
+    Атрибут `page` - страница без записей (общее количество, курсоры и т.п.).
+    """
+
+    def __init__(self, page: AbstractPage, items: list[dict]):
+        self.page = page
+        super().__init__({**page.model_dump(mode="json"), "items": items})
+
+
+async def paginate_response(
+    repository,
+    schema: type[BaseModel],
+    params: AbstractParams | None = None,
+    sort: str = DEFAULT_SORT,
+    **filters,
+) -> PageResponse:
+    """Страница записей репозитория в виде готового JSON-ответа.
+
+    Постраничная выборка выполняется на стороне базы данных: вместо загрузки
+    всей таблицы в память запрашивается только нужная страница. Тип пагинации
+    определяется параметрами страницы маршрута:
+
+        * `Page` / `Params` - LIMIT/OFFSET и общее количество записей;
+        * `CursorPage` / `CursorParams` - keyset-пагинация по `id`
+          (записи всегда упорядочены по убыванию `id`, `sort` не учитывается).
+
+    Записи не проверяются схемой ни при создании страницы, ни в FastAPI при
+    подготовке ответа: данные берутся из атрибутов записей (см. `dump_trusted`)
+    и кодируются orjson. Тип ответа для документации задается аннотацией
+    маршрута (`-> Page[Schema]`).
+
+    Args:
+        repository: Класс репозитория (наследник BaseRepository).
+        schema: Pydantic-схема записи, определяющая набор полей ответа.
+        params: Параметры пагинации. По умолчанию берутся из контекста запроса
+            (см. `add_pagination`).
+        sort (str): Поле сортировки страницы LIMIT/OFFSET (`-поле` - по убыванию).
+        filters (dict): Словарь фильтров для поиска записей.
+
+    Returns:
+        PageResponse: Ответ со страницей записей.
+    """
+    params = resolve_params(params)
+    items, page_data = await _fetch_page(repository, params, sort, filters)
+    page = create_page([], params=params, **page_data)
+    return PageResponse(page, dump_trusted(schema, items))
+
+
+async def _fetch_page(repository, params: AbstractParams, sort: str, filters: dict) -> tuple[list, dict]:
+    """Запросить записи страницы и данные для ее создания (`create_page`)."""
+    raw_params = params.to_raw_params()
+
+    if isinstance(raw_params, CursorRawParams):
+        cursor = _parse_cursor(raw_params.cursor)
+        items, next_cursor = await repository.get_page_after(
+            raw_params.size, cursor, **filters
+        )
+        return items, {"next_": str(next_cursor) if next_cursor is not None else None}
+
+    items = await repository.get_page(
+        raw_params.limit, raw_params.offset or 0, sort, **filters
+    )
+    total = await repository.count(**filters) if raw_params.include_total else None
+    return items, {"total": total}
+
+
+def _parse_cursor(cursor) -> int | None:
+    """Преобразовать декодированный курсор страницы в `id` записи."""
+    if cursor is None:
+        return None
+    try:
+        return int(cursor)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor value"
+        ) from None
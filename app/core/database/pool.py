@@ -0,0 +1,45 @@
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import record_pool_wait
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Пул соединений, учитывающий время получения соединения.
+
+    Время получения включает ожидание свободного соединения, создание нового
+    соединения и его проверку (pre-ping). Большое время ожидания означает,
+    что пулу воркера не хватает соединений.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_count = 0  # Количество выданных соединений
+        self.checkout_wait_total = 0.0  # Суммарное время получения соединений, сек
+        self.checkout_wait_max = 0.0  # Максимальное время получения соединения, сек
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            wait = time.perf_counter() - start
+            self.checkout_count += 1
+            self.checkout_wait_total += wait
+            self.checkout_wait_max = max(self.checkout_wait_max, wait)
+            record_pool_wait(wait)
+
+    def stats(self) -> dict:
+        """Текущее состояние пула и статистика получения соединений."""
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "timeout": self.timeout(),
+            "checkout_count": self.checkout_count,
+            "checkout_wait_avg": self.checkout_wait_total / self.checkout_count if self.checkout_count else 0.0,
+            "checkout_wait_max": self.checkout_wait_max,
+        }
@@ -0,0 +1,117 @@
+import asyncio
+import itertools
+import logging
+
+from sqlalchemy import Engine, event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSet:
+    """Реплики для чтения: выбор по кругу среди доступных и проверка доступности.
+
+    Недоступная реплика исключается из выбора до следующей успешной проверки
+    (см. `monitor`). Реплика также исключается сразу при разрыве соединения
+    с ней во время выполнения запроса.
+    """
+
+    def __init__(self):
+        self.engines: list[AsyncEngine] = []
+        self._healthy: list[AsyncEngine] = []
+        self._counter = itertools.count()
+
+    def configure(self, engines: list[AsyncEngine]) -> None:
+        """Задать движки реплик текущего процесса (все считаются доступными)."""
+        self.engines = list(engines)
+        self._healthy = list(engines)
+        for engine in engines:
+            event.listen(engine.sync_engine, "handle_error", self._on_error)
+
+    def choose(self) -> AsyncEngine | None:
+        """Выбрать реплику для чтения или None, если доступных реплик нет."""
+        healthy = self._healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def is_healthy(self, engine: AsyncEngine) -> bool:
+        return engine in self._healthy
+
+    def _set_healthy(self, engine: AsyncEngine, healthy: bool) -> None:
+        if healthy == self.is_healthy(engine):
+            return
+        if healthy:
+            logger.warning("Реплика %s снова доступна", engine.url.host)
+        else:
+            logger.warning("Реплика %s недоступна, чтение перенаправлено", engine.url.host)
+        healthy_engines = set(self._healthy)
+        if healthy:
+            healthy_engines.add(engine)
+        else:
+            healthy_engines.discard(engine)
+        # Список заменяется целиком с сохранением порядка реплик
+        self._healthy = [item for item in self.engines if item in healthy_engines]
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect:
+            for engine in self.engines:
+                if engine.sync_engine is context.engine:
+                    self._set_healthy(engine, False)
+
+    async def check(self, timeout: float = 2) -> None:
+        """Проверить доступность всех реплик."""
+        await asyncio.gather(*(self._check(engine, timeout) for engine in self.engines))
+
+    async def _check(self, engine: AsyncEngine, timeout: float) -> None:
+        try:
+            async with asyncio.timeout(timeout):
+                async with engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+        except Exception:
+            self._set_healthy(engine, False)
+        else:
+            self._set_healthy(engine, True)
+
+    async def monitor(self, interval: float) -> None:
+        """Периодически проверять доступность реплик (фоновая задача воркера)."""
+        while self.engines:
+            await asyncio.sleep(interval)
+            await self.check(timeout=interval)
+
+    async def dispose(self) -> None:
+        """Закрыть соединения пулов реплик."""
+        for engine in self.engines:
+            event.remove(engine.sync_engine, "handle_error", self._on_error)
+            await engine.dispose()
+        self.engines = []
+        self._healthy = []
+
+
+# Реплики текущего процесса (заполняются в init_engine)
+replicas = ReplicaSet()
+
+
+class RoutingSession(Session):
+    """Сессия, направляющая чтение на реплики, а изменения - на основной сервер.
+
+    Реплика выбирается один раз на сессию, поэтому все чтения запроса идут
+    через одно соединение. После первого изменения данных в сессии (см.
+    `session_scope(commit=True)`) и чтение выполняется на основном сервере:
+    запрос видит собственные изменения, которые еще не дошли до реплики.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        # Сессия, привязанная к конкретному соединению (например, при прогреве), не маршрутизируется
+        if isinstance(self.bind, Engine) and not self._writes(clause):
+            replica = self.info.get("replica")
+            if replica is None or not replicas.is_healthy(replica):
+                replica = self.info["replica"] = replicas.choose()
+            if replica is not None:
+                return replica.sync_engine
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+    def _writes(self, clause) -> bool:
+        return self._flushing or self.info.get("writes", False) or isinstance(clause, UpdateBase)
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .base_repository import registry
+from .database import async_session_maker, current_session, get_engine
+from .routing import replicas
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up(connections: int) -> None:
+    """Прогреть пул соединений и запросы репозиториев при запуске воркера.
+
+    Открывает `connections` соединений пула основного сервера и каждой
+    доступной реплики и на каждом соединении выполняет основные
+    запросы всех зарегистрированных репозиториев (см. `BaseRepository.warm_up`).
+    Так первые запросы после развертывания не тратят время на установку
+    соединения, компиляцию запроса SQLAlchemy и prepare в asyncpg: кэш
+    компиляции общий для движка, подготовленные запросы - свои у каждого соединения.
+
+    Args:
+        connections (int): Количество прогреваемых соединений.
+    """
+    started_at = time.monotonic()
+    await replicas.check()
+    engines = [get_engine(), *(engine for engine in replicas.engines if replicas.is_healthy(engine))]
+    async with AsyncExitStack() as stack:
+        opened = await asyncio.gather(*(
+            stack.enter_async_context(engine.connect())
+            for engine in engines
+            for _ in range(connections)
+        ))
+        await asyncio.gather(*(_warm_up_connection(connection) for connection in opened))
+    logger.info(
+        "Прогрев завершен: серверов %s, соединений %s, репозиториев %s, %.3f с",
+        len(engines), connections, len(registry), time.monotonic() - started_at,
+    )
+
+
+async def _warm_up_connection(connection: AsyncConnection) -> None:
+    """Выполнить запросы репозиториев на соединении и откатить транзакцию."""
+    async with async_session_maker(bind=connection) as session:
+        # Сессия помечается как изменявшая данные, чтобы запросы не обслуживались из кэша
+        session.info["writes"] = True
+        token = current_session.set(session)
+        try:
+            for repository in registry:
+                await repository.warm_up()
+        finally:
+            current_session.reset(token)
+            await session.rollback()
@@ -0,0 +1,61 @@
+"""Пакетная загрузка записей по ключам (по образцу DataLoader).
+
+Все вызовы `load`, сделанные в одной итерации цикла событий (например,
+несколько корутин, запущенных через asyncio.gather), объединяются в один
+вызов функции пакетной загрузки, результаты раздаются вызывающим.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class BatchLoader:
+    """Загрузчик, объединяющий одновременные запросы записей по ключу.
+
+    Args:
+        load_many: Функция пакетной загрузки: принимает список уникальных
+            ключей и возвращает словарь {ключ: запись}. Ключи, отсутствующие
+            в словаре, получают None.
+    """
+
+    def __init__(self, load_many: Callable[[list], Awaitable[dict]]):
+        self._load_many = load_many
+        self._pending: dict[Hashable, list[asyncio.Future]] = {}
+        self._tasks: set[asyncio.Task] = set()  # Выполняющиеся пакеты (ссылки защищают задачи от сборки мусора)
+
+    def load(self, key: Hashable) -> asyncio.Future:
+        """Запросить запись по ключу.
+
+        Returns:
+            asyncio.Future: Ожидаемый результат - запись или None.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            # Пакет отправляется после того, как выполнятся все готовые задачи текущей итерации
+            loop.call_soon(self._dispatch)
+        self._pending.setdefault(key, []).append(future)
+        return future
+
+    async def load_many(self, keys: list) -> list[Any]:
+        """Запросить записи по списку ключей (одним пакетом с другими запросами)."""
+        return await asyncio.gather(*(self.load(key) for key in keys))
+
+    def _dispatch(self) -> None:
+        batch, self._pending = self._pending, {}
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[Hashable, list[asyncio.Future]]) -> None:
+        try:
+            found = await self._load_many(list(batch))
+        except Exception as error:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(error)
+            return
+        for key, futures in batch.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(found.get(key))
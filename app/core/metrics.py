@@ -0,0 +1,191 @@
+"""Метрики запросов к базе данных и HTTP-запросов.
+
+Время выполнения команд SQL, количество строк и время получения соединения
+из пула собираются событиями движка (см. `instrument_engine`) и суммируются
+по HTTP-запросу. Итоги запроса отдаются клиенту в заголовке `Server-Timing`
+и накапливаются в метриках Prometheus по маршруту (`operation_id` из
+`custom_generate_unique_id`), доступных по адресу `/metrics`.
+
+При запуске под gunicorn метрики всех воркеров объединяются через файлы
+в каталоге PROMETHEUS_MULTIPROC_DIR (см. gunicorn_conf.py).
+"""
+import os
+import time
+from contextvars import ContextVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Границы интервалов гистограмм для команд SQL и ожидания соединения (секунды)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["route", "method", "status"],
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Суммарное время команд SQL за HTTP-запрос",
+    ["route"],
+    buckets=DB_BUCKETS,
+)
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Время выполнения команды SQL",
+    ["route"],
+    buckets=DB_BUCKETS,
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Время получения соединения из пула",
+    ["route"],
+    buckets=DB_BUCKETS,
+)
+DB_ROWS = Counter(
+    "db_rows_total",
+    "Количество строк, возвращенных или измененных командами SQL",
+    ["route"],
+)
+
+REPOSITORY_READS = Counter(
+    "repository_reads_total",
+    "Чтения репозиториев по исходу объединения одинаковых запросов: "
+    "leader - выполнен запрос, coalesced - результат выполняющегося запроса, recent - недавний результат",
+    ["table", "method", "outcome"],
+)
+
+
+class RequestMetrics:
+    """Показатели работы с базой данных в рамках одного HTTP-запроса."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.statements: list[float] = []  # Время выполнения каждой команды SQL
+        self.pool_waits: list[float] = []  # Время получения каждого соединения
+        self.rows = 0  # Строк возвращено или изменено
+
+    @property
+    def db_time(self) -> float:
+        return sum(self.statements)
+
+    def server_timing(self) -> str:
+        """Значение заголовка Server-Timing (длительности в миллисекундах)."""
+        total = time.perf_counter() - self.started_at
+        return ", ".join((
+            f'db;dur={self.db_time * 1000:.2f};desc="{len(self.statements)} statements, {self.rows} rows"',
+            f"pool;dur={sum(self.pool_waits) * 1000:.2f}",
+            f"app;dur={(total - self.db_time) * 1000:.2f}",
+            f"total;dur={total * 1000:.2f}",
+        ))
+
+    def observe(self, route: str, method: str, status: int) -> None:
+        """Добавить показатели запроса в метрики Prometheus."""
+        REQUEST_DURATION.labels(route, method, status).observe(time.perf_counter() - self.started_at)
+        REQUEST_DB_DURATION.labels(route).observe(self.db_time)
+        statement_duration = DB_STATEMENT_DURATION.labels(route)
+        for duration in self.statements:
+            statement_duration.observe(duration)
+        pool_wait = DB_POOL_WAIT.labels(route)
+        for wait in self.pool_waits:
+            pool_wait.observe(wait)
+        if self.rows:
+            DB_ROWS.labels(route).inc(self.rows)
+
+
+# Показатели текущего HTTP-запроса (вне запроса - None, показатели не собираются)
+current_metrics: ContextVar[RequestMetrics | None] = ContextVar("current_metrics", default=None)
+
+
+def record_pool_wait(wait: float) -> None:
+    """Учесть время получения соединения из пула в показателях текущего запроса."""
+    metrics = current_metrics.get()
+    if metrics is not None:
+        metrics.pool_waits.append(wait)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_metrics.get() is not None:
+        # Соединение выполняет команды по одной, поэтому достаточно одного значения
+        conn.info["query_started_at"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = current_metrics.get()
+    started = conn.info.pop("query_started_at", None)
+    if metrics is None or started is None:
+        return
+    metrics.statements.append(time.perf_counter() - started)
+    metrics.rows += max(cursor.rowcount, 0)
+
+
+def _handle_error(context):
+    # Команда с ошибкой тоже занимала базу данных и учитывается без строк
+    metrics = current_metrics.get()
+    started = context.connection.info.pop("query_started_at", None) if context.connection is not None else None
+    if metrics is not None and started is not None:
+        metrics.statements.append(time.perf_counter() - started)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Подключить сбор показателей выполнения команд SQL к движку."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """ASGI middleware, собирающее показатели запроса.
+
+    Добавляет к ответу заголовок Server-Timing и после отправки ответа
+    учитывает показатели в метриках Prometheus по маршруту запроса.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", metrics.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_metrics.reset(token)
+            # Маршрут известен после обработки: маршрутизатор дополняет scope запроса
+            route = getattr(scope.get("route"), "unique_id", None) or "unmatched"
+            metrics.observe(route, scope["method"], status)
+
+
+def metrics_endpoint(request: Request) -> Response:
+    """Метрики в формате Prometheus (всех воркеров в режиме multiprocess)."""
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,28 @@
+from fastapi import HTTPException, Query
+from starlette import status
+
+MAX_IDS = 100  # Максимальное количество ID в одном запросе (как размер страницы)
+
+
+def ids_param(
+    ids: str | None = Query(None, description="ID записей через запятую (не более 100)"),
+) -> list[int] | None:
+    """
+    Разбор параметра ids (ID записей через запятую) для получения нескольких записей.
+
+    Повторяющиеся ID учитываются один раз, порядок сохраняется.
+    """
+    if ids is None:
+        return None
+    try:
+        values = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Недопустимое значение ids"
+        ) from None
+    if not values or len(values) > MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Параметр ids должен содержать от 1 до {MAX_IDS} ID",
+        )
+    return values
@@ -0,0 +1,101 @@
+"""Профилирование отдельных запросов (cProfile).
+
+Запрос профилируется, если в нем передан заголовок `X-Profile`. В окружении
+local достаточно любого значения заголовка, в остальных окружениях значение
+должно быть подписью, выданной командой `python -m app.cli profile-header`
+(HMAC пути запроса и срока действия с ключом SECRET_KEY).
+
+Отчет сохраняется в каталог PROFILER_DIR в двух видах: `.prof` для просмотра
+(`python -m pstats`, snakeviz) и текстовая сводка `.txt`. Имя отчета
+возвращается в заголовке ответа `X-Profile-Report`. Middleware подключается
+только при заданном PROFILER_DIR, иначе накладных расходов нет.
+"""
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import io
+import os
+import pstats
+import time
+
+from app.core.config.config import settings
+
+PROFILE_HEADER = b"x-profile"
+REPORT_HEADER = b"x-profile-report"
+
+
+def sign_profile_request(path: str, expires: int) -> str:
+    """Подписать разрешение на профилирование запросов к пути.
+
+    Args:
+        path (str): Путь запроса (без строки параметров).
+        expires (int): Время окончания действия подписи (Unix time).
+
+    Returns:
+        str: Значение заголовка X-Profile.
+    """
+    signature = hmac.new(
+        settings.SECRET_KEY.encode(), f"{path}:{expires}".encode(), hashlib.sha256
+    ).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def _is_allowed(value: str, path: str) -> bool:
+    """Проверить значение заголовка X-Profile для пути запроса."""
+    if settings.ENVIRONMENT == "local":
+        return True
+    expires, _, _ = value.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(value, sign_profile_request(path, int(expires)))
+
+
+class ProfilerMiddleware:
+    """ASGI middleware, профилирующее запросы с заголовком X-Profile.
+
+    cProfile учитывает все, что выполняется в потоке воркера, поэтому
+    одновременно профилируется только один запрос, а отчет может включать
+    работу других запросов, обрабатываемых в это время.
+    """
+
+    def __init__(self, app, directory: str):
+        self.app = app
+        self.directory = directory
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._lock.locked():
+            await self.app(scope, receive, send)
+            return
+        value = dict(scope["headers"]).get(PROFILE_HEADER)
+        if value is None or not _is_allowed(value.decode("latin-1"), scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        async with self._lock:
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{scope['path'].strip('/').replace('/', '_')}"
+
+            async def send_with_report(message):
+                if message["type"] == "http.response.start":
+                    headers = [*message.get("headers", []), (REPORT_HEADER, name.encode())]
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await self.app(scope, receive, send_with_report)
+            finally:
+                profile.disable()
+                await asyncio.to_thread(self._save, profile, name)
+
+    def _save(self, profile: cProfile.Profile, name: str) -> None:
+        """Сохранить отчет профилировщика в каталог PROFILER_DIR."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        profile.dump_stats(f"{path}.prof")
+        summary = io.StringIO()
+        pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(50)
+        with open(f"{path}.txt", "w") as file:
+            file.write(summary.getvalue())
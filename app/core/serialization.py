@@ -0,0 +1,69 @@
+"""Сериализация результатов репозиториев без повторной валидации.
+
+Обычный путь ответа FastAPI для `-> Page[Schema]` проверяет каждую запись
+схемой дважды (при создании страницы и при подготовке ответа) и только потом
+кодирует результат в JSON. Записи, полученные из репозитория, уже имеют
+типы столбцов модели, поэтому для них достаточно взять значения полей схемы
+из атрибутов и закодировать их orjson (см. `dump_trusted`).
+"""
+import functools
+import types
+import typing
+from typing import Any, Callable
+
+from pydantic import BaseModel
+
+
+def _nested_schema(annotation) -> type[BaseModel] | None:
+    """Схема вложенного объекта поля (в том числе Optional[Schema]) или None."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        for argument in typing.get_args(annotation):
+            if isinstance(argument, type) and issubclass(argument, BaseModel):
+                return argument
+    return None
+
+
+@functools.cache
+def _dumper(schema: type[BaseModel]) -> Callable[[Any], dict]:
+    """Построить (и запомнить) функцию, формирующую словарь полей схемы из атрибутов объекта."""
+    fields = [
+        (name, _dumper(nested) if (nested := _nested_schema(field.annotation)) else None)
+        for name, field in schema.model_fields.items()
+    ]
+    if not any(dump_nested for _, dump_nested in fields):
+        names = [name for name, _ in fields]
+
+        def dump(obj) -> dict:
+            return {name: getattr(obj, name) for name in names}
+
+        return dump
+
+    def dump(obj) -> dict:
+        data = {}
+        for name, dump_nested in fields:
+            value = getattr(obj, name)
+            data[name] = dump_nested(value) if dump_nested and value is not None else value
+        return data
+
+    return dump
+
+
+def dump_trusted(schema: type[BaseModel], items) -> list[dict]:
+    """Сформировать данные ответа из записей репозитория без валидации схемой.
+
+    Значения полей берутся из атрибутов записей (экземпляров модели или схемы)
+    как есть, кодирование в JSON выполняет ORJSONResponse. Подходит только для
+    данных, типы которых гарантированно соответствуют схеме, то есть для
+    результатов репозиториев: поля схемы должны совпадать со столбцами модели.
+
+    Args:
+        schema: Pydantic-схема записи, определяющая набор полей.
+        items: Записи репозитория.
+
+    Returns:
+        list[dict]: Данные записей для ответа.
+    """
+    dump = _dumper(schema)
+    return [dump(item) for item in items]
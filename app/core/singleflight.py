@@ -0,0 +1,100 @@
+"""Объединение одинаковых одновременных чтений (single-flight).
+
+Если несколько запросов одновременно выполняют одно и то же чтение, запрос
+к базе данных выполняет только первый из них (ведущий), остальные ожидают и
+получают его результат. После завершения результат может еще `ttl` секунд
+отдаваться без запроса к базе данных.
+"""
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Hashable
+
+# Исходы вызова: запрос выполнен (leader), получен результат выполняющегося
+# запроса (coalesced), получен недавний результат (recent)
+LEADER = "leader"
+COALESCED = "coalesced"
+RECENT = "recent"
+
+
+class SingleFlight:
+    """Выполнение не более одного одновременного вызова для каждого ключа."""
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self._recent: dict[Hashable, tuple] = {}
+        self.stats = Counter()  # Количество вызовов по исходам
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]], ttl: float = 0) -> tuple[Any, str]:
+        """Выполнить вызов или присоединиться к уже выполняющемуся с тем же ключом.
+
+        Args:
+            key: Ключ вызова (одинаковые вызовы имеют одинаковый ключ).
+            call: Функция без аргументов, возвращающая корутину вызова.
+            ttl (float): Сколько секунд после завершения отдавать полученный результат.
+
+        Returns:
+            tuple: Результат и исход вызова (LEADER, COALESCED или RECENT).
+        """
+        recent = self._recent.get(key)
+        if recent is not None:
+            self.stats[RECENT] += 1
+            return recent[0], RECENT
+
+        while (future := self._calls.get(key)) is not None:
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Ведущий вызов отменен (например, клиент закрыл соединение) - выполняем вызов сами
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            else:
+                self.stats[COALESCED] += 1
+                return result, COALESCED
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.stats[LEADER] += 1
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # Ошибка передается ожидающим вызовам, у ведущего она возникает как обычно
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            # Результат вызова, сброшенного во время выполнения (см. `forget`), не сохраняется
+            if ttl > 0 and self._calls.get(key) is future:
+                entry = (result,)
+                self._recent[key] = entry
+                asyncio.get_running_loop().call_later(ttl, self._expire, key, entry)
+            return result, LEADER
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def forget(self, match: Callable[[Hashable], bool]) -> None:
+        """Сбросить недавние результаты и выполняющиеся вызовы с подходящими ключами.
+
+        Вызывается после изменения данных: следующие вызовы с такими ключами
+        выполняются заново, а результаты уже выполняющихся вызовов
+        (начатых до изменения) передаются только ожидающим их вызовам.
+
+        Args:
+            match: Функция, принимающая ключ и возвращающая True для сбрасываемых ключей.
+        """
+        for calls in (self._recent, self._calls):
+            for key in [key for key in calls if match(key)]:
+                del calls[key]
+
+    def _expire(self, key: Hashable, entry: tuple) -> None:
+        if self._recent.get(key) is entry:
+            del self._recent[key]
+
+    def ratio(self) -> float:
+        """Доля вызовов, не потребовавших собственного запроса к базе данных."""
+        total = sum(self.stats.values())
+        return (self.stats[COALESCED] + self.stats[RECENT]) / total if total else 0.0
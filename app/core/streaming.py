@@ -0,0 +1,77 @@
+import csv
+import datetime
+import io
+from typing import AsyncIterator, Literal
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import StreamingResponse
+
+from app.core.serialization import dump_trusted
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def export_response(
+    repository, schema: type[BaseModel], export_format: ExportFormat, filename: str, **filters
+) -> StreamingResponse:
+    """Потоковая выгрузка таблицы репозитория в формате NDJSON или CSV.
+
+    Строки читаются из серверного курсора (см. `BaseRepository.stream`) и
+    отправляются клиенту частями по мере чтения, поэтому выгрузка начинается
+    сразу и не требует загрузки всей таблицы в память. Строки не проверяются
+    схемой (см. `dump_trusted`): ответ 200 уже отправлен, и ошибка валидации
+    одной строки оборвала бы выгрузку на середине.
+
+    Args:
+        repository: Класс репозитория (наследник BaseRepository).
+        schema: Pydantic-схема, определяющая набор и формат полей.
+        export_format: Формат выгрузки: "ndjson" или "csv".
+        filename: Имя файла без расширения для заголовка Content-Disposition.
+        filters (dict): Словарь фильтров для поиска записей.
+
+    Returns:
+        StreamingResponse: Ответ с потоковым телом.
+    """
+    encode = _encode_csv if export_format == "csv" else _encode_ndjson
+    return StreamingResponse(
+        encode(repository.stream(**filters), schema),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format}"'
+        },
+    )
+
+
+async def _encode_ndjson(partitions: AsyncIterator, schema: type[BaseModel]) -> AsyncIterator[bytes]:
+    """Кодировать части выгрузки в NDJSON (одна JSON-запись на строку)."""
+    async for rows in partitions:
+        yield b"".join(orjson.dumps(data) + b"\n" for data in dump_trusted(schema, rows))
+
+
+def _csv_value(value):
+    """Значение поля для CSV: дата и время в формате ISO 8601, как в JSON."""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+async def _encode_csv(partitions: AsyncIterator, schema: type[BaseModel]) -> AsyncIterator[bytes]:
+    """Кодировать части выгрузки в CSV с заголовком из полей схемы."""
+    fields = list(schema.model_fields)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    async for rows in partitions:
+        for data in dump_trusted(schema, rows):
+            writer.writerow({name: _csv_value(value) for name, value in data.items()})
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
@@ -1,11 +1,23 @@
+import asyncio  # Импорт для фоновых задач воркера
+import logging  # Импорт для журналирования
+from contextlib import asynccontextmanager  # Импорт для объявления lifespan приложения
+
 from fastapi import FastAPI  # Импорт FastAPI для создания приложения
+from fastapi.responses import ORJSONResponse  # Импорт ответа с кодированием JSON через orjson
 from fastapi.routing import APIRoute  # Импорт класса APIRoute для работы с маршрутами
 from fastapi_pagination import add_pagination
 from starlette.middleware.cors import CORSMiddleware  # Импорт CORSMiddleware для обработки CORS
 
 from app.core.config.config import settings  # Импорт настроек из модуля app.core.settings
+from app.core.database.database import dispose_engine, init_engine  # Управление движком базы данных
+from app.core.database.routing import replicas  # Реплики базы данных для чтения
+from app.core.database.warmup import warm_up  # Прогрев соединений и запросов при запуске
+from app.core.metrics import MetricsMiddleware, metrics_endpoint  # Метрики запросов
+from app.core.profiler import ProfilerMiddleware  # Профилирование отдельных запросов
 from app.modules.routers import routers  # Импорт маршрутов из модуля app.modules.routers
 
+logger = logging.getLogger(__name__)
+
 
 def custom_generate_unique_id(route: APIRoute) -> str:
     """
@@ -21,11 +33,45 @@ def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Жизненный цикл приложения в процессе воркера.
+
+    Движок и пул соединений создаются после fork воркера и закрываются при его остановке,
+    поэтому приложение можно загружать в мастер-процессе gunicorn (preload_app).
+    Перед приемом запросов соединения пула и основные запросы прогреваются,
+    после этого воркер сообщает о готовности (GET /system/ready).
+    Доступность реплик для чтения проверяется фоновой задачей.
+    """
+    app.state.ready = False
+    init_engine()
+    connections = settings.DB_WARMUP_CONNECTIONS
+    if connections is None:
+        connections = settings.db_pool_size
+    connections = min(connections, settings.db_pool_size + settings.DB_MAX_OVERFLOW)
+    if connections > 0:
+        try:
+            await warm_up(connections)
+        except Exception:
+            # Прогрев только ускоряет первые запросы: без него воркер работает,
+            # соединения будут открыты по мере необходимости
+            logger.exception("Ошибка прогрева соединений с базой данных")
+    monitor = asyncio.create_task(replicas.monitor(settings.DB_REPLICA_CHECK_INTERVAL))
+    app.state.ready = True
+    yield
+    app.state.ready = False
+    monitor.cancel()
+    await dispose_engine()
+
+
 # Создание экземпляра приложения FastAPI
 app = FastAPI(
     title=settings.PROJECT_NAME,  # Заголовок приложения из настроек
     openapi_url=f"{settings.API_V1_STR}/openapi.json",  # URL документации OpenAPI
     generate_unique_id_function=custom_generate_unique_id,  # Функция для уникальных ID маршрутов
+    lifespan=lifespan,  # Создание и закрытие ресурсов воркера
+    default_response_class=ORJSONResponse,  # Кодирование ответов в JSON через orjson
 )
 
 # Включение CORS middleware (при наличии разрешенных доменов в настройках)
@@ -40,6 +86,14 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# Профилирование запросов с заголовком X-Profile (только при заданном каталоге отчетов)
+if settings.PROFILER_DIR:
+    app.add_middleware(ProfilerMiddleware, directory=settings.PROFILER_DIR)
+
+# Время работы с базой данных в заголовке Server-Timing и метрики Prometheus по маршрутам
+app.add_middleware(MetricsMiddleware)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
 # Подключение маршрутов из модуля routers с префиксом из настроек
 app.include_router(routers, prefix=settings.API_V1_STR)
 
@@ -1,6 +1,11 @@
 from .users.models import User
 from .orders.models import Order
 from .products.models import Product
+from .analytics.models import order_rollup_products, order_rollup_users
+from app.core.database.changes import deleted_records, deleted_records_pruned
 
 
-__all__ = ["User", "Product", "Order"]
\ No newline at end of file
+__all__ = [
+    "User", "Product", "Order", "order_rollup_products", "order_rollup_users",
+    "deleted_records", "deleted_records_pruned",
+]
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""Сводные таблицы заказов (rollup) для аналитики.
+
+Строка сводной таблицы - количество заказов за день с одним товаром
+(пользователем) и статусом. Таблицы поддерживаются триггерами таблицы orders
+(см. миграцию c7d2e5f8a316): каждая команда INSERT, UPDATE или DELETE,
+включая пакетные операции и импорт, одной командой добавляет к строкам
+сводных таблиц изменение количества заказов. Запросы аналитики читают
+только сводные таблицы, их стоимость зависит от количества дней, товаров
+и статусов, а не от количества заказов.
+
+Пересчет сводных таблиц по заказам: `python -m app.cli rebuild-rollups`.
+"""
+from sqlalchemy import Column, Date, Index, Integer, String, Table
+
+from app.core.database.database import BaseModel
+
+# День заказа в сводных таблицах: дата заказа, для заказов без нее - дата создания записи.
+# Выражение совпадает с выражением в триггерах сводных таблиц.
+ORDER_DAY = "coalesce(order_date, created_ad)::date"
+
+# Количество заказов по дню, товару и статусу
+order_rollup_products = Table(
+    "order_rollup_products",
+    BaseModel.metadata,
+    Column("day", Date),
+    Column("product_id", Integer),
+    Column("status", String),
+    Column("orders_count", Integer, nullable=False, server_default="0"),
+    # Ключ строки. Пустые значения ключа (заказ без даты, товара или статуса) считаются равными.
+    Index(
+        "ux_order_rollup_products_key", "day", "product_id", "status",
+        unique=True, postgresql_nulls_not_distinct=True,
+    ),
+)
+
+# Количество заказов по дню, пользователю и статусу
+order_rollup_users = Table(
+    "order_rollup_users",
+    BaseModel.metadata,
+    Column("day", Date),
+    Column("user_id", Integer),
+    Column("status", String),
+    Column("orders_count", Integer, nullable=False, server_default="0"),
+    Index(
+        "ux_order_rollup_users_key", "day", "user_id", "status",
+        unique=True, postgresql_nulls_not_distinct=True,
+    ),
+)
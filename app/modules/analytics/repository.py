@@ -0,0 +1,175 @@
+import datetime
+
+from sqlalchemy import delete, func, insert, literal_column, select, text
+
+from app.core.database.database import session_scope
+from app.modules.orders.models import Order
+from app.modules.products.models import Product
+from .models import ORDER_DAY, order_rollup_products, order_rollup_users
+
+
+class AnalyticsRepository:
+    """Репозиторий аналитики заказов.
+
+    Запросы читают только сводные таблицы (см. models.py) и товары.
+    Выручка считается по текущей цене товара: цена на момент заказа не хранится.
+
+    Пример использования:
+
+    ```python
+    from app.modules.analytics.repository import AnalyticsRepository
+
+    # Десять товаров с наибольшей выручкой за неделю
+    top = await AnalyticsRepository.product_sales(date_from=week_ago, limit=10)
+    ```
+    """
+
+    @classmethod
+    def _conditions(cls, table, date_from, date_to, statuses) -> list:
+        """Условия выборки строк сводной таблицы за период и со статусами."""
+        conditions = []
+        if date_from is not None:
+            conditions.append(table.c.day >= date_from)
+        if date_to is not None:
+            conditions.append(table.c.day <= date_to)
+        if statuses:
+            conditions.append(table.c.status.in_(statuses))
+        return conditions
+
+    @classmethod
+    async def product_sales(
+        cls,
+        date_from: datetime.date | None = None,
+        date_to: datetime.date | None = None,
+        statuses: list[str] | None = None,
+        limit: int = 50,
+    ) -> list:
+        """Получить количество заказов и выручку по товарам.
+
+        Args:
+            date_from (date | None): Первый день периода.
+            date_to (date | None): Последний день периода.
+            statuses (list[str] | None): Учитываемые статусы заказов (по умолчанию все).
+            limit (int): Количество товаров.
+
+        Returns:
+            list[Row]: Товары по убыванию выручки (product_id, name, orders_count, revenue).
+        """
+        rollup = order_rollup_products
+        totals = (
+            select(rollup.c.product_id, func.sum(rollup.c.orders_count).label("orders_count"))
+            .where(*cls._conditions(rollup, date_from, date_to, statuses))
+            .group_by(rollup.c.product_id)
+            .subquery()
+        )
+        revenue = (totals.c.orders_count * Product.price).label("revenue")
+        query = (
+            select(totals.c.product_id, Product.name, totals.c.orders_count, revenue)
+            .select_from(totals)
+            .outerjoin(Product, Product.id == totals.c.product_id)
+            .where(totals.c.orders_count != 0)
+            .order_by(revenue.desc().nulls_last(), totals.c.product_id)
+            .limit(limit)
+        )
+        async with session_scope() as session:
+            result = await session.execute(query)
+            return result.all()
+
+    @classmethod
+    async def user_orders(
+        cls,
+        date_from: datetime.date | None = None,
+        date_to: datetime.date | None = None,
+        statuses: list[str] | None = None,
+        limit: int = 50,
+    ) -> list:
+        """Получить количество заказов по пользователям.
+
+        Args:
+            date_from (date | None): Первый день периода.
+            date_to (date | None): Последний день периода.
+            statuses (list[str] | None): Учитываемые статусы заказов (по умолчанию все).
+            limit (int): Количество пользователей.
+
+        Returns:
+            list[Row]: Пользователи по убыванию количества заказов (user_id, orders_count).
+        """
+        rollup = order_rollup_users
+        orders_count = func.sum(rollup.c.orders_count).label("orders_count")
+        query = (
+            select(rollup.c.user_id, orders_count)
+            .where(*cls._conditions(rollup, date_from, date_to, statuses))
+            .group_by(rollup.c.user_id)
+            .having(orders_count != 0)
+            .order_by(orders_count.desc(), rollup.c.user_id)
+            .limit(limit)
+        )
+        async with session_scope() as session:
+            result = await session.execute(query)
+            return result.all()
+
+    @classmethod
+    async def daily(
+        cls,
+        date_from: datetime.date | None = None,
+        date_to: datetime.date | None = None,
+        statuses: list[str] | None = None,
+    ) -> list:
+        """Получить количество заказов и выручку по дням и статусам.
+
+        Args:
+            date_from (date | None): Первый день периода.
+            date_to (date | None): Последний день периода.
+            statuses (list[str] | None): Учитываемые статусы заказов (по умолчанию все).
+
+        Returns:
+            list[Row]: Строки по возрастанию дня (day, status, orders_count, revenue).
+        """
+        rollup = order_rollup_products
+        orders_count = func.sum(rollup.c.orders_count).label("orders_count")
+        query = (
+            select(
+                rollup.c.day,
+                rollup.c.status,
+                orders_count,
+                func.sum(rollup.c.orders_count * Product.price).label("revenue"),
+            )
+            .select_from(rollup)
+            .outerjoin(Product, Product.id == rollup.c.product_id)
+            .where(*cls._conditions(rollup, date_from, date_to, statuses))
+            .group_by(rollup.c.day, rollup.c.status)
+            .having(orders_count != 0)
+            .order_by(rollup.c.day, rollup.c.status)
+        )
+        async with session_scope() as session:
+            result = await session.execute(query)
+            return result.all()
+
+    @classmethod
+    async def rebuild(cls) -> dict:
+        """Пересчитать сводные таблицы по таблице заказов.
+
+        Нужен после изменения данных в обход триггеров (например, при
+        восстановлении таблицы) или при подозрении на расхождение. Изменения
+        заказов на время пересчета блокируются, чтение сводных таблиц - нет:
+        до фиксации пересчета читаются прежние строки.
+
+        Returns:
+            dict: Количество строк каждой сводной таблицы после пересчета.
+        """
+        day = literal_column(ORDER_DAY).label("day")
+        counts = {}
+        async with session_scope(commit=True) as session:
+            # Заказы, измененные во время пересчета, не должны быть пропущены или учтены дважды
+            await session.execute(text("LOCK TABLE orders IN SHARE MODE"))
+            for rollup, key in ((order_rollup_products, Order.product_id), (order_rollup_users, Order.user_id)):
+                await session.execute(delete(rollup))
+                totals = (
+                    select(day, key, Order.status, func.count())
+                    .group_by(day, key, Order.status)
+                )
+                result = await session.execute(
+                    insert(rollup).from_select(["day", key.key, "status", "orders_count"], totals)
+                )
+                counts[rollup.name] = result.rowcount
+        return counts
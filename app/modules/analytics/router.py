@@ -0,0 +1,79 @@
+import datetime
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from starlette import status
+
+from .repository import AnalyticsRepository
+from .schemas import DailyOrders, ProductSales, UserOrders
+
+router = APIRouter()
+
+MAX_LIMIT = 500  # Максимальное количество строк рейтинга
+
+
+class Period:
+    """
+    Параметры выборки аналитики: период и статусы заказов.
+    """
+
+    def __init__(
+        self,
+        date_from: datetime.date | None = Query(None, description="Первый день периода"),
+        date_to: datetime.date | None = Query(None, description="Последний день периода"),
+        statuses: str | None = Query(None, alias="status", description="Статусы заказов через запятую"),
+    ):
+        if date_from is not None and date_to is not None and date_from > date_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="date_from не может быть больше date_to"
+            )
+        self.date_from = date_from
+        self.date_to = date_to
+        self.statuses = list(dict.fromkeys(value.strip() for value in (statuses or "").split(",") if value.strip()))
+
+    def as_dict(self) -> dict:
+        return {"date_from": self.date_from, "date_to": self.date_to, "statuses": self.statuses}
+
+
+@router.get("/products", name="Выручка по товарам")
+async def read_product_sales(
+    period: Period = Depends(),
+    limit: int = Query(50, ge=1, le=MAX_LIMIT, description="Количество товаров"),
+) -> list[ProductSales]:
+    """
+    Товары по убыванию выручки за период: количество заказов и выручка по текущей цене товара.
+    """
+    try:
+        return await AnalyticsRepository.product_sales(limit=limit, **period.as_dict())
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{str(e)}"
+        )
+
+
+@router.get("/users", name="Заказы по пользователям")
+async def read_user_orders(
+    period: Period = Depends(),
+    limit: int = Query(50, ge=1, le=MAX_LIMIT, description="Количество пользователей"),
+) -> list[UserOrders]:
+    """
+    Пользователи по убыванию количества заказов за период.
+    """
+    try:
+        return await AnalyticsRepository.user_orders(limit=limit, **period.as_dict())
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{str(e)}"
+        )
+
+
+@router.get("/daily", name="Заказы по дням")
+async def read_daily_orders(period: Period = Depends()) -> list[DailyOrders]:
+    """
+    Количество заказов и выручка по дням и статусам за период.
+    """
+    try:
+        return await AnalyticsRepository.daily(**period.as_dict())
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{str(e)}"
+        )
@@ -0,0 +1,35 @@
+import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+# Выручка по товару: количество заказов и их стоимость по текущей цене товара
+class ProductSales(BaseModel):
+    product_id: Optional[int]
+    name: Optional[str]
+    orders_count: int
+    revenue: Optional[float]
+
+    class Config:
+        from_attributes = True
+
+
+# Количество заказов пользователя
+class UserOrders(BaseModel):
+    user_id: Optional[int]
+    orders_count: int
+
+    class Config:
+        from_attributes = True
+
+
+# Заказы за день с одним статусом
+class DailyOrders(BaseModel):
+    day: Optional[datetime.date]
+    status: Optional[str]
+    orders_count: int
+    revenue: Optional[float]
+
+    class Config:
+        from_attributes = True
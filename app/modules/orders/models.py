@@ -1,6 +1,6 @@
 from app.core.database.database import BaseModel
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Index
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -8,11 +8,24 @@ from sqlalchemy.orm import relationship
 
 class Order(BaseModel):
     __tablename__ = 'orders'
+    __table_args__ = (
+        # Фильтр по пользователю/товару/статусу с сортировкой по id (списки и пагинация),
+        # ведущий столбец также обслуживает проверку внешних ключей при удалении
+        Index('ix_orders_user_id_id', 'user_id', 'id'),
+        Index('ix_orders_product_id_id', 'product_id', 'id'),
+        Index('ix_orders_status_id', 'status', 'id'),
+        # Выборки заказов со статусом за период
+        Index('ix_orders_status_order_date', 'status', 'order_date'),
+        # Фильтр и сортировка по дате создания
+        Index('ix_orders_created_ad_id', 'created_ad', 'id'),
+        # Журнал изменений для синхронизации клиентов (см. app/core/database/changes.py)
+        Index('ix_orders_change_xid_id', 'change_xid', 'id'),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'))
     product_id = Column(Integer, ForeignKey('products.id'))
-    order_date = Column(DateTime)
+    order_date = Column(DateTime, index=True)
     status = Column(String)
 
     user = relationship("User", back_populates="orders")
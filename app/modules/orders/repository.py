@@ -2,8 +2,19 @@ from sqlalchemy import select
 
 from app.core.database.base_repository import BaseRepository
 from app.core.database.database import async_session_maker
+from app.core.database.filters import EQ, FilterSpec, IN, RANGE
 from .models import Order
+from .schemas import OrderExpanded
 
 
 class OrderRepository(BaseRepository):
     model = Order
+    # Связи в результатах чтения не загружаются и равны None, как в ответе без expand
+    schema = OrderExpanded
+    filter_fields = ("user_id", "product_id", "status", "order_date")
+    # Фильтры и сортировки списка заказов в параметрах запроса
+    filter_spec = FilterSpec(
+        Order,
+        {"user_id": EQ, "product_id": EQ, "status": IN, "order_date": RANGE, "created_ad": RANGE},
+        sorts=("id", "order_date", "created_ad"),
+    )
@@ -1,29 +1,140 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi_pagination import Page, paginate
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile
+from fastapi.responses import ORJSONResponse
+from fastapi_pagination import Page
+from fastapi_pagination.api import pagination_ctx
+from fastapi_pagination.cursor import CursorPage
 from fastapi_pagination.utils import disable_installed_extensions_check
 from starlette import status
+from starlette.requests import Request
 
+from app.core.conditional import not_modified, not_modified_response, validators
+from app.core.csv_import import import_csv
+from app.core.database.changes import ChangesPage, changes_response
+from app.core.database.filters import ListQuery
+from app.core.database.pagination import paginate_response
+from app.core.params import ids_param
+from app.core.serialization import dump_trusted
+from app.core.streaming import ExportFormat, export_response
+from app.modules.products.repository import ProductRepository
+from app.modules.users.repository import UserRepository
 from .repository import OrderRepository
-from .schemas import Order, OrderCreate, OrderUpdate
+from .schemas import Order, OrderCreate, OrderExpanded, OrderUpdate, OrderUpdateItem
 
 router = APIRouter()
 
 disable_installed_extensions_check()
 
+# Связи заказа, которые можно встроить в ответ параметром expand, и их репозитории
+EXPANDABLE = {"user": UserRepository, "product": ProductRepository}
+
+
+def expand_param(
+    expand: str | None = Query(None, description="Встроить связанные объекты: user, product"),
+) -> tuple[str, ...]:
+    """
+    Разбор параметра expand (названия связей через запятую).
+    """
+    relations = tuple(sorted({name.strip() for name in (expand or "").split(",") if name.strip()}))
+    unknown = set(relations) - set(EXPANDABLE)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Недопустимое значение expand: {', '.join(sorted(unknown))}",
+        )
+    return relations
+
+
+async def related_versions(relations: tuple[str, ...]) -> list[tuple]:
+    """
+    Версии данных таблиц встроенных связей (входят в ETag ответа вместе с версией заказов).
+    """
+    return [await EXPANDABLE[name].version() for name in relations]
+
+
+def orders_repository(relations: tuple[str, ...]):
+    """
+    Репозиторий заказов, загружающий связи одним запросом (JOIN).
+    """
+    return OrderRepository.expand(*relations) if relations else OrderRepository
+
 
-@router.get("/", name="Получить список заказов")
-async def read_orders() -> Page[Order]:
+# Параметры страницы задаются явно: из-за варианта ответа со списком (ids)
+# add_pagination не распознает маршрут как постраничный
+@router.get("/", name="Получить список заказов", dependencies=[Depends(pagination_ctx(Page[OrderExpanded]))])
+async def read_orders(
+    request: Request,
+    relations: tuple[str, ...] = Depends(expand_param),
+    ids: list[int] | None = Depends(ids_param),
+    query: ListQuery = Depends(OrderRepository.filter_spec),
+) -> Page[OrderExpanded] | list[OrderExpanded]:
+    """
+    Постраничный список заказов (с фильтрами и сортировкой) или заказы с указанными ID (параметр ids).
+    """
     try:
-        orders = await OrderRepository.get_all()
-        if not orders:
+        if ids is not None:
+            # несколько записей по ID одним запросом
+            items = await orders_repository(relations).get_many(ids)
+            return ORJSONResponse(dump_trusted(OrderExpanded, items))
+        # версия выборки проверяется до чтения страницы: при совпадении ETag записи не читаются
+        headers = validators(
+            await OrderRepository.version(**query.filters), *await related_versions(relations)
+        )
+        if not_modified(request, headers):
+            return not_modified_response(headers)
+        response = await paginate_response(
+            orders_repository(relations), OrderExpanded, sort=query.sort, **query.filters
+        )
+        if not response.page.total and not query.filters:
             raise ValueError("В базе данных нет записей")
-        return paginate(orders)
+        response.headers.update(headers)
+        return response
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{str(e)}"
         )
 
 
+@router.get("/cursor", name="Получить список заказов (курсорная пагинация)")
+async def read_orders_cursor(
+    relations: tuple[str, ...] = Depends(expand_param),
+    query: ListQuery = Depends(OrderRepository.filter_spec.unsorted),
+) -> CursorPage[OrderExpanded]:
+    """
+    Постраничный список заказов по курсору (записи упорядочены по убыванию id, доступны фильтры списка).
+
+    Стоимость запроса не зависит от номера страницы, общее количество записей не считается.
+    """
+    return await paginate_response(orders_repository(relations), OrderExpanded, **query.filters)
+
+
+@router.get("/export", name="Выгрузка заказов")
+async def export_orders(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    query: ListQuery = Depends(OrderRepository.filter_spec.unsorted),
+):
+    """
+    Потоковая выгрузка заказов (всех или по фильтрам списка) в формате NDJSON или CSV.
+
+    Данные читаются серверным курсором и отправляются частями, память не зависит от размера таблицы.
+    """
+    return export_response(OrderRepository, Order, export_format, "orders", **query.filters)
+
+
+@router.get("/changes", name="Изменения заказов")
+async def read_orders_changes(
+    since: str | None = Query(None, description="Курсор next_cursor предыдущего ответа (без него - все записи)"),
+    limit: int = Query(100, ge=1, le=1000, description="Наибольшее количество изменений"),
+) -> ChangesPage[Order]:
+    """
+    Записи, добавленные или измененные после курсора, и ID удаленных записей (синхронизация клиента).
+
+    Изменения читаются по индексу журнала, объем ответа зависит от количества изменений, а не от размера таблицы.
+    """
+    return await changes_response(OrderRepository, Order, limit, since)
+
+
 @router.post("/add", name="Добавление заказа")
 async def add_order(order_data: OrderCreate = Depends()) -> dict:
     """
@@ -40,16 +151,91 @@ async def add_order(order_data: OrderCreate = Depends()) -> dict:
         raise HTTPException(status_code=500, detail=f"{e}")
 
 
+@router.post("/add/batch", name="Пакетное добавление заказов")
+async def add_orders_batch(items: list[OrderCreate]) -> dict:
+    """
+    Добавление нескольких записей одним запросом
+
+
+    :param items: список данных для записи
+    :return: dict
+    """
+    try:
+        # проверяем существование пользователей и товаров: по одному запросу на таблицу,
+        # запросы к таблицам выполняются одновременно
+        user_ids = list({item.user_id for item in items})
+        product_ids = list({item.product_id for item in items})
+        users, products = await asyncio.gather(
+            UserRepository.get_many(user_ids), ProductRepository.get_many(product_ids)
+        )
+        missing_users = set(user_ids) - {user.id for user in users}
+        missing_products = set(product_ids) - {product.id for product in products}
+        if missing_users or missing_products:
+            detail = "; ".join(
+                f"{name}: {', '.join(map(str, sorted(missing)))}"
+                for name, missing in (("Нет пользователей", missing_users), ("Нет товаров", missing_products))
+                if missing
+            )
+            raise HTTPException(status_code=500, detail=detail)
+        ids = await OrderRepository.bulk_create([item.model_dump() for item in items])
+        return {"message": "Записи успешно созданы", "count": len(ids), "error": None}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{e}")
+
+
+@router.post("/import", name="Импорт заказов из CSV")
+async def import_orders(file: UploadFile) -> dict:
+    """
+    Импорт заказов из CSV-файла через COPY
+
+
+    :param file: CSV-файл с заголовком из полей записи
+    :return: dict
+    """
+    try:
+        result = await import_csv(OrderRepository, OrderCreate, file.file)
+        return {"message": "Импорт завершен", **result, "error": None}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{e}")
+
+
+@router.put("/edit/batch", name="Пакетное обновление заказов")
+async def update_orders_batch(items: list[OrderUpdateItem]) -> dict:
+    """
+    Обновление нескольких записей одним запросом
+
+    ID записей, которых нет в базе, возвращаются в not_found.
+    """
+    updated = await OrderRepository.bulk_update([item.model_dump() for item in items])
+    not_found = sorted({item.id for item in items} - set(updated))
+    return {"message": "Записи успешно обновлены", "count": len(updated), "not_found": not_found}
+
+
+@router.post("/delete/batch", name="Пакетное удаление заказов")
+async def delete_orders_batch(ids: list[int]) -> dict:
+    """
+    Удаление нескольких записей по списку ID
+
+
+    :param ids: ID удаляемых записей
+    :return: dict
+    """
+    try:
+        deleted = await OrderRepository.bulk_delete(ids)
+        return {"message": "Записи успешно удалены", "count": deleted, "error": None}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{e}")
+
+
 @router.put("/edit/{order_id}", name="Обновить данные товара")
 async def update_order(order_id: int, order_update: OrderUpdate = Depends()):
     """
     Обновить данные ссылки по ID.
     """
-    order = await OrderRepository.get_one(id=order_id)
+    order = await OrderRepository.update(order_id, **order_update.model_dump())
     if not order:
         raise HTTPException(status_code=404, detail="order not found")
 
-    await OrderRepository.update(order_id, **order_update.model_dump())
     return {"message": "Запись успешно обновлена"}
 
 
@@ -63,14 +249,33 @@ async def delete_order(id_order: int):
     :return: dict
     """
     try:
-        # получаем товар по ID из базы данных
-        order = await OrderRepository.get_one(id=id_order)
-        # если такой товар существует в БД
-        if not order:
-            # выводим ошибку 500 с пояснением
-            raise HTTPException(status_code=500, detail="Такой товар не существует")
-        #
-        await OrderRepository.delete(id=id_order)
-        return {"message": "Запись успешно удалена", "error": None}
+        # удаляем запись одной командой DELETE ... RETURNING
+        deleted = await OrderRepository.delete(id=id_order)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"{e}")
+    # если такой записи не было в БД
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Такой заказ не существует")
+    return {"message": "Запись успешно удалена", "error": None}
+
+
+# Объявлен последним, чтобы пути других маршрутов GET не были приняты за ID
+@router.get("/{order_id}", name="Получить заказ")
+async def read_order(
+    order_id: int,
+    request: Request,
+    relations: tuple[str, ...] = Depends(expand_param),
+) -> OrderExpanded:
+    """
+    Заказ по ID с поддержкой условного запроса (If-None-Match / If-Modified-Since).
+    """
+    version = await OrderRepository.version(id=order_id)
+    if not version[0]:
+        raise HTTPException(status_code=404, detail="order not found")
+    headers = validators(version, *await related_versions(relations), last_modified=True)
+    if not_modified(request, headers):
+        return not_modified_response(headers)
+    order = await orders_repository(relations).get_one(id=order_id)
+    if order is None:
+        raise HTTPException(status_code=404, detail="order not found")
+    return ORJSONResponse(dump_trusted(OrderExpanded, [order])[0], headers=headers)
@@ -2,6 +2,9 @@ from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
 
+from app.modules.products.schemas import Product
+from app.modules.users.schemas import User
+
 
 class OrderBase(BaseModel):
     user_id: int
@@ -20,8 +23,19 @@ class OrderUpdate(BaseModel):
     status: str
 
 
+class OrderUpdateItem(OrderUpdate):
+    id: int
+
+
 class Order(OrderBase):
     id: int
 
     class Config:
         from_attributes = True
+
+
+# Заказ со встроенными данными пользователя и товара (параметр expand списка заказов).
+# Связи, не указанные в expand, возвращаются как null.
+class OrderExpanded(Order):
+    user: Optional[User] = None
+    product: Optional[Product] = None
@@ -1,15 +1,39 @@
-from sqlalchemy import Column, Integer, String, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Integer, String, Float, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from app.core.database.database import BaseModel
 
+# Конфигурация полнотекстового поиска: русские слова приводятся к основе русским
+# стеммером, слова латиницей - английским
+SEARCH_CONFIG = "russian"
+
 
 class Product(BaseModel):
     __tablename__ = 'products'
+    __table_args__ = (
+        # Фильтры и сортировки списка товаров (см. ProductRepository.filter_spec)
+        Index('ix_products_price_id', 'price', 'id'),
+        Index('ix_products_created_ad_id', 'created_ad', 'id'),
+        # Поиск по началу названия (LIKE 'префикс%') при любом сопоставлении базы данных
+        Index('ix_products_name_pattern', 'name', postgresql_ops={'name': 'text_pattern_ops'}),
+        # Полнотекстовый поиск и поиск по названию с опечатками (см. ProductRepository.search)
+        Index('ix_products_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('ix_products_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        # Журнал изменений для синхронизации клиентов (см. app/core/database/changes.py)
+        Index('ix_products_change_xid_id', 'change_xid', 'id'),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True)
+    id = Column(Integer, primary_key=True)
+    name = Column(String, index=True, unique=True)
     description = Column(String)
     price = Column(Float)
+    # Слова названия (вес A) и описания (вес B) для полнотекстового поиска. Вычисляется
+    # базой данных при записи строки; в запросах чтения не загружается.
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+        persisted=True,
+    )))
 
     orders = relationship("Order", back_populates="product")
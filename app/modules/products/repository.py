@@ -1,9 +1,67 @@
-from sqlalchemy import select
+from sqlalchemy import func, literal_column, or_, select
 
 from app.core.database.base_repository import BaseRepository
 from app.core.database.database import async_session_maker
-from .models import Product
+from app.core.database.filters import FilterSpec, PREFIX, RANGE
+from .models import Product, SEARCH_CONFIG
+from .schemas import Product as ProductSchema
 
 
 class ProductRepository(BaseRepository):
     model = Product
+    schema = ProductSchema
+    filter_fields = ("name",)
+    unique_fields = ("name",)
+    # Фильтры и сортировки списка товаров в параметрах запроса
+    filter_spec = FilterSpec(
+        Product,
+        {"price": RANGE, "name": PREFIX, "created_ad": RANGE},
+        sorts=("id", "price", "name", "created_ad"),
+    )
+    search_text: str | None = None  # Поисковый запрос репозитория, полученного через search
+
+    @classmethod
+    def search(cls, text: str):
+        """Получить репозиторий, выборки которого ограничены товарами, найденными по запросу.
+
+        Товар найден, если его название или описание содержит слова запроса
+        (полнотекстовый поиск по `search_vector`, синтаксис websearch: "фраза",
+        -исключение, or) или название похоже на запрос с учетом опечаток
+        (сходство триграмм pg_trgm). Оба условия обслуживаются индексами GIN.
+        Записи упорядочены по убыванию релевантности, затем по сортировке
+        метода чтения. Результаты такого репозитория не кэшируются.
+
+        Args:
+            text (str): Поисковый запрос.
+
+        Returns:
+            type[ProductRepository]: Наследник репозитория с условием поиска.
+        """
+        return type(f"{cls.__name__}Search", (cls,), {"search_text": text, "schema": None})
+
+    @classmethod
+    def _search_query(cls):
+        return func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), cls.search_text)
+
+    @classmethod
+    def _select(cls):
+        query = super()._select()
+        if cls.search_text is None:
+            return query
+        # Совпадения слов (с учетом веса названия и описания) и сходство названия с запросом
+        rank = (
+            func.ts_rank_cd(Product.search_vector, cls._search_query())
+            + func.word_similarity(cls.search_text, Product.name)
+        )
+        return query.order_by(rank.desc())
+
+    @classmethod
+    def _where(cls, filters: dict) -> list:
+        conditions = super()._where(filters)
+        if cls.search_text is not None:
+            conditions.insert(0, or_(
+                Product.search_vector.op("@@")(cls._search_query()),
+                # Одно из слов названия похоже на запрос (порог pg_trgm.word_similarity_threshold)
+                Product.name.op("%>")(cls.search_text),
+            ))
+        return conditions
@@ -1,8 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi_pagination import Page, paginate
+from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile
+from fastapi.responses import ORJSONResponse
+from fastapi_pagination import Page
+from fastapi_pagination.api import pagination_ctx
+from fastapi_pagination.cursor import CursorPage
 from fastapi_pagination.utils import disable_installed_extensions_check
 from starlette import status
+from starlette.requests import Request
 
+from app.core.conditional import not_modified, not_modified_response, validators
+from app.core.csv_import import import_csv
+from app.core.database.changes import ChangesPage, changes_response
+from app.core.database.filters import ListQuery
+from app.core.database.pagination import paginate_response
+from app.core.params import ids_param
+from app.core.serialization import dump_trusted
+from app.core.streaming import ExportFormat, export_response
 from .repository import ProductRepository
 from .schemas import Product, ProductCreate
 
@@ -11,19 +23,90 @@ router = APIRouter()
 disable_installed_extensions_check()
 
 
-@router.get("/", name="Получить список товаров")
-async def read_products() -> Page[Product]:
+# Параметры страницы задаются явно: из-за варианта ответа со списком (ids)
+# add_pagination не распознает маршрут как постраничный
+@router.get("/", name="Получить список товаров", dependencies=[Depends(pagination_ctx(Page[Product]))])
+async def read_products(
+    request: Request,
+    ids: list[int] | None = Depends(ids_param),
+    query: ListQuery = Depends(ProductRepository.filter_spec),
+) -> Page[Product] | list[Product]:
+    """
+    Постраничный список товаров (с фильтрами и сортировкой) или товары с указанными ID (параметр ids).
+    """
     try:
-        products = await ProductRepository.get_all()
-        if not products:
+        if ids is not None:
+            # несколько записей по ID одним запросом
+            items = await ProductRepository.get_many(ids)
+            return ORJSONResponse(dump_trusted(Product, items))
+        # версия выборки проверяется до чтения страницы: при совпадении ETag записи не читаются
+        headers = validators(await ProductRepository.version(**query.filters))
+        if not_modified(request, headers):
+            return not_modified_response(headers)
+        response = await paginate_response(ProductRepository, Product, sort=query.sort, **query.filters)
+        if not response.page.total and not query.filters:
             raise ValueError("В базе данных нет записей")
-        return paginate(products)
+        response.headers.update(headers)
+        return response
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{str(e)}"
         )
 
 
+@router.get("/cursor", name="Получить список товаров (курсорная пагинация)")
+async def read_products_cursor(
+    query: ListQuery = Depends(ProductRepository.filter_spec.unsorted),
+) -> CursorPage[Product]:
+    """
+    Постраничный список товаров по курсору (записи упорядочены по убыванию id, доступны фильтры списка).
+
+    Стоимость запроса не зависит от номера страницы, общее количество записей не считается.
+    """
+    return await paginate_response(ProductRepository, Product, **query.filters)
+
+
+# Объявлен до маршрутов с параметром пути, чтобы "search" не был принят за ID товара
+@router.get("/search", name="Поиск товаров")
+async def search_products(
+    q: str = Query(..., min_length=2, max_length=200, description="Поисковый запрос"),
+    query: ListQuery = Depends(ProductRepository.filter_spec.unsorted),
+) -> Page[Product]:
+    """
+    Поиск товаров по словам названия и описания и по названию с учетом опечаток.
+
+    Результаты упорядочены по релевантности, страница выбирается на стороне базы данных.
+    Доступны фильтры списка товаров.
+    """
+    return await paginate_response(ProductRepository.search(q), Product, **query.filters)
+
+
+@router.get("/export", name="Выгрузка товаров")
+async def export_products(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    query: ListQuery = Depends(ProductRepository.filter_spec.unsorted),
+):
+    """
+    Потоковая выгрузка товаров (всех или по фильтрам списка) в формате NDJSON или CSV.
+
+    Данные читаются серверным курсором и отправляются частями, память не зависит от размера таблицы.
+    """
+    return export_response(ProductRepository, Product, export_format, "products", **query.filters)
+
+
+@router.get("/changes", name="Изменения товаров")
+async def read_products_changes(
+    since: str | None = Query(None, description="Курсор next_cursor предыдущего ответа (без него - все записи)"),
+    limit: int = Query(100, ge=1, le=1000, description="Наибольшее количество изменений"),
+) -> ChangesPage[Product]:
+    """
+    Записи, добавленные или измененные после курсора, и ID удаленных записей (синхронизация клиента).
+
+    Изменения читаются по индексу журнала, объем ответа зависит от количества изменений, а не от размера таблицы.
+    """
+    return await changes_response(ProductRepository, Product, limit, since)
+
+
 @router.post("/add", name="Добавление нового товара")
 async def add_product(product_data: ProductCreate = Depends()) -> dict:
     """
@@ -34,28 +117,108 @@ async def add_product(product_data: ProductCreate = Depends()) -> dict:
     :return: dict
     """
     try:
-        # добавляем в БД
-        product = await ProductRepository.get_one(name=product_data.name)
-        if product:
+        # добавляем в БД одной командой, если товара с таким названием еще нет
+        product = await ProductRepository.create_or_ignore(**product_data.model_dump())
+        if product is None:
             # выводим ошибку 500 с пояснением
             raise HTTPException(status_code=500, detail="Такой товар уже существует")
-        # если товар в БД нет, то делаем новую запись
-        await ProductRepository.create(**product_data.model_dump())
         return {"message": "Запись успешно создана", "error": None}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"{e}")
 
 
+@router.post("/add/batch", name="Пакетное добавление товаров")
+async def add_products_batch(items: list[ProductCreate]) -> dict:
+    """
+    Добавление нескольких записей одним запросом
+
+
+    :param items: список данных для записи
+    :return: dict
+    """
+    try:
+        # записи с уже существующими названиями и повторы внутри пачки не добавляются;
+        # если такие есть, ошибка отменяет транзакцию запроса и пачка не добавляется целиком
+        ignored = await ProductRepository.bulk_create_or_ignore([item.model_dump() for item in items])
+        if ignored:
+            duplicates = {row["name"] for row in ignored}
+            detail = f"Такие товары уже существуют: {', '.join(sorted(duplicates))}"
+            raise HTTPException(status_code=500, detail=detail)
+        return {"message": "Записи успешно созданы", "count": len(items), "error": None}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{e}")
+
+
+@router.put("/upsert", name="Добавление или обновление товара")
+async def upsert_product(product_data: ProductCreate = Depends()) -> dict:
+    """
+    Добавление товара или обновление товара с таким же названием одной командой
+
+
+    :param product_data: данные для записи
+    :return: dict
+    """
+    try:
+        product, created = await ProductRepository.upsert(**product_data.model_dump())
+        message = "Запись успешно создана" if created else "Запись успешно обновлена"
+        return {"message": message, "id": product.id, "created": created, "error": None}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{e}")
+
+
+@router.post("/import", name="Импорт товаров из CSV")
+async def import_products(file: UploadFile) -> dict:
+    """
+    Импорт товаров из CSV-файла через COPY
+
+
+    :param file: CSV-файл с заголовком из полей записи
+    :return: dict
+    """
+    try:
+        result = await import_csv(ProductRepository, ProductCreate, file.file)
+        return {"message": "Импорт завершен", **result, "error": None}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{e}")
+
+
+@router.put("/edit/batch", name="Пакетное обновление товаров")
+async def update_products_batch(items: list[Product]) -> dict:
+    """
+    Обновление нескольких записей одним запросом
+
+    ID записей, которых нет в базе, возвращаются в not_found.
+    """
+    updated = await ProductRepository.bulk_update([item.model_dump() for item in items])
+    not_found = sorted({item.id for item in items} - set(updated))
+    return {"message": "Записи успешно обновлены", "count": len(updated), "not_found": not_found}
+
+
+@router.post("/delete/batch", name="Пакетное удаление товаров")
+async def delete_products_batch(ids: list[int]) -> dict:
+    """
+    Удаление нескольких записей по списку ID
+
+
+    :param ids: ID удаляемых записей
+    :return: dict
+    """
+    try:
+        deleted = await ProductRepository.bulk_delete(ids)
+        return {"message": "Записи успешно удалены", "count": deleted, "error": None}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{e}")
+
+
 @router.put("/edit/{product_id}", name="Обновить данные товара")
 async def update_product(product_id: int, product_update: Product = Depends()):
     """
     Обновить данные ссылки по ID.
     """
-    product = await ProductRepository.get_one(id=product_id)
+    product = await ProductRepository.update(product_id, **product_update.model_dump())
     if not product:
         raise HTTPException(status_code=404, detail="product not found")
 
-    await ProductRepository.update(product_id, **product_update.model_dump())
     return {"message": "Запись успешно обновлена"}
 
 
@@ -69,14 +232,29 @@ async def delete_product(id_product: int):
     :return: dict
     """
     try:
-        # получаем товар по ID из базы данных
-        product = await ProductRepository.get_one(id=id_product)
-        # если такой товар существует в БД
-        if not product:
-            # выводим ошибку 500 с пояснением
-            raise HTTPException(status_code=500, detail="Такой товар не существует")
-        #
-        await ProductRepository.delete(id=id_product)
-        return {"message": "Запись успешно удалена", "error": None}
+        # удаляем запись одной командой DELETE ... RETURNING
+        deleted = await ProductRepository.delete(id=id_product)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"{e}")
+    # если такой записи не было в БД
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Такой товар не существует")
+    return {"message": "Запись успешно удалена", "error": None}
+
+
+# Объявлен последним, чтобы пути других маршрутов GET не были приняты за ID
+@router.get("/{product_id}", name="Получить товар")
+async def read_product(product_id: int, request: Request) -> Product:
+    """
+    Запись по ID с поддержкой условного запроса (If-None-Match / If-Modified-Since).
+    """
+    version = await ProductRepository.version(id=product_id)
+    if not version[0]:
+        raise HTTPException(status_code=404, detail="product not found")
+    headers = validators(version, last_modified=True)
+    if not_modified(request, headers):
+        return not_modified_response(headers)
+    item = await ProductRepository.get_one(id=product_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="product not found")
+    return ORJSONResponse(dump_trusted(Product, [item])[0], headers=headers)
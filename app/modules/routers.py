@@ -1,12 +1,18 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.core.database.database import get_async_session
 from app.modules.users.router import router as user_routers
 from app.modules.orders.router import router as order_routers
 from app.modules.products.router import router as product_routers
+from app.modules.system.router import router as system_routers
+from app.modules.analytics.router import router as analytics_routers
 
 
-routers = APIRouter()
+# Каждый запрос работает в одной сессии и транзакции (unit of work)
+routers = APIRouter(dependencies=[Depends(get_async_session)])
 
 routers.include_router(user_routers, prefix="/users", tags=["Пользователи"])
 routers.include_router(order_routers, prefix="/orders", tags=["Заказы"])
 routers.include_router(product_routers, prefix="/products", tags=["Товары"])
-
+routers.include_router(analytics_routers, prefix="/analytics", tags=["Аналитика"])
+routers.include_router(system_routers, prefix="/system", tags=["Система"])
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from starlette import status
+
+from app.core.config.config import settings
+from app.core.database.base_repository import single_flight
+from app.core.database.database import get_engine
+from app.core.database.routing import replicas
+
+router = APIRouter()
+
+
+@router.get("/pool", name="Состояние пула соединений")
+async def read_pool_stats() -> dict:
+    """
+    Состояние пула соединений с базой данных текущего воркера.
+
+    Помогает подобрать DB_MAX_CONNECTIONS / DB_POOL_SIZE: рост checkout_wait
+    при checked_out равном размеру пула означает нехватку соединений.
+    Для реплик приводится состояние их пулов и результат проверки доступности.
+    """
+    return {
+        "workers": settings.WEB_CONCURRENCY,
+        **get_engine().pool.stats(),
+        "replicas": [
+            {
+                "host": engine.url.host,
+                "port": engine.url.port,
+                "healthy": replicas.is_healthy(engine),
+                **engine.pool.stats(),
+            }
+            for engine in replicas.engines
+        ],
+    }
+
+
+@router.get("/singleflight", name="Объединение одинаковых чтений")
+async def read_singleflight_stats() -> dict:
+    """
+    Статистика объединения одинаковых одновременных чтений репозиториев текущего воркера.
+
+    ratio - доля чтений, выполненных без собственного запроса к базе данных.
+    Метрики всех воркеров по таблицам и методам - repository_reads_total в /metrics.
+    """
+    return {
+        "enabled": settings.SINGLEFLIGHT_ENABLED,
+        "ttl": settings.SINGLEFLIGHT_TTL,
+        **single_flight.stats,
+        "ratio": single_flight.ratio(),
+    }
+
+
+@router.get("/ready", name="Готовность воркера")
+async def read_readiness(request: Request) -> JSONResponse:
+    """
+    Готовность текущего воркера к приему запросов.
+
+    Возвращает 200 после прогрева соединений и запросов при запуске
+    и 503, пока прогрев не завершен или воркер останавливается.
+    """
+    if getattr(request.app.state, "ready", False):
+        return JSONResponse({"status": "ready"})
+    return JSONResponse(
+        {"status": "starting"}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
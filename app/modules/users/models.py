@@ -1,6 +1,6 @@
 from app.core.database.database import BaseModel
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Index
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -10,8 +10,17 @@ Base = declarative_base()
 
 class User(BaseModel):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Фильтры и сортировки списка пользователей (см. UserRepository.filter_spec)
+        Index('ix_users_created_ad_id', 'created_ad', 'id'),
+        # Поиск по началу имени и фамилии (LIKE 'префикс%') при любом сопоставлении базы данных
+        Index('ix_users_first_name_pattern', 'first_name', postgresql_ops={'first_name': 'text_pattern_ops'}),
+        Index('ix_users_last_name_pattern', 'last_name', postgresql_ops={'last_name': 'text_pattern_ops'}),
+        # Журнал изменений для синхронизации клиентов (см. app/core/database/changes.py)
+        Index('ix_users_change_xid_id', 'change_xid', 'id'),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     first_name = Column(String, index=True)
     last_name = Column(String, index=True)
     email = Column(String, unique=True, index=True)
@@ -2,7 +2,9 @@ from sqlalchemy import select
 
 from app.core.database.base_repository import BaseRepository
 from app.core.database.database import async_session_maker
+from app.core.database.filters import FilterSpec, PREFIX, RANGE
 from .models import User
+from .schemas import User as UserSchema
 
 
 class UserRepository(BaseRepository):
@@ -36,3 +38,12 @@ class UserRepository(BaseRepository):
     """
 
     model = User
+    schema = UserSchema
+    filter_fields = ("email",)
+    unique_fields = ("email",)
+    # Фильтры и сортировки списка пользователей в параметрах запроса
+    filter_spec = FilterSpec(
+        User,
+        {"first_name": PREFIX, "last_name": PREFIX, "created_ad": RANGE},
+        sorts=("id", "last_name", "created_ad"),
+    )
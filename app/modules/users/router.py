@@ -1,30 +1,98 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi_pagination import Page, paginate
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile
+from fastapi.responses import ORJSONResponse
+from fastapi_pagination import Page
+from fastapi_pagination.api import pagination_ctx
+from fastapi_pagination.cursor import CursorPage
 from fastapi_pagination.utils import disable_installed_extensions_check
 from starlette import status
+from starlette.requests import Request
 
-from app.modules.users.schemas import User, UserCreate, UpdateUser
+from app.core.conditional import not_modified, not_modified_response, validators
+from app.core.csv_import import import_csv
+from app.core.database.changes import ChangesPage, changes_response
+from app.core.database.filters import ListQuery
+from app.core.database.pagination import paginate_response
+from app.core.params import ids_param
+from app.core.serialization import dump_trusted
+from app.core.streaming import ExportFormat, export_response
+from app.modules.users.schemas import User, UserCreate, UserImport, UpdateUser, UpdateUserItem
 from .repository import UserRepository
+from .security import hash_password
 
 router = APIRouter()
 
 disable_installed_extensions_check()
 
 
-@router.get("/", name="Получить список пользователей")
-async def read_users() -> Page[User]:
-    # Получить список пользователей
+# Параметры страницы задаются явно: из-за варианта ответа со списком (ids)
+# add_pagination не распознает маршрут как постраничный
+@router.get("/", name="Получить список пользователей", dependencies=[Depends(pagination_ctx(Page[User]))])
+async def read_users(
+    request: Request,
+    ids: list[int] | None = Depends(ids_param),
+    query: ListQuery = Depends(UserRepository.filter_spec),
+) -> Page[User] | list[User]:
+    # Получить список пользователей (с фильтрами и сортировкой) или пользователей с указанными ID
     try:
-        users = await UserRepository.get_all()
-        if not users:
+        if ids is not None:
+            # несколько записей по ID одним запросом
+            items = await UserRepository.get_many(ids)
+            return ORJSONResponse(dump_trusted(User, items))
+        # версия выборки проверяется до чтения страницы: при совпадении ETag записи не читаются
+        headers = validators(await UserRepository.version(**query.filters))
+        if not_modified(request, headers):
+            return not_modified_response(headers)
+        response = await paginate_response(UserRepository, User, sort=query.sort, **query.filters)
+        if not response.page.total and not query.filters:
             raise ValueError("В базе данных нет записей")
-        return paginate(users)
+        response.headers.update(headers)
+        return response
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{str(e)}"
         )
 
 
+@router.get("/cursor", name="Получить список пользователей (курсорная пагинация)")
+async def read_users_cursor(
+    query: ListQuery = Depends(UserRepository.filter_spec.unsorted),
+) -> CursorPage[User]:
+    """
+    Постраничный список пользователей по курсору (записи упорядочены по убыванию id, доступны фильтры списка).
+
+    Стоимость запроса не зависит от номера страницы, общее количество записей не считается.
+    """
+    return await paginate_response(UserRepository, User, **query.filters)
+
+
+@router.get("/export", name="Выгрузка пользователей")
+async def export_users(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    query: ListQuery = Depends(UserRepository.filter_spec.unsorted),
+):
+    """
+    Потоковая выгрузка пользователей (всех или по фильтрам списка) в формате NDJSON или CSV.
+
+    Данные читаются серверным курсором и отправляются частями, память не зависит от размера таблицы.
+    """
+    return export_response(UserRepository, User, export_format, "users", **query.filters)
+
+
+@router.get("/changes", name="Изменения пользователей")
+async def read_users_changes(
+    since: str | None = Query(None, description="Курсор next_cursor предыдущего ответа (без него - все записи)"),
+    limit: int = Query(100, ge=1, le=1000, description="Наибольшее количество изменений"),
+) -> ChangesPage[User]:
+    """
+    Записи, добавленные или измененные после курсора, и ID удаленных записей (синхронизация клиента).
+
+    Изменения читаются по индексу журнала, объем ответа зависит от количества изменений, а не от размера таблицы.
+    """
+    return await changes_response(UserRepository, User, limit, since)
+
+
 @router.post("/add", name="Добавление нового пользователя")
 async def add_user(user_data: UserCreate = Depends()) -> dict:
     """
@@ -35,29 +103,118 @@ async def add_user(user_data: UserCreate = Depends()) -> dict:
     :return: dict
     """
     try:
-        # получаем ссылку из базы данных
-        user = await UserRepository.get_one(email=user_data.email)
+        data = user_data.model_dump()
+        data["hashed_password"] = await hash_password(user_data.hashed_password)
+        # делаем новую запись одной командой, если пользователя с таким email еще нет
+        user = await UserRepository.create_or_ignore(**data)
         # если такой пользователь существует в БД
-        if user:
+        if user is None:
             # выводим ошибку 500 с пояснением
             raise HTTPException(status_code=500, detail="Такой пользователь уже существует")
-        # если ссылке в БД нет, то делаем новую запись
-        await UserRepository.create(**user_data.model_dump())
         return {"message": "Запись успешно создана", "error": None}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"{e}")
 
 
+@router.post("/add/batch", name="Пакетное добавление пользователей")
+async def add_users_batch(items: list[UserCreate]) -> dict:
+    """
+    Добавление нескольких записей одним запросом
+
+
+    :param items: список данных для записи
+    :return: dict
+    """
+    try:
+        # хэши вычисляются параллельно в пуле потоков хэширования
+        hashes = await asyncio.gather(*(hash_password(item.hashed_password) for item in items))
+        rows = [{**item.model_dump(), "hashed_password": hashed} for item, hashed in zip(items, hashes)]
+        # записи с уже существующими email и повторы внутри пачки не добавляются;
+        # если такие есть, ошибка отменяет транзакцию запроса и пачка не добавляется целиком
+        ignored = await UserRepository.bulk_create_or_ignore(rows)
+        if ignored:
+            duplicates = {row["email"] for row in ignored}
+            detail = f"Такие пользователи уже существуют: {', '.join(sorted(duplicates))}"
+            raise HTTPException(status_code=500, detail=detail)
+        return {"message": "Записи успешно созданы", "count": len(rows), "error": None}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{e}")
+
+
+@router.put("/upsert", name="Добавление или обновление пользователя")
+async def upsert_user(user_data: UserCreate = Depends()) -> dict:
+    """
+    Добавление пользователя или обновление пользователя с таким же email одной командой
+
+
+    :param user_data: данные для записи
+    :return: dict
+    """
+    try:
+        data = user_data.model_dump()
+        data["hashed_password"] = await hash_password(user_data.hashed_password)
+        user, created = await UserRepository.upsert(**data)
+        message = "Запись успешно создана" if created else "Запись успешно обновлена"
+        return {"message": message, "id": user.id, "created": created, "error": None}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{e}")
+
+
+@router.post("/import", name="Импорт пользователей из CSV")
+async def import_users(file: UploadFile) -> dict:
+    """
+    Импорт пользователей из CSV-файла через COPY
+
+    Пароли в файле должны быть уже хэшированы, строки с паролями
+    в открытом виде пропускаются.
+
+    :param file: CSV-файл с заголовком из полей записи
+    :return: dict
+    """
+    try:
+        result = await import_csv(UserRepository, UserImport, file.file)
+        return {"message": "Импорт завершен", **result, "error": None}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{e}")
+
+
+@router.put("/edit/batch", name="Пакетное обновление пользователей")
+async def update_users_batch(items: list[UpdateUserItem]) -> dict:
+    """
+    Обновление нескольких записей одним запросом
+
+    ID записей, которых нет в базе, возвращаются в not_found.
+    """
+    updated = await UserRepository.bulk_update([item.model_dump() for item in items])
+    not_found = sorted({item.id for item in items} - set(updated))
+    return {"message": "Записи успешно обновлены", "count": len(updated), "not_found": not_found}
+
+
+@router.post("/delete/batch", name="Пакетное удаление пользователей")
+async def delete_users_batch(ids: list[int]) -> dict:
+    """
+    Удаление нескольких записей по списку ID
+
+
+    :param ids: ID удаляемых записей
+    :return: dict
+    """
+    try:
+        deleted = await UserRepository.bulk_delete(ids)
+        return {"message": "Записи успешно удалены", "count": deleted, "error": None}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{e}")
+
+
 @router.put("/edit/{user_id}", name="Обновить пользователя")
 async def update_user(user_id: int, user_update: UpdateUser = Depends()):
     """
     Обновить данные ссылки по ID.
     """
-    user = await UserRepository.get_one(id=user_id)
+    user = await UserRepository.update(user_id, **user_update.model_dump())
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    await UserRepository.update(user_id, **user_update.model_dump())
     return {"message": "Запись успешно обновлена"}
 
 
@@ -71,14 +228,29 @@ async def delete_user(id_user: int):
     :return: dict
     """
     try:
-        # получаем пользователя по ID из базы данных
-        user = await UserRepository.get_one(id=id_user)
-        # если такой пользователь существует в БД
-        if not user:
-            # выводим ошибку 500 с пояснением
-            raise HTTPException(status_code=500, detail="Такой пользователь не существует")
-        #
-        await UserRepository.delete(id=id_user)
-        return {"message": "Запись успешно удалена", "error": None}
+        # удаляем запись одной командой DELETE ... RETURNING
+        deleted = await UserRepository.delete(id=id_user)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"{e}")
+    # если такой записи не было в БД
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Такой пользователь не существует")
+    return {"message": "Запись успешно удалена", "error": None}
+
+
+# Объявлен последним, чтобы пути других маршрутов GET не были приняты за ID
+@router.get("/{user_id}", name="Получить пользователя")
+async def read_user(user_id: int, request: Request) -> User:
+    """
+    Запись по ID с поддержкой условного запроса (If-None-Match / If-Modified-Since).
+    """
+    version = await UserRepository.version(id=user_id)
+    if not version[0]:
+        raise HTTPException(status_code=404, detail="User not found")
+    headers = validators(version, last_modified=True)
+    if not_modified(request, headers):
+        return not_modified_response(headers)
+    item = await UserRepository.get_one(id=user_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return ORJSONResponse(dump_trusted(User, [item])[0], headers=headers)
@@ -1,6 +1,8 @@
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+
+from .security import is_password_hash
 
 
 class UserBase(BaseModel):
@@ -10,14 +12,33 @@ class UserBase(BaseModel):
 
 
 class UserCreate(UserBase):
+    # Пароль в открытом виде, в базе данных сохраняется его хэш
+    hashed_password: str
+
+
+# Строка импорта пользователей из CSV: пароль должен быть уже захэширован
+# (хэширование при импорте через COPY замедлило бы его на порядки)
+class UserImport(UserBase):
     hashed_password: str
 
+    @field_validator("hashed_password")
+    @classmethod
+    def check_hashed(cls, value: str) -> str:
+        if not is_password_hash(value):
+            raise ValueError("Пароль должен быть хэширован (scrypt$n$r$p$salt$hash) с допустимыми параметрами")
+        return value
+
 
 # Пример схемы обновления пользователя
 class UpdateUser(UserBase):
     pass
 
 
+# Элемент пакетного обновления пользователей
+class UpdateUserItem(UpdateUser):
+    id: int
+
+
 class User(UserBase):
     id: int
 
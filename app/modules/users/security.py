@@ -0,0 +1,111 @@
+"""Хэширование и проверка паролей пользователей.
+
+Пароли хэшируются алгоритмом scrypt (требует много памяти, что затрудняет
+перебор). Вычисление хэша занимает десятки миллисекунд, поэтому выполняется
+в ограниченном пуле потоков, а не в цикле событий: hashlib.scrypt освобождает
+GIL, и остальные запросы воркера продолжают обрабатываться.
+
+Формат хранимого значения: `scrypt$<n>$<r>$<p>$<соль base64>$<хэш base64>`.
+Параметры стоимости хранятся вместе с хэшем, поэтому их изменение
+(PASSWORD_SCRYPT_*) не влияет на проверку ранее сохраненных паролей.
+Хэши с параметрами больше PASSWORD_SCRYPT_MAX_* не проверяются и не
+принимаются при импорте: подставленный хэш с огромной стоимостью занял бы
+поток хэширования и память воркера.
+"""
+import asyncio
+import base64
+import binascii
+import functools
+import hashlib
+import hmac
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config.config import settings
+
+PREFIX = "scrypt"
+SALT_SIZE = 16
+HASH_SIZE = 32
+
+
+@functools.cache
+def _executor() -> ThreadPoolExecutor:
+    """Пул потоков для хэширования (создается в процессе воркера при первом вызове)."""
+    return ThreadPoolExecutor(
+        max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+    )
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        # Память, необходимая scrypt (128 * n * r байт), с запасом
+        maxmem=256 * n * r * p + 1024 * 1024,
+        dklen=HASH_SIZE,
+    )
+
+
+def _b64(value: bytes) -> str:
+    return base64.b64encode(value).decode()
+
+
+def _hash_password(password: str) -> str:
+    n, r, p = settings.PASSWORD_SCRYPT_N, settings.PASSWORD_SCRYPT_R, settings.PASSWORD_SCRYPT_P
+    salt = secrets.token_bytes(SALT_SIZE)
+    return f"{PREFIX}${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+
+def _cost_allowed(n: int, r: int, p: int) -> bool:
+    """Проверить, что параметры стоимости хэша не превышают допустимых."""
+    return (
+        1 < n <= settings.PASSWORD_SCRYPT_MAX_N and n & (n - 1) == 0
+        and 0 < r <= settings.PASSWORD_SCRYPT_MAX_R
+        and 0 < p <= settings.PASSWORD_SCRYPT_MAX_P
+    )
+
+
+def _verify_password(password: str, hashed: str) -> bool:
+    try:
+        prefix, n, r, p, salt, expected = hashed.split("$")
+        n, r, p = int(n), int(r), int(p)
+        if prefix != PREFIX or not _cost_allowed(n, r, p):
+            return False
+        actual = _scrypt(password, base64.b64decode(salt), n, r, p)
+        return hmac.compare_digest(actual, base64.b64decode(expected))
+    except (ValueError, binascii.Error):
+        return False
+
+
+def is_password_hash(value: str) -> bool:
+    """Проверить, что значение - хэш пароля в формате этого модуля с допустимыми параметрами."""
+    parts = value.split("$")
+    if len(parts) != 6 or parts[0] != PREFIX or not all(part.isdigit() for part in parts[1:4]):
+        return False
+    return _cost_allowed(*map(int, parts[1:4]))
+
+
+async def hash_password(password: str) -> str:
+    """Вычислить хэш пароля для хранения в базе данных.
+
+    Args:
+        password (str): Пароль в открытом виде.
+
+    Returns:
+        str: Хэш пароля с солью и параметрами стоимости.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor(), _hash_password, password)
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    """Проверить пароль по сохраненному хэшу.
+
+    Args:
+        password (str): Пароль в открытом виде.
+        hashed (str): Сохраненный хэш пароля.
+
+    Returns:
+        bool: True, если пароль совпадает.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor(), _verify_password, password, hashed)
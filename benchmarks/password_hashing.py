@@ -0,0 +1,71 @@
+"""Задержка цикла событий при всплеске регистраций пользователей.
+
+Одновременно запускаются 50 хэширований пароля (как при 50 одновременных
+запросах на регистрацию), а фоновая задача каждую миллисекунду измеряет,
+на сколько цикл событий опаздывает с ее пробуждением. Сравниваются:
+
+    * inline - хэш вычисляется прямо в обработчике (блокирует цикл событий);
+    * pool   - hash_password, пул потоков PASSWORD_HASH_WORKERS.
+
+Запуск:
+
+```
+python -m benchmarks.password_hashing
+```
+"""
+import asyncio
+import statistics
+import time
+
+from app.core.config.config import settings
+from app.modules.users.security import _hash_password, hash_password, verify_password
+
+SIGNUPS = 50
+TICK = 0.001
+
+
+async def inline_hash(password: str) -> str:
+    return _hash_password(password)
+
+
+async def measure_lag(stop: asyncio.Event) -> list[float]:
+    """Опоздания пробуждения задачи, спящей TICK секунд, в миллисекундах."""
+    lags = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append((time.perf_counter() - started - TICK) * 1000)
+    return lags
+
+
+async def run(name: str, hasher) -> None:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(stop))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    await asyncio.gather(*(hasher(f"password-{i}") for i in range(SIGNUPS)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    lags = sorted(await ticker)
+    print(
+        f"{name:<8}{elapsed:>9.2f}{statistics.median(lags):>12.2f}"
+        f"{lags[int(len(lags) * 0.99)]:>12.2f}{lags[-1]:>12.2f}"
+    )
+
+
+async def main() -> None:
+    hashed = await hash_password("secret")
+    assert await verify_password("secret", hashed)
+    assert not await verify_password("wrong", hashed)
+
+    print(
+        f"{SIGNUPS} регистраций, scrypt n={settings.PASSWORD_SCRYPT_N} r={settings.PASSWORD_SCRYPT_R} "
+        f"p={settings.PASSWORD_SCRYPT_P}, потоков {settings.PASSWORD_HASH_WORKERS}"
+    )
+    print(f"{'':<8}{'всего, с':>9}{'p50, мс':>12}{'p99, мс':>12}{'max, мс':>12}  (опоздание цикла событий)")
+    await run("inline", inline_hash)
+    await run("pool", hash_password)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
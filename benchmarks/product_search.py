@@ -0,0 +1,146 @@
+"""Поиск товаров в каталоге из миллиона записей.
+
+Каталог создается в отдельной схеме `benchmark` (таблица с тем же определением
+и индексами, что и products) и сохраняется между запусками. Для каждого
+запроса измеряется время получения первой страницы (20 записей) и общего
+количества найденных товаров:
+
+    * ilike  - поиск подстроки в названии и описании (ILIKE '%запрос%'),
+      чтение всей таблицы;
+    * search - ProductRepository.search (полнотекстовый индекс GIN и индекс
+      триграмм pg_trgm), как в GET /products/search.
+
+Для сравнения один раз измеряется загрузка всего каталога, которую до
+появления поиска выполнял клиент.
+
+Запуск:
+
+```
+python -m benchmarks.product_search
+DROP SCHEMA benchmark CASCADE  -- удаление каталога
+```
+"""
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import func, or_, select, text
+
+from app.core.database.database import async_session_maker, current_session, dispose_engine, init_engine
+from app.modules.products.models import Product
+from app.modules.products.repository import ProductRepository
+
+SCHEMA = "benchmark"
+ROWS = 1_000_000
+PAGE = 20
+REPEAT = 5
+
+BRANDS = (
+    "acme", "zenith", "orbit", "nova", "vertex", "pulse", "lumen", "atlas", "quanta", "helix",
+    "nimbus", "apex", "vortex", "echo", "fusion", "delta", "sigma", "polar", "titan", "aurora",
+)
+ADJECTIVES = (
+    "gaming", "office", "wireless", "compact", "portable", "premium", "budget", "ergonomic",
+    "waterproof", "smart", "classic", "professional", "mechanical", "silent", "ultra", "mini",
+)
+NOUNS = (
+    "laptop", "keyboard", "mouse", "monitor", "headphones", "speaker", "camera", "tablet",
+    "charger", "router", "printer", "microphone", "backpack", "watch", "phone", "projector",
+)
+# Запросы: слово, несколько слов, фраза, исключение, опечатка в названии
+QUERIES = ("laptop", "nova wireless mouse", '"gaming keyboard"', "atlas monitor -budget", "headphnoes", "projectr")
+
+
+def _array(values: tuple[str, ...]) -> str:
+    return "ARRAY[" + ", ".join(f"'{value}'" for value in values) + "]"
+
+
+async def create_catalog(session) -> None:
+    """Создать и заполнить каталог, если его еще нет."""
+    await session.execute(text(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}"))
+    await session.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {SCHEMA}.products (LIKE public.products INCLUDING DEFAULTS INCLUDING GENERATED)"
+    ))
+    count = (await session.execute(text(f"SELECT count(*) FROM {SCHEMA}.products"))).scalar_one()
+    if count >= ROWS:
+        return
+    print(f"Заполнение каталога ({ROWS} товаров)...")
+    started = time.perf_counter()
+    await session.execute(text(f"""
+        INSERT INTO {SCHEMA}.products (id, name, description, price, created_ad)
+        SELECT
+            i,
+            b[1 + (i * 17) % {len(BRANDS)}] || ' ' || a[1 + (i * 7) % {len(ADJECTIVES)}] || ' '
+                || n[1 + (i * 11) % {len(NOUNS)}] || ' ' || i,
+            'The ' || a[1 + (i * 3) % {len(ADJECTIVES)}] || ' ' || n[1 + (i * 5) % {len(NOUNS)}]
+                || ' for home and ' || a[1 + (i * 13) % {len(ADJECTIVES)}] || ' use',
+            round((random() * 1000)::numeric, 2),
+            now()
+        FROM generate_series(1, {ROWS}) AS i,
+            (SELECT {_array(BRANDS)} AS b, {_array(ADJECTIVES)} AS a, {_array(NOUNS)} AS n) AS vocabulary
+    """))
+    # Индексы создаются после заполнения по определениям индексов таблицы products
+    indexes = await session.execute(text(
+        "SELECT indexdef FROM pg_indexes WHERE schemaname = 'public' AND tablename = 'products'"
+    ))
+    for (definition,) in indexes.all():
+        await session.execute(text(definition.replace(" ON public.products ", f" ON {SCHEMA}.products ")))
+    await session.execute(text(f"ANALYZE {SCHEMA}.products"))
+    await session.commit()
+    print(f"Каталог создан за {time.perf_counter() - started:.0f} с")
+
+
+async def measure(call) -> tuple[float, int]:
+    """Медиана времени вызова (мс) и его результат."""
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+async def ilike(term: str) -> int:
+    session = current_session.get()
+    pattern = "%" + term.strip('"') + "%"
+    condition = or_(Product.name.ilike(pattern), Product.description.ilike(pattern))
+    await session.execute(select(Product.id).where(condition).order_by(Product.id.desc()).limit(PAGE))
+    return (await session.execute(select(func.count()).select_from(Product).where(condition))).scalar_one()
+
+
+async def search(term: str) -> int:
+    repository = ProductRepository.search(term)
+    await repository.get_page(PAGE)
+    return await repository.count()
+
+
+async def main() -> None:
+    init_engine()
+    try:
+        async with async_session_maker() as session:
+            await create_catalog(session)
+
+        async with async_session_maker() as session:
+            # Запросы выполняются к основной базе данных и к таблице каталога
+            session.info["writes"] = True
+            await session.execute(text(f"SET LOCAL search_path TO {SCHEMA}"))
+            token = current_session.set(session)
+            try:
+                started = time.perf_counter()
+                rows = (await session.execute(select(Product.id, Product.name, Product.description, Product.price))).all()
+                print(f"Загрузка всего каталога: {len(rows)} строк за {(time.perf_counter() - started) * 1000:.0f} мс")
+                del rows
+
+                print(f"{'запрос':<22}{'ilike, мс':>12}{'search, мс':>12}{'найдено ilike':>15}{'найдено search':>16}")
+                for term in QUERIES:
+                    ilike_time, ilike_count = await measure(lambda: ilike(term))
+                    search_time, search_count = await measure(lambda: search(term))
+                    print(f"{term:<22}{ilike_time:>12.1f}{search_time:>12.1f}{ilike_count:>15}{search_count:>16}")
+            finally:
+                current_session.reset(token)
+    finally:
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
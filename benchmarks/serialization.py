@@ -0,0 +1,119 @@
+"""Сравнение сериализации страницы записей: стандартный путь FastAPI и ответ без повторной валидации.
+
+Для каждой схемы ответа модулей users, products и orders страница из 100
+записей (экземпляров моделей, как их возвращает репозиторий) кодируется тремя
+способами:
+
+    * validated + json   - прежний путь: create_page, валидация ответа FastAPI, JSONResponse;
+    * validated + orjson - тот же путь с ORJSONResponse (класс ответа по умолчанию);
+    * trusted + orjson   - paginate_response: поля из атрибутов без валидации, ORJSONResponse.
+
+Проверяется, что все способы дают одинаковый JSON. База данных не нужна.
+
+Запуск:
+
+```
+python -m benchmarks.serialization
+```
+"""
+import asyncio
+import datetime
+import json
+import time
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from fastapi_pagination import Page, Params
+from fastapi_pagination.api import create_page, set_page
+
+from app.core.database.pagination import PageResponse
+from app.core.serialization import dump_trusted
+from app.modules.orders.models import Order
+from app.modules.orders.schemas import Order as OrderSchema, OrderExpanded
+from app.modules.products.models import Product
+from app.modules.products.schemas import Product as ProductSchema
+from app.modules.users.models import User
+from app.modules.users.schemas import User as UserSchema
+
+PAGE_SIZE = 100  # Максимальный размер страницы Params
+ROUNDS = 300
+
+
+def make_user(i: int) -> User:
+    return User(id=i, first_name=f"Имя {i}", last_name=f"Фамилия {i}", email=f"user{i}@example.com")
+
+
+def make_product(i: int) -> Product:
+    return Product(id=i, name=f"Товар {i}", description="Описание товара " * 4, price=i * 10.5)
+
+
+def make_order(i: int, expanded: bool = False) -> Order:
+    order = Order(
+        id=i, user_id=i, product_id=i, status="new",
+        created_ad=datetime.datetime(2024, 7, 1, 12, 30, 15, 123456),
+    )
+    if expanded:
+        order.user = make_user(i)
+        order.product = make_product(i)
+    return order
+
+
+CASES = {
+    "User": (UserSchema, [make_user(i) for i in range(PAGE_SIZE)]),
+    "Product": (ProductSchema, [make_product(i) for i in range(PAGE_SIZE)]),
+    "Order": (OrderSchema, [make_order(i) for i in range(PAGE_SIZE)]),
+    "OrderExpanded": (OrderExpanded, [make_order(i, expanded=True) for i in range(PAGE_SIZE)]),
+}
+
+
+def make_validated(schema, response_class):
+    field = create_response_field("Response", Page[schema], mode="serialization")
+
+    async def render(items) -> bytes:
+        with set_page(Page[schema]):
+            page = create_page(items, total=10_000, params=Params(size=PAGE_SIZE))
+        content = await serialize_response(field=field, response_content=page)
+        return response_class(content).body
+
+    return render
+
+
+def make_trusted(schema):
+    async def render(items) -> bytes:
+        with set_page(Page[schema]):
+            page = create_page([], total=10_000, params=Params(size=PAGE_SIZE))
+        return PageResponse(page, dump_trusted(schema, items)).body
+
+    return render
+
+
+async def measure(render, items) -> float:
+    """Среднее время формирования ответа в миллисекундах."""
+    await render(items)
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        await render(items)
+    return (time.perf_counter() - started) / ROUNDS * 1000
+
+
+async def main() -> None:
+    print(f"Страница из {PAGE_SIZE} записей, среднее по {ROUNDS} повторам, мс")
+    print(f"{'Схема':<15}{'validated+json':>16}{'validated+orjson':>18}{'trusted+orjson':>16}{'ускорение':>11}")
+    for name, (schema, items) in CASES.items():
+        renders = [
+            make_validated(schema, JSONResponse),
+            make_validated(schema, ORJSONResponse),
+            make_trusted(schema),
+        ]
+        bodies = [json.loads(await render(items)) for render in renders]
+        assert all(body == bodies[0] for body in bodies), f"{name}: ответы различаются"
+        timings = [await measure(render, items) for render in renders]
+        print(
+            f"{name:<15}{timings[0]:>16.3f}{timings[1]:>18.3f}{timings[2]:>16.3f}"
+            f"{timings[0] / timings[2]:>10.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,5 @@
+#!/bin/sh
+# Разрешает подключение реплики (сервис db-replica) для потоковой репликации.
+# Выполняется образом postgres только при создании новой базы данных.
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
@@ -1,6 +1,9 @@
+import gc
 import json
 import multiprocessing
 import os
+import shutil
+import time
 
 workers_per_core_str = os.getenv("WORKERS_PER_CORE", "1")
 max_workers_str = os.getenv("MAX_WORKERS")
@@ -35,6 +38,10 @@ use_errorlog = errorlog_var or None
 graceful_timeout_str = os.getenv("GRACEFUL_TIMEOUT", "120")
 timeout_str = os.getenv("TIMEOUT", "620")
 keepalive_str = os.getenv("KEEP_ALIVE", "5")
+preload_app_str = os.getenv("PRELOAD_APP", "true")
+# Каталог файлов метрик Prometheus, общий для всех воркеров (см. app/core/metrics.py).
+# Переменная задается до загрузки приложения: prometheus_client читает ее при импорте.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
 
 # Gunicorn config variables
 loglevel = use_loglevel
@@ -46,6 +53,10 @@ accesslog = use_accesslog
 graceful_timeout = int(graceful_timeout_str)
 timeout = int(timeout_str)
 keepalive = int(keepalive_str)
+# Приложение импортируется один раз в мастер-процессе, воркеры получают код
+# через fork (copy-on-write). Ресурсы, которые нельзя разделять между процессами
+# (движок и пул соединений БД), создаются в lifespan приложения в каждом воркере.
+preload_app = preload_app_str.lower() in ("1", "true", "yes")
 
 
 # For debugging and testing
@@ -56,6 +67,7 @@ log_data = {
     "graceful_timeout": graceful_timeout,
     "timeout": timeout,
     "keepalive": keepalive,
+    "preload_app": preload_app,
     "errorlog": errorlog,
     "accesslog": accesslog,
     # Additional, non-gunicorn variables
@@ -63,4 +75,63 @@ log_data = {
     "use_max_workers": use_max_workers,
     "host": host,
     "port": port,
-}
\ No newline at end of file
+}
+
+def on_starting(server):
+    # Итоговое число воркеров (с учетом --workers в командной строке) передается
+    # приложению: по нему каждый воркер делит бюджет соединений DB_MAX_CONNECTIONS
+    os.environ["WEB_CONCURRENCY"] = str(server.cfg.workers)
+    # Метрики предыдущего запуска сервера удаляются
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def pre_fork(server, worker):
+    # Объекты, загруженные в мастере, переносятся в постоянное поколение сборщика мусора:
+    # иначе сборка мусора в воркере затрагивает их страницы памяти и копирует их
+    gc.freeze()
+    worker.fork_started_at = time.monotonic()
+
+
+def post_fork(server, worker):
+    # При preload_app приложение и его настройки загружаются в мастере до on_starting,
+    # когда WEB_CONCURRENCY еще не выставлен. Число воркеров передается настройкам
+    # в каждом воркере до создания пула соединений (init_engine в lifespan).
+    from app.core.config.config import settings
+
+    settings.WEB_CONCURRENCY = server.cfg.workers
+
+
+def post_worker_init(worker):
+    # Время запуска и потребление памяти воркера для оценки эффекта preload_app:
+    # USS - память, принадлежащая только этому воркеру (без общих с мастером страниц)
+    memory = _memory_usage()
+    worker.log.info(
+        "Worker %s booted in %.3fs (preload_app=%s), RSS %.1f MB, USS %.1f MB",
+        worker.pid,
+        time.monotonic() - getattr(worker, "fork_started_at", time.monotonic()),
+        preload_app,
+        memory.get("Rss", 0) / 1024,
+        (memory.get("Private_Clean", 0) + memory.get("Private_Dirty", 0)) / 1024,
+    )
+
+
+def _memory_usage() -> dict:
+    """Сводка потребления памяти процесса из /proc/self/smaps_rollup (в КБ)."""
+    try:
+        with open("/proc/self/smaps_rollup") as file:
+            lines = file.readlines()[1:]
+    except OSError:
+        return {}
+    return {
+        name: int(value.split()[0])
+        for name, value in (line.split(":", 1) for line in lines)
+    }
+
+
+def child_exit(server, worker):
+    # Метрики-показатели (gauge) завершенного воркера больше не учитываются
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,179 @@
+"""Общие фикстуры тестов.
+
+Тесты работы с базой данных выполняются на сервере из настроек (.env) с
+примененными миграциями (`alembic upgrade head`) и пропускаются, если сервер
+недоступен. Записи, созданные тестами, удаляются после каждого теста.
+
+Запуск:
+
+```
+pytest
+```
+"""
+import importlib.util
+import pathlib
+import uuid
+
+import httpx
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import event, text
+
+from app.core.cache import get_cache
+from app.core.config.config import settings
+from app.core.database.database import async_session_maker, dispose_engine, get_engine, init_engine
+from app.main import app
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """Движок базы данных на время теста (как в lifespan приложения)."""
+    init_engine()
+    try:
+        async with async_session_maker() as session:
+            await session.execute(text("SELECT 1"))
+    except Exception as error:
+        await dispose_engine()
+        pytest.skip(f"База данных недоступна: {error}")
+    yield
+    await dispose_engine()
+
+
+@pytest.fixture
+async def session(db):
+    """Сессия для подготовки и проверки данных напрямую в базе данных."""
+    async with async_session_maker() as session:
+        session.info["writes"] = True
+        yield session
+
+
+@pytest.fixture
+async def client(db):
+    """HTTP-клиент приложения (без сетевого сервера)."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url=f"http://test{settings.API_V1_STR}") as client:
+        yield client
+
+
+@pytest.fixture
+def statements(db):
+    """Команды SQL, выполненные основным движком во время теста."""
+    executed: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engine = get_engine().sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+MIGRATIONS = pathlib.Path(__file__).resolve().parent.parent / "alembic" / "versions"
+
+
+def load_migration(revision: str):
+    """Загрузить модуль миграции по ее номеру."""
+    path = next(MIGRATIONS.glob(f"{revision}_*.py"))
+    spec = importlib.util.spec_from_file_location(f"migration_{revision}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+async def scratch(db, unique):
+    """Соединение с отдельной схемой для проверки миграций на собственных таблицах.
+
+    Таблицы и функции, создаваемые в тесте и миграциях без указания схемы,
+    создаются в этой схеме; после теста схема удаляется.
+    """
+    schema = unique.replace("-", "_")
+    async with get_engine().connect() as connection:
+        await connection.execute(text(f"CREATE SCHEMA {schema}"))
+        await connection.execute(text(f"SET search_path TO {schema}"))
+        await connection.commit()
+        try:
+            yield connection
+        finally:
+            await connection.rollback()
+            await connection.execute(text("RESET search_path"))
+            await connection.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+            await connection.commit()
+
+
+async def upgrade(connection, revision: str) -> None:
+    """Выполнить upgrade() миграции на соединении (в схеме scratch)."""
+    module = load_migration(revision)
+
+    def run(sync_connection):
+        context = MigrationContext.configure(sync_connection)
+        with Operations.context(context):
+            module.upgrade()
+
+    await connection.run_sync(run)
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    """Включить кэш чтения репозиториев в памяти процесса."""
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "memory")
+    get_cache.cache_clear()
+    yield get_cache()
+    get_cache.cache_clear()
+
+
+@pytest.fixture
+def unique():
+    """Уникальная строка для данных теста (названия, email)."""
+    return f"test-{uuid.uuid4().hex[:12]}"
+
+
+@pytest.fixture
+async def user_and_product(session, cleanup, unique):
+    """ID пользователя и товара, созданных для теста."""
+    user_id = (await session.execute(
+        text("INSERT INTO users (first_name, last_name, email) VALUES ('T', 'T', :email) RETURNING id"),
+        {"email": f"{unique}@example.com"},
+    )).scalar_one()
+    product_id = (await session.execute(
+        text("INSERT INTO products (name, price) VALUES (:name, 1) RETURNING id"), {"name": unique},
+    )).scalar_one()
+    await session.commit()
+    return user_id, product_id
+
+
+@pytest.fixture
+def create_products(session, cleanup, unique):
+    """Функция, создающая товары `{unique}-{номер}` с указанными ценами; возвращает их ID."""
+    async def create(*prices: float) -> list[int]:
+        ids = []
+        for number, price in enumerate(prices):
+            ids.append((await session.execute(
+                text("INSERT INTO products (name, price) VALUES (:name, :price) RETURNING id"),
+                {"name": f"{unique}-{number}", "price": price},
+            )).scalar_one())
+        await session.commit()
+        return ids
+
+    return create
+
+
+@pytest.fixture
+async def cleanup(session, unique):
+    """Удалить записи, созданные тестом (по уникальной строке в названии или email)."""
+    yield
+    await session.execute(
+        text("DELETE FROM orders WHERE user_id IN (SELECT id FROM users WHERE email LIKE :pattern) "
+             "OR product_id IN (SELECT id FROM products WHERE name LIKE :pattern)"),
+        {"pattern": f"{unique}%"},
+    )
+    await session.execute(text("DELETE FROM products WHERE name LIKE :pattern"), {"pattern": f"{unique}%"})
+    await session.execute(text("DELETE FROM users WHERE email LIKE :pattern"), {"pattern": f"{unique}%"})
+    await session.commit()
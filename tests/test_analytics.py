@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import text
+
+from app.modules.analytics.repository import AnalyticsRepository
+
+pytestmark = pytest.mark.anyio
+
+# Заказы тестов датированы далеким будущим, чтобы выборки за период содержали только их
+PERIOD = {"date_from": "2099-01-01", "date_to": "2099-01-31"}
+
+
+async def rollup(session, product_id) -> dict:
+    rows = await session.execute(text(
+        "SELECT day::text, status, orders_count FROM order_rollup_products WHERE product_id = :id"
+    ), {"id": product_id})
+    return {(day, status): count for day, status, count in rows.all() if count}
+
+
+@pytest.fixture
+async def orders(session, user_and_product) -> list[int]:
+    user_id, product_id = user_and_product
+    ids = (await session.execute(text(
+        "INSERT INTO orders (user_id, product_id, status, order_date) VALUES "
+        "(:user, :product, 'new', '2099-01-01 10:00'), (:user, :product, 'new', '2099-01-01 12:00'), "
+        "(:user, :product, 'paid', '2099-01-02 09:00') RETURNING id"
+    ), {"user": user_id, "product": product_id})).scalars().all()
+    await session.commit()
+    return ids
+
+
+async def test_rollups_follow_inserts_updates_and_deletes(session, orders, user_and_product):
+    product_id = user_and_product[1]
+    assert await rollup(session, product_id) == {("2099-01-01", "new"): 2, ("2099-01-02", "paid"): 1}
+
+    await session.execute(text("UPDATE orders SET status = 'paid' WHERE id = :id"), {"id": orders[0]})
+    await session.execute(text("DELETE FROM orders WHERE id = :id"), {"id": orders[2]})
+    await session.commit()
+
+    assert await rollup(session, product_id) == {("2099-01-01", "new"): 1, ("2099-01-01", "paid"): 1}
+
+
+async def test_rebuild_restores_rollups(session, orders, user_and_product):
+    product_id = user_and_product[1]
+    expected = await rollup(session, product_id)
+    await session.execute(text("UPDATE order_rollup_products SET orders_count = 99 WHERE product_id = :id"),
+                          {"id": product_id})
+    await session.commit()
+
+    await AnalyticsRepository.rebuild()
+
+    assert await rollup(session, product_id) == expected
+
+
+async def test_analytics_endpoints_read_rollups(client, orders, user_and_product):
+    user_id, product_id = user_and_product
+
+    products = (await client.get("/analytics/products", params=PERIOD)).json()
+    assert [(row["product_id"], row["orders_count"], row["revenue"]) for row in products] == [(product_id, 3, 3.0)]
+
+    users = (await client.get("/analytics/users", params={**PERIOD, "status": "new"})).json()
+    assert users == [{"user_id": user_id, "orders_count": 2}]
+
+    daily = (await client.get("/analytics/daily", params=PERIOD)).json()
+    assert [(row["day"], row["status"], row["orders_count"]) for row in daily] == [
+        ("2099-01-01", "new", 2), ("2099-01-02", "paid", 1),
+    ]
+
+
+async def test_invalid_period_is_rejected(client):
+    response = await client.get("/analytics/daily", params={"date_from": "2099-02-01", "date_to": "2099-01-01"})
+
+    assert response.status_code == 400
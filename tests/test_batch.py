@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import text
+
+from app.modules.orders.repository import OrderRepository
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_orders_batch_checks_references_with_one_query_per_table(client, user_and_product, statements):
+    user_id, product_id = user_and_product
+    items = [{"user_id": user_id, "product_id": product_id, "status": "new"} for _ in range(5)]
+
+    response = await client.post("/orders/add/batch", json=items)
+    assert response.status_code == 200, response.text
+    assert response.json()["count"] == 5
+
+    lookups = [sql for sql in statements if sql.lstrip().startswith("SELECT") and "= ANY" in sql]
+    assert len([sql for sql in lookups if "FROM users" in sql]) == 1
+    assert len([sql for sql in lookups if "FROM products" in sql]) == 1
+
+
+async def test_orders_batch_reports_missing_references(client, user_and_product):
+    user_id, product_id = user_and_product
+    items = [
+        {"user_id": user_id, "product_id": product_id, "status": "new"},
+        {"user_id": 0, "product_id": -1, "status": "new"},
+    ]
+    response = await client.post("/orders/add/batch", json=items)
+    assert response.status_code == 500
+    assert "Нет пользователей: 0" in response.json()["detail"]
+    assert "Нет товаров: -1" in response.json()["detail"]
+
+
+async def test_batch_update_reports_missing_ids(client, session, user_and_product, unique):
+    _, product_id = user_and_product
+    items = [
+        {"id": product_id, "name": f"{unique}-renamed", "description": None, "price": 7.5},
+        {"id": -1, "name": f"{unique}-missing", "description": None, "price": 1},
+    ]
+
+    response = await client.put("/products/edit/batch", json=items)
+
+    assert response.status_code == 200, response.text
+    assert (response.json()["count"], response.json()["not_found"]) == (1, [-1])
+    row = (await session.execute(
+        text("SELECT name, price FROM products WHERE id = :id"), {"id": product_id}
+    )).one()
+    assert tuple(row) == (f"{unique}-renamed", 7.5)
+
+
+async def test_bulk_update_groups_rows_by_fields(user_and_product, session):
+    user_id, product_id = user_and_product
+    order_ids = (await session.execute(text(
+        "INSERT INTO orders (user_id, product_id, status) VALUES (:user, :product, 'new'), (:user, :product, 'new') "
+        "RETURNING id"
+    ), {"user": user_id, "product": product_id})).scalars().all()
+    await session.commit()
+
+    updated = await OrderRepository.bulk_update([
+        {"id": order_ids[0], "status": "paid"},
+        {"id": order_ids[1], "status": "sent", "product_id": product_id},
+        {"id": 0, "status": "lost"},
+    ])
+
+    assert sorted(updated) == sorted(order_ids)
+    statuses = (await session.execute(
+        text("SELECT status FROM orders WHERE id = ANY(:ids) ORDER BY id"), {"ids": order_ids}
+    )).scalars().all()
+    assert statuses == ["paid", "sent"]
+
+
+async def test_bulk_create_inserts_chunks_with_multirow_statements(user_and_product, monkeypatch, statements):
+    user_id, product_id = user_and_product
+    monkeypatch.setattr(OrderRepository, "bulk_chunk_size", 2)
+    statements.clear()
+
+    ids = await OrderRepository.bulk_create(
+        [{"user_id": user_id, "product_id": product_id, "status": "new"} for _ in range(5)]
+    )
+
+    assert len(set(ids)) == 5
+    assert len([sql for sql in statements if sql.startswith("INSERT INTO orders")]) == 3
+
+
+async def test_batch_delete_counts_only_existing_records(client, create_products):
+    ids = await create_products(1, 2)
+
+    response = await client.post("/products/delete/batch", json=[*ids, -1])
+
+    assert response.status_code == 200, response.text
+    assert response.json()["count"] == 2
+    response = await client.get("/products/", params={"ids": ",".join(map(str, ids))})
+    assert response.json() == []
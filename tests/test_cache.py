@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from app.core.cache import MemoryCache
+from app.core.database.database import current_session
+from app.modules.products.repository import ProductRepository
+from app.modules.products.schemas import Product
+
+pytestmark = pytest.mark.anyio
+
+
+def product_reads(statements) -> list[str]:
+    return [sql for sql in statements if sql.lstrip().startswith("SELECT") and "FROM products" in sql]
+
+
+async def test_memory_cache_expires_and_evicts(monkeypatch):
+    cache = MemoryCache(max_entries=2)
+    now = time.monotonic()
+    await cache.set("a", b"1", ttl=10)
+    await cache.set("b", b"2", ttl=10)
+    await cache.get("a")  # "a" использовался недавно, вытесняется "b"
+    await cache.set("c", b"3", ttl=10)
+
+    assert (await cache.get("a"), await cache.get("b"), await cache.get("c")) == (b"1", None, b"3")
+    assert await cache.incr("version") == 1 and await cache.get("version") == b"1"
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert await cache.get("a") is None
+
+
+async def test_get_one_is_cached_until_update(db, memory_cache, create_products, statements):
+    [product_id] = await create_products(1)
+    statements.clear()
+
+    first = await ProductRepository.get_one(id=product_id)
+    second = await ProductRepository.get_one(id=product_id)
+    assert isinstance(second, Product) and second == first
+    assert len(product_reads(statements)) == 1
+
+    await ProductRepository.update(product_id, price=5)
+    assert (await ProductRepository.get_one(id=product_id)).price == 5
+    assert len(product_reads(statements)) == 2
+
+
+async def test_list_reads_are_cached_until_any_write(client, memory_cache, create_products, unique, statements):
+    await create_products(1, 2)
+    params = {"name_prefix": unique}
+    statements.clear()
+
+    first = await client.get("/products/", params=params)
+    reads = len(product_reads(statements))
+    second = await client.get("/products/", params=params)
+    assert second.json() == first.json()
+    assert len(product_reads(statements)) == reads
+
+    response = await client.put("/products/upsert", params={"name": f"{unique}-new", "price": 3})
+    assert response.status_code == 200, response.text
+    third = await client.get("/products/", params=params)
+    assert third.json()["total"] == 3
+
+
+async def test_list_reads_hit_database_without_cache(client, create_products, unique, statements):
+    await create_products(1)
+    statements.clear()
+
+    await client.get("/products/", params={"name_prefix": unique})
+    reads = len(product_reads(statements))
+    await client.get("/products/", params={"name_prefix": unique})
+    assert len(product_reads(statements)) == 2 * reads
+
+
+@pytest.mark.parametrize("cache", [False, True], ids=["no-cache", "memory-cache"])
+@pytest.mark.parametrize("writes", [False, True], ids=["read", "write-session"])
+async def test_reads_return_schema_instances(db, create_products, unique, request, cache, writes):
+    if cache:
+        request.getfixturevalue("memory_cache")
+    [product_id] = await create_products(1)
+    session = request.getfixturevalue("session") if writes else None
+    token = current_session.set(session) if writes else None
+    try:
+        one = await ProductRepository.get_one(id=product_id)
+        items = await ProductRepository.get_all(name__prefix=unique)
+        page, _ = await ProductRepository.get_page_after(10, name__prefix=unique)
+        many = await ProductRepository.get_many([product_id])
+    finally:
+        if writes:
+            current_session.reset(token)
+
+    for item in (one, *items, *page, *many):
+        assert type(item) is Product and item.id == product_id
@@ -0,0 +1,123 @@
+import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from app.core.database.changes import SNAPSHOT_XMIN, ChangeCursor, prune_tombstones
+from app.core.database.database import get_engine
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("value, cursor", [
+    (None, ChangeCursor(0, 0, False, 0)),
+    ("10-5-0-7", ChangeCursor(10, 5, False, 7)),
+    ("10-5-1-7", ChangeCursor(10, 5, True, 7)),
+])
+def test_cursor_round_trip(value, cursor):
+    assert ChangeCursor.parse(value) == cursor
+    if value is not None:
+        assert str(cursor) == value
+
+
+def test_cursor_without_base_starts_from_the_beginning():
+    assert ChangeCursor.parse("10-5-1") == ChangeCursor(10, 5, True, 0)
+
+
+@pytest.mark.parametrize("value", ["", "1-2", "1-2-3", "a-b-0", "1-2-0-3-4"])
+def test_invalid_cursor_is_rejected(value):
+    with pytest.raises(HTTPException) as error:
+        ChangeCursor.parse(value)
+    assert error.value.status_code == 400
+
+
+@pytest.fixture
+async def since(session) -> str:
+    """Курсор после всех изменений, завершенных до начала теста."""
+    horizon = (await session.execute(text(f"SELECT {SNAPSHOT_XMIN.text}"))).scalar_one()
+    await session.commit()
+    return str(ChangeCursor(horizon - 1, 2 ** 31 - 1, True))
+
+
+async def read_all(client, since: str, limit: int = 100) -> tuple[list[dict], list[int], str]:
+    items, deleted = [], []
+    while True:
+        response = await client.get("/products/changes", params={"since": since, "limit": limit})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        items += page["items"]
+        deleted += page["deleted"]
+        since = page["next_cursor"]
+        if not page["has_more"]:
+            return items, deleted, since
+
+
+async def test_changes_include_updates_and_tombstones(client, session, since, create_products, unique):
+    first, second = await create_products(1, 2)
+    await session.execute(text("UPDATE products SET price = 10 WHERE id = :id"), {"id": first})
+    await session.execute(text("DELETE FROM products WHERE id = :id"), {"id": second})
+    await session.commit()
+
+    items, deleted, cursor = await read_all(client, since)
+
+    assert [(item["id"], item["price"]) for item in items] == [(first, 10)]
+    assert deleted == [second]
+    # Курсор последнего ответа не возвращает уже полученные изменения
+    assert await read_all(client, cursor) == ([], [], cursor)
+
+
+async def test_small_pages_return_the_same_changes(client, session, since, create_products):
+    ids = await create_products(1, 2, 3)
+    await session.execute(text("DELETE FROM products WHERE id = :id"), {"id": ids[1]})
+    await session.commit()
+
+    items, deleted, _ = await read_all(client, since, limit=1)
+
+    assert sorted(item["id"] for item in items) == [ids[0], ids[2]]
+    assert deleted == [ids[1]]
+
+
+async def test_changes_wait_for_earlier_transactions(client, session, since, cleanup, unique):
+    async with get_engine().connect() as pending:
+        # Транзакция получает номер раньше, а фиксируется позже следующей
+        await pending.execute(text("INSERT INTO products (name, price) VALUES (:name, 1)"), {"name": f"{unique}-slow"})
+        await session.execute(text("INSERT INTO products (name, price) VALUES (:name, 1)"), {"name": f"{unique}-fast"})
+        await session.commit()
+
+        items, _, cursor = await read_all(client, since)
+        assert [item["name"] for item in items if item["name"].startswith(unique)] == []
+
+        await pending.commit()
+
+    items, _, _ = await read_all(client, cursor)
+    assert sorted(item["name"] for item in items) == [f"{unique}-fast", f"{unique}-slow"]
+
+
+@pytest.fixture
+async def pruned(session):
+    yield
+    await session.rollback()
+    await session.execute(text("DELETE FROM deleted_records_pruned WHERE table_name = 'products'"))
+    await session.commit()
+
+
+async def test_pruned_tombstones_require_full_sync(client, session, since, create_products, pruned):
+    removed, = await create_products(1)
+    await session.execute(text("DELETE FROM products WHERE id = :id"), {"id": removed})
+    await session.execute(
+        text("UPDATE deleted_records SET deleted_ad = deleted_ad - interval '2 days' WHERE record_id = :id"),
+        {"id": removed},
+    )
+    await session.commit()
+
+    assert await prune_tombstones(datetime.timedelta(days=1)) >= 1
+
+    # Клиент, не получивший очищенное удаление, должен синхронизироваться заново
+    response = await client.get("/products/changes", params={"since": since})
+    assert response.status_code == 410
+    # Полная синхронизация начата после очистки: ее курсоры не отклоняются
+    response = await client.get("/products/changes", params={"limit": 1})
+    cursor = response.json()["next_cursor"]
+    assert ChangeCursor.parse(cursor).xid < ChangeCursor.parse(since).xid
+    assert (await client.get("/products/changes", params={"since": cursor, "limit": 1})).status_code == 200
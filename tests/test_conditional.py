@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import text
+
+from app.core.database.database import get_engine
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_product(client, name: str, price: float = 10) -> int:
+    response = await client.put("/products/upsert", params={"name": name, "price": price})
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+@pytest.mark.parametrize("cache", [False, True], ids=["no-cache", "memory-cache"])
+async def test_list_etag_and_not_modified(client, cleanup, unique, request, cache):
+    if cache:
+        request.getfixturevalue("memory_cache")
+    await create_product(client, f"{unique}-a")
+
+    response = await client.get("/products/", params={"name_prefix": unique})
+    assert response.status_code == 200, response.text
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert "last-modified" not in response.headers
+
+    response = await client.get("/products/", params={"name_prefix": unique}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    # Добавление записи в выборку меняет версию
+    await create_product(client, f"{unique}-b")
+    response = await client.get("/products/", params={"name_prefix": unique}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["total"] == 2
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.parametrize("cache", [False, True], ids=["no-cache", "memory-cache"])
+async def test_item_etag_changes_on_update(client, cleanup, unique, request, cache):
+    if cache:
+        request.getfixturevalue("memory_cache")
+    product_id = await create_product(client, unique)
+
+    response = await client.get(f"/products/{product_id}")
+    assert response.status_code == 200, response.text
+    assert response.json()["name"] == unique
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+
+    response = await client.get(f"/products/{product_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    response = await client.get(f"/products/{product_id}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    await create_product(client, unique, price=20)  # upsert обновляет запись, триггер меняет update_ad
+    response = await client.get(f"/products/{product_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["price"] == 20
+
+
+async def test_item_not_found(client):
+    response = await client.get("/products/0")
+    assert response.status_code == 404
+
+
+async def test_list_etag_changes_when_earlier_transaction_commits_later(client, session, cleanup, unique):
+    slow = await create_product(client, f"{unique}-slow")
+    await create_product(client, f"{unique}-fast")
+    async with get_engine().connect() as pending:
+        # Транзакция начинается и изменяет запись раньше, а фиксируется позже следующей
+        await pending.execute(text("UPDATE products SET price = 2 WHERE id = :id"), {"id": slow})
+        await create_product(client, f"{unique}-fast", price=3)
+
+        response = await client.get("/products/", params={"name_prefix": unique})
+        etag = response.headers["etag"]
+
+        await pending.commit()
+
+    response = await client.get("/products/", params={"name_prefix": unique}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert sorted(item["price"] for item in response.json()["items"]) == [2, 3]
@@ -0,0 +1,37 @@
+import io
+
+import pytest
+from sqlalchemy import text
+
+from app.core.csv_import import CsvRecords
+from app.modules.products.schemas import ProductCreate
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_records_are_read_and_validated_in_chunks():
+    file = io.StringIO("name,description,price\na,,1\nb,x,oops\nc,,3\nd,,4\ne,,5\n")
+    records = CsvRecords(file, ProductCreate, chunk_size=2)
+
+    batches = [batch async for batch in records]
+
+    assert batches == [[("a", "", 1.0)], [("c", "", 3.0), ("d", "", 4.0)], [("e", "", 5.0)]]
+    assert (records.total, records.invalid) == (5, 1)
+
+
+async def test_products_import_skips_invalid_and_duplicate_rows(client, session, cleanup, unique):
+    await session.execute(text("INSERT INTO products (name, price) VALUES (:name, 1)"), {"name": f"{unique}-old"})
+    await session.commit()
+    lines = ["name,description,price"]
+    lines += [f"{unique}-{number},,{number}" for number in range(20)]
+    lines += [f"{unique}-old,,1", f"{unique}-0,,1", f"{unique}-bad,,price"]
+    content = "\n".join(lines).encode()
+
+    response = await client.post("/products/import", files={"file": ("products.csv", content, "text/csv")})
+
+    assert response.status_code == 200, response.text
+    assert (response.json()["inserted"], response.json()["skipped"]) == (20, 3)
+    count = (await session.execute(
+        text("SELECT count(*) FROM products WHERE name LIKE :pattern"), {"pattern": f"{unique}-%"}
+    )).scalar_one()
+    assert count == 21
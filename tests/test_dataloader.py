@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app.core.database.database import async_session_maker, current_session
+from app.core.dataloader import BatchLoader
+from app.modules.products.repository import ProductRepository
+from app.modules.users.repository import UserRepository
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_batch_loader_merges_concurrent_loads():
+    calls = []
+
+    async def load_many(keys):
+        calls.append(keys)
+        return {key: key * 10 for key in keys if key != 3}
+
+    loader = BatchLoader(load_many)
+    results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(3))
+    assert results == [10, 20, 10, None]
+    assert calls == [[1, 2, 3]]
+
+
+async def test_batch_loader_propagates_errors():
+    async def load_many(keys):
+        raise RuntimeError("boom")
+
+    loader = BatchLoader(load_many)
+    with pytest.raises(RuntimeError, match="boom"):
+        await loader.load_many([1, 2])
+
+
+async def test_concurrent_loads_of_different_repositories_in_request_session(user_and_product):
+    # Пакеты загрузчиков разных репозиториев выполняются в одной сессии запроса по очереди
+    user_id, product_id = user_and_product
+    async with async_session_maker() as request_session:
+        token = current_session.set(request_session)
+        try:
+            user, product = await asyncio.gather(
+                UserRepository.get_one(id=user_id), ProductRepository.get_one(id=product_id)
+            )
+            users, products = await asyncio.gather(
+                UserRepository.get_many([user_id, 0]), ProductRepository.get_many([product_id])
+            )
+        finally:
+            current_session.reset(token)
+    assert (user.id, product.id) == (user_id, product_id)
+    assert [item.id for item in users] == [user_id]
+    assert [item.id for item in products] == [product_id]
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import text
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def orders(session, user_and_product) -> list[int]:
+    user_id, product_id = user_and_product
+    ids = (await session.execute(text(
+        "INSERT INTO orders (user_id, product_id, status) SELECT :user, :product, 'new' FROM generate_series(1, 3) "
+        "RETURNING id"
+    ), {"user": user_id, "product": product_id})).scalars().all()
+    await session.commit()
+    return ids
+
+
+async def test_list_embeds_relations_in_one_query(client, orders, user_and_product, unique, statements):
+    user_id, product_id = user_and_product
+
+    response = await client.get("/orders/", params={"user_id": user_id, "expand": "user,product"})
+
+    assert response.status_code == 200, response.text
+    items = response.json()["items"]
+    assert len(items) == 3
+    assert {(item["user"]["email"], item["product"]["name"]) for item in items} == {
+        (f"{unique}@example.com", unique)
+    }
+    # Пользователи и товары загружаются вместе со страницей заказов, без запроса на каждый заказ
+    page_queries = [sql for sql in statements if "FROM orders" in sql and "JOIN" in sql]
+    assert len(page_queries) == 1
+    assert not [sql for sql in statements if "FROM users" in sql and "JOIN" not in sql and "max(" not in sql]
+
+
+async def test_list_without_expand_has_null_relations(client, orders, user_and_product):
+    response = await client.get("/orders/", params={"user_id": user_and_product[0]})
+
+    assert response.status_code == 200, response.text
+    assert all(item["user"] is None and item["product"] is None for item in response.json()["items"])
+
+
+async def test_item_embeds_requested_relation_only(client, orders, unique):
+    response = await client.get(f"/orders/{orders[0]}", params={"expand": "product"})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["product"]["name"] == unique
+    assert response.json()["user"] is None
+
+
+async def test_related_changes_change_etag(client, session, orders, user_and_product):
+    user_id, product_id = user_and_product
+    expanded, plain = {"user_id": user_id, "expand": "product"}, {"user_id": user_id}
+    etags = [(await client.get("/orders/", params=params)).headers["etag"] for params in (expanded, plain)]
+
+    await session.execute(text("UPDATE products SET price = 2 WHERE id = :id"), {"id": product_id})
+    await session.commit()
+
+    assert (await client.get("/orders/", params=expanded)).headers["etag"] != etags[0]
+    assert (await client.get("/orders/", params=plain)).headers["etag"] == etags[1]
+
+
+async def test_unknown_relation_is_rejected(client):
+    response = await client.get("/orders/", params={"expand": "user,payments"})
+
+    assert response.status_code == 400
+    assert "payments" in response.json()["detail"]
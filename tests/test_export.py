@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app.modules.products.repository import ProductRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def legacy_products(session, cleanup, unique):
+    """Товары, среди которых есть записи без цены (добавленные до проверки схемой)."""
+    await session.execute(
+        text("INSERT INTO products (name, price) VALUES (:first, 10.5), (:legacy, NULL), (:last, 3)"),
+        {"first": f"{unique}-1", "legacy": f"{unique}-2", "last": f"{unique}-3"},
+    )
+    await session.commit()
+
+
+async def test_ndjson_export_includes_legacy_rows(client, legacy_products, unique):
+    response = await client.get("/products/export", params={"format": "ndjson", "name_prefix": unique})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(row["name"], row["price"]) for row in rows] == [
+        (f"{unique}-1", 10.5), (f"{unique}-2", None), (f"{unique}-3", 3.0),
+    ]
+    assert set(rows[0]) == {"id", "name", "description", "price"}
+
+
+async def test_csv_export_includes_legacy_rows(client, legacy_products, unique):
+    response = await client.get("/products/export", params={"format": "csv", "name_prefix": unique})
+    assert response.status_code == 200
+    assert 'filename="products.csv"' in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(row["name"], row["price"]) for row in rows] == [
+        (f"{unique}-1", "10.5"), (f"{unique}-2", ""), (f"{unique}-3", "3.0"),
+    ]
+
+
+async def test_csv_export_formats_datetimes_as_iso(client, user_and_product, session):
+    user_id, _ = user_and_product
+    await session.execute(text(
+        "INSERT INTO orders (user_id, product_id, status, created_ad) "
+        "SELECT :user_id, id, 'new', '2024-05-06 07:08:09' FROM products WHERE id = :product_id"
+    ), {"user_id": user_id, "product_id": user_and_product[1]})
+    await session.commit()
+
+    response = await client.get("/orders/export", params={"format": "csv", "user_id": user_id})
+    assert response.status_code == 200
+    [row] = list(csv.DictReader(io.StringIO(response.text)))
+    assert row["created_ad"] == "2024-05-06T07:08:09"
+    assert row["status"] == "new"
+
+
+async def test_stream_reads_partitions_through_server_side_cursor(db, create_products, unique, monkeypatch):
+    ids = await create_products(1, 2, 3, 4, 5)
+    monkeypatch.setattr(ProductRepository, "stream_chunk_size", 2)
+
+    partitions = [[row.id for row in rows] async for rows in ProductRepository.stream(name__prefix=unique)]
+
+    assert partitions == [ids[0:2], ids[2:4], ids[4:]]
@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from app.core.database.filters import EQ, PREFIX, RANGE, FilterSpec, compile_filters, compile_sort
+from app.modules.orders.models import Order
+from app.modules.products.models import Product
+
+pytestmark = pytest.mark.anyio
+
+
+def sql(model, filters: dict, sort: str = "id") -> str:
+    query = select(model.id).where(*compile_filters(model, filters)).order_by(*compile_sort(model, sort))
+    return str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_filters_compile_to_index_friendly_conditions():
+    query = sql(Order, {"status__in": ["new", "paid"], "user_id": 1, "created_ad__gte": "2024-01-01"}, "-created_ad")
+
+    assert "orders.status = ANY (ARRAY['new', 'paid'])" in query
+    assert "orders.user_id = 1" in query
+    assert "orders.created_ad >= '2024-01-01'" in query
+    assert query.endswith("ORDER BY orders.created_ad DESC, orders.id DESC")
+
+
+async def test_prefix_treats_pattern_characters_literally(client, session, cleanup, unique):
+    await session.execute(
+        text("INSERT INTO products (name, price) VALUES (:literal, 1), (:other, 1)"),
+        {"literal": f"{unique}-50%_off", "other": f"{unique}-50x-off"},
+    )
+    await session.commit()
+
+    response = await client.get("/products/", params={"name_prefix": f"{unique}-50%_"})
+
+    assert response.status_code == 200, response.text
+    assert [item["name"] for item in response.json()["items"]] == [f"{unique}-50%_off"]
+
+
+@pytest.mark.parametrize("filters", [{"unknown": 1}, {"name__contains": "a"}])
+def test_unknown_filters_are_rejected(filters):
+    with pytest.raises(ValueError):
+        compile_filters(Product, filters)
+
+
+@pytest.mark.parametrize("filters, sorts", [
+    ({"description": EQ}, ()),  # нет индекса
+    ({"price": PREFIX}, ()),  # индекс без text_pattern_ops
+    ({"name": RANGE}, ("description",)),
+])
+def test_spec_requires_supporting_index(filters, sorts):
+    with pytest.raises(ValueError, match="Нет индекса"):
+        FilterSpec(Product, filters, sorts=sorts)
+
+
+async def test_list_filters_and_sort(client, create_products, unique):
+    await create_products(5, 1, 3, 2)
+
+    response = await client.get("/products/", params={
+        "name_prefix": unique, "price_from": 2, "price_to": 4, "sort": "-price",
+    })
+
+    assert response.status_code == 200, response.text
+    assert [item["price"] for item in response.json()["items"]] == [3, 2]
+
+
+async def test_in_filter_on_orders(client, session, user_and_product):
+    user_id, product_id = user_and_product
+    await session.execute(text(
+        "INSERT INTO orders (user_id, product_id, status) SELECT :user, :product, status "
+        "FROM unnest(ARRAY['new', 'paid', 'sent']) AS status"
+    ), {"user": user_id, "product": product_id})
+    await session.commit()
+
+    response = await client.get("/orders/", params={"user_id": user_id, "status": "paid,sent,paid"})
+
+    assert response.status_code == 200, response.text
+    assert sorted(item["status"] for item in response.json()["items"]) == ["paid", "sent"]
+
+
+@pytest.mark.parametrize("path, params, code", [
+    ("/products/", {"colour": "red"}, 400),  # неизвестный параметр
+    ("/products/", {"sort": "description"}, 422),  # сортировка без индекса
+    ("/orders/", {"status": ",".join(map(str, range(101)))}, 400),  # слишком много значений
+    ("/orders/", {"user_id": "abc"}, 422),
+])
+async def test_invalid_list_params_are_rejected(client, path, params, code):
+    response = await client.get(path, params=params)
+
+    assert response.status_code == code, response.text
@@ -0,0 +1,53 @@
+import importlib.util
+import os
+import pathlib
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config.config import settings
+from app.core.database.database import get_engine
+
+
+def load_gunicorn_conf(monkeypatch, tmp_path):
+    # Конфигурация задает переменные окружения процесса: после теста они восстанавливаются
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    path = pathlib.Path(__file__).resolve().parent.parent / "gunicorn_conf.py"
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_post_fork_divides_connection_budget_between_workers(monkeypatch, tmp_path):
+    # Настройки уже загружены (как при preload_app) с одним воркером
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", None)
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 80)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    assert settings.db_pool_size == 80
+
+    conf = load_gunicorn_conf(monkeypatch, tmp_path)
+    conf.post_fork(SimpleNamespace(cfg=SimpleNamespace(workers=4)), None)
+
+    assert settings.WEB_CONCURRENCY == 4
+    assert settings.db_pool_size == 20
+
+
+def test_on_starting_exports_workers_and_resets_metrics_dir(monkeypatch, tmp_path):
+    conf = load_gunicorn_conf(monkeypatch, tmp_path / "metrics")
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    (tmp_path / "metrics").mkdir()
+    (tmp_path / "metrics" / "counter_1.db").write_bytes(b"old")
+
+    conf.on_starting(SimpleNamespace(cfg=SimpleNamespace(workers=3)))
+
+    assert os.environ["WEB_CONCURRENCY"] == "3"
+    assert list((tmp_path / "metrics").iterdir()) == []
+    assert conf.preload_app
+
+
+def test_engine_is_created_per_process():
+    # При импорте приложения (в мастере gunicorn) движок не создается, его создает lifespan воркера
+    with pytest.raises(RuntimeError):
+        get_engine()
@@ -0,0 +1,75 @@
+import re
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.database.database import get_engine
+from app.core.metrics import RequestMetrics, current_metrics
+from app.main import app
+
+pytestmark = pytest.mark.anyio
+
+
+def route_id(path: str, method: str = "GET") -> str:
+    [route] = [route for route in app.routes if getattr(route, "path", None) == path and method in route.methods]
+    return route.unique_id
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+async def test_server_timing_reports_request_statements(client, create_products, unique, statements):
+    await create_products(1, 2)
+    statements.clear()
+
+    response = await client.get("/products/", params={"name_prefix": unique})
+
+    assert response.status_code == 200, response.text
+    metrics = re.findall(r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', response.headers["server-timing"])
+    assert [name for name, _, _ in metrics] == ["db", "pool", "app", "total"]
+    durations = {name: float(duration) for name, duration, _ in metrics}
+    assert durations["db"] + durations["app"] == pytest.approx(durations["total"], abs=0.05)
+    count, rows = re.fullmatch(r"(\d+) statements, (\d+) rows", metrics[0][2]).groups()
+    assert int(count) == len(statements)
+    assert int(rows) >= 2  # строки страницы
+
+
+async def test_request_metrics_are_recorded_by_route(client):
+    route = route_id("/api/v1/products/")
+    before = sample("http_request_duration_seconds_count", route=route, method="GET", status="200")
+    statements_before = sample("db_statement_duration_seconds_count", route=route)
+
+    await client.get("/products/", params={"size": 1})
+
+    assert sample("http_request_duration_seconds_count", route=route, method="GET", status="200") == before + 1
+    assert sample("db_statement_duration_seconds_count", route=route) > statements_before
+
+
+async def test_unmatched_requests_and_metrics_endpoint(client):
+    await client.get("/no-such-path")
+
+    response = await client.get("http://test/metrics")
+
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}' in response.text
+
+
+async def test_failed_statements_do_not_leave_timings_behind(db):
+    metrics = RequestMetrics()
+    token = current_metrics.set(metrics)
+    try:
+        async with get_engine().connect() as connection:
+            with pytest.raises(DBAPIError):
+                await connection.execute(text("SELECT 1 / 0"))
+            await connection.rollback()
+            await connection.execute(text("SELECT 1"))
+            info = (await connection.get_raw_connection()).info
+    finally:
+        current_metrics.reset(token)
+
+    assert "query_started_at" not in info
+    assert len(metrics.statements) == 2
+    assert metrics.rows == 1
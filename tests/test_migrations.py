@@ -0,0 +1,59 @@
+"""Миграции данных и триггеры на таблицах в отдельной схеме (см. фикстуру scratch)."""
+import pytest
+from sqlalchemy import text
+
+from .conftest import upgrade
+
+pytestmark = pytest.mark.anyio
+
+TABLES = ("users", "products", "orders")
+
+
+async def create_tables(connection) -> None:
+    """Таблицы в состоянии до миграции e3b8f1a6c472: время записи без значений по умолчанию."""
+    for table in TABLES:
+        await connection.execute(text(
+            f"CREATE TABLE {table} (id serial PRIMARY KEY, created_ad timestamp, update_ad timestamp)"
+        ))
+
+
+async def test_timestamps_backfill_and_update_trigger(scratch):
+    await create_tables(scratch)
+    await scratch.execute(text(
+        "INSERT INTO products (created_ad, update_ad) VALUES "
+        "('2024-01-01', NULL), ('2024-01-02', '2024-02-01'), (NULL, NULL)"
+    ))
+
+    await upgrade(scratch, "e3b8f1a6c472")
+
+    rows = (await scratch.execute(text("SELECT id, created_ad, update_ad FROM products ORDER BY id"))).all()
+    assert str(rows[0].update_ad) == "2024-01-01 00:00:00"  # не изменялась - время добавления
+    assert str(rows[1].update_ad) == "2024-02-01 00:00:00"
+    assert rows[2].update_ad is not None
+
+    # Значения по умолчанию и триггер при UPDATE
+    new = (await scratch.execute(text(
+        "INSERT INTO products DEFAULT VALUES RETURNING created_ad, update_ad"
+    ))).one()
+    assert new.created_ad is not None and new.update_ad == new.created_ad
+    updated = (await scratch.execute(text(
+        "UPDATE products SET id = id WHERE id = 1 RETURNING update_ad"
+    ))).scalar_one()
+    assert updated > rows[0].update_ad
+
+
+async def test_created_ad_backfill(scratch):
+    await create_tables(scratch)
+    await scratch.execute(text(
+        "INSERT INTO orders (created_ad, update_ad) VALUES (NULL, '2024-03-01'), ('2024-01-01', '2024-01-01')"
+    ))
+    await upgrade(scratch, "e3b8f1a6c472")
+    await upgrade(scratch, "b5d8e2f9c614")
+
+    rows = (await scratch.execute(text("SELECT created_ad FROM orders ORDER BY id"))).scalars().all()
+    assert [str(value) for value in rows] == ["2024-03-01 00:00:00", "2024-01-01 00:00:00"]
+    nullable = (await scratch.execute(text(
+        "SELECT is_nullable FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = 'orders' AND column_name = 'created_ad'"
+    ))).scalar_one()
+    assert nullable == "NO"
@@ -0,0 +1,43 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_page_is_limited_in_database(client, create_products, statements):
+    total = (await client.get("/products/", params={"size": 1})).json()["total"]
+    # Новые записи - первые в сортировке по умолчанию (по убыванию id)
+    ids = await create_products(1, 2, 3, 4, 5)
+    statements.clear()
+
+    response = await client.get("/products/", params={"size": 2, "page": 2})
+
+    assert response.status_code == 200, response.text
+    page = response.json()
+    assert page["total"] == total + 5
+    assert [item["id"] for item in page["items"]] == sorted(ids, reverse=True)[2:4]
+    [query] = [sql for sql in statements if "FROM products" in sql and "LIMIT" in sql]
+    assert "OFFSET" in query
+
+
+async def test_cursor_pages_follow_each_other(client, create_products, statements):
+    ids = await create_products(1, 2, 3, 4, 5)
+
+    seen, params = [], {"size": 2}
+    for _ in range(3):
+        response = await client.get("/products/cursor", params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        seen += [item["id"] for item in page["items"]]
+        params["cursor"] = page["next_page"]
+
+    assert seen[:5] == sorted(ids, reverse=True)
+    assert seen == sorted(set(seen), reverse=True)
+    # Страницы после первой выбираются по ключу, без OFFSET и подсчета записей
+    queries = [sql for sql in statements if "FROM products" in sql and "LIMIT" in sql]
+    assert not any("OFFSET" in sql for sql in queries)
+    assert not any("count(" in sql for sql in statements)
+
+
+async def test_invalid_cursor_is_rejected(client):
+    response = await client.get("/products/cursor", params={"cursor": "bm90LWFuLWlk"})  # "not-an-id"
+    assert response.status_code == 400
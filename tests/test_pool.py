@@ -0,0 +1,73 @@
+import pytest
+
+from app.core.config.config import parse_hosts, settings
+from app.core.database.database import dispose_engine, get_engine, init_engine
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("workers, pool_size, overflow, expected", [
+    (4, None, 0, 20),  # бюджет делится между воркерами
+    (4, None, 5, 15),  # дополнительные соединения входят в бюджет
+    (100, None, 5, 1),  # не меньше одного соединения
+    (4, 7, 5, 7),  # явный размер пула
+])
+def test_pool_size_from_connection_budget(monkeypatch, workers, pool_size, overflow, expected):
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 80)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", workers)
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", pool_size)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", overflow)
+
+    assert settings.db_pool_size == expected
+
+
+async def test_exceeded_connection_budget_is_reported(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 80)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 100)
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", None)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 5)
+    assert settings.db_connections_per_server == 600
+
+    init_engine()
+    await dispose_engine()
+
+    assert "DB_MAX_CONNECTIONS=80" in caplog.text
+
+
+@pytest.mark.parametrize("value, hosts", [
+    ("replica1, replica2:5433", ["replica1", "replica2:5433"]),
+    ("", []),
+    (["replica1"], ["replica1"]),
+])
+def test_replica_hosts_are_parsed(value, hosts):
+    assert parse_hosts(value) == hosts
+
+
+async def test_engine_pool_follows_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 2)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 4)
+    init_engine()
+    try:
+        stats = get_engine().pool.stats()
+        assert (stats["max_overflow"], stats["timeout"]) == (2, 4)
+        assert get_engine().pool.size() == 3
+    finally:
+        await dispose_engine()
+
+
+async def test_pool_stats_count_checkouts(client):
+    async def get_stats():
+        response = await client.get("/system/pool")
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    before = await get_stats()
+    for _ in range(3):
+        await client.get("/products/", params={"size": 1})
+    after = await get_stats()
+
+    assert after["workers"] == settings.WEB_CONCURRENCY
+    assert after["size"] == settings.db_pool_size
+    assert after["checkout_count"] >= before["checkout_count"] + 3
+    assert after["checked_out"] <= after["size"] + after["max_overflow"]
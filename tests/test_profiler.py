@@ -0,0 +1,56 @@
+import time
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.config.config import settings
+from app.core.profiler import ProfilerMiddleware, sign_profile_request
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def profiled(tmp_path):
+    """Клиент приложения с профилировщиком, сохраняющим отчеты во временный каталог."""
+    app = Starlette(routes=[Route("/work", lambda request: PlainTextResponse(str(sum(range(1000)))))])
+    app.add_middleware(ProfilerMiddleware, directory=str(tmp_path))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def test_requests_without_header_are_not_profiled(profiled, tmp_path):
+    response = await profiled.get("/work")
+
+    assert response.text == "499500"
+    assert "x-profile-report" not in response.headers
+    assert not list(tmp_path.iterdir())
+
+
+async def test_local_request_with_header_saves_report(profiled, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ENVIRONMENT", "local")
+
+    response = await profiled.get("/work", headers={"X-Profile": "1"})
+
+    name = response.headers["x-profile-report"]
+    assert name.endswith("-work")
+    assert (tmp_path / f"{name}.prof").stat().st_size > 0
+    assert "function calls" in (tmp_path / f"{name}.txt").read_text()
+
+
+@pytest.mark.parametrize("header, profiled_request", [
+    ("1", False),
+    (lambda: sign_profile_request("/work", int(time.time()) + 60), True),
+    (lambda: sign_profile_request("/other", int(time.time()) + 60), False),
+    (lambda: sign_profile_request("/work", int(time.time()) - 1), False),
+], ids=["unsigned", "signed", "other-path", "expired"])
+async def test_production_requires_signed_header(profiled, monkeypatch, header, profiled_request):
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    value = header() if callable(header) else header
+
+    response = await profiled.get("/work", headers={"X-Profile": value})
+
+    assert response.status_code == 200
+    assert ("x-profile-report" in response.headers) == profiled_request
@@ -0,0 +1,12 @@
+import pytest
+
+from app.core.database.base_repository import registry
+from app.core.database.explain import find_full_scans
+from app.main import app  # noqa: F401 - регистрирует репозитории всех модулей
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_repository_queries_use_indexes(db):
+    assert registry
+    assert await find_full_scans(registry) == []
@@ -0,0 +1,43 @@
+import pytest
+
+from app.modules.products.repository import ProductRepository
+
+pytestmark = pytest.mark.anyio
+
+
+def writes(statements) -> list[str]:
+    return [sql for sql in statements if sql.lstrip().startswith(("INSERT", "UPDATE", "DELETE", "SELECT"))]
+
+
+async def test_create_returns_row_in_one_statement(db, cleanup, unique, statements):
+    product = await ProductRepository.create(name=unique, price=2.5)
+
+    assert (product.name, product.price) == (unique, 2.5)
+    assert product.id and product.created_ad is not None
+    [sql] = writes(statements)
+    assert sql.startswith("INSERT") and "RETURNING" in sql
+
+
+async def test_update_returns_row_in_one_statement(db, create_products, statements):
+    [product_id] = await create_products(1)
+    statements.clear()
+
+    product = await ProductRepository.update(product_id, price=9)
+
+    assert (product.id, product.price) == (product_id, 9)
+    [sql] = writes(statements)
+    assert sql.startswith("UPDATE") and "RETURNING" in sql
+
+
+async def test_update_missing_record_returns_none(db):
+    assert await ProductRepository.update(-1, price=9) is None
+
+
+async def test_delete_counts_deleted_rows_in_one_statement(db, create_products, statements):
+    [product_id] = await create_products(1)
+    statements.clear()
+
+    assert await ProductRepository.delete(id=product_id) == 1
+    assert await ProductRepository.delete(id=product_id) == 0
+    assert all(sql.startswith("DELETE") and "RETURNING" in sql for sql in writes(statements))
+    assert len(writes(statements)) == 2
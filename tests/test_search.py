@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import text
+
+from app.modules.products.repository import ProductRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def catalog(session, cleanup, unique):
+    """Товары для поиска; тесты пропускаются, если в базе нет расширения pg_trgm."""
+    installed = (await session.execute(text("SELECT count(*) FROM pg_extension WHERE extname = 'pg_trgm'"))).scalar()
+    if not installed:
+        pytest.skip("Расширение pg_trgm не установлено")
+    await session.execute(text(
+        "INSERT INTO products (name, description, price) VALUES "
+        "(:prefix || ' Laptop Pro', 'fast computer', 1), "
+        "(:prefix || ' Mouse', 'wireless, works with any laptop', 2), "
+        "(:prefix || ' Cable', 'usb', 3)"
+    ), {"prefix": unique})
+    await session.commit()
+
+
+def test_search_repository_is_not_cached():
+    repository = ProductRepository.search("laptop")
+
+    assert issubclass(repository, ProductRepository)
+    assert repository.search_text == "laptop" and repository.schema is None
+    assert ProductRepository.search_text is None
+
+
+async def search(client, unique, q: str) -> list[str]:
+    response = await client.get("/products/search", params={"q": q, "name_prefix": unique})
+    assert response.status_code == 200, response.text
+    return [item["name"].removeprefix(f"{unique} ") for item in response.json()["items"]]
+
+
+async def test_name_matches_rank_above_description_matches(client, catalog, unique):
+    assert await search(client, unique, "laptops") == ["Laptop Pro", "Mouse"]
+
+
+async def test_search_tolerates_typos_in_name(client, catalog, unique):
+    assert await search(client, unique, "laptp") == ["Laptop Pro"]
+
+
+async def test_websearch_syntax_excludes_words(client, catalog, unique):
+    assert await search(client, unique, "laptop -wireless") == ["Laptop Pro"]
+
+
+async def test_short_query_is_rejected(client):
+    response = await client.get("/products/search", params={"q": "a"})
+
+    assert response.status_code == 422
@@ -0,0 +1,54 @@
+import pytest
+
+from app.core.config.config import settings
+from app.modules.users import security
+from app.modules.users.security import hash_password, is_password_hash, verify_password
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def cheap_hashing(monkeypatch):
+    """Низкая стоимость хэширования, чтобы тесты выполнялись быстро."""
+    monkeypatch.setattr(settings, "PASSWORD_SCRYPT_N", 2 ** 10)
+
+
+async def test_hash_and_verify():
+    hashed = await hash_password("secret")
+
+    assert hashed.startswith("scrypt$1024$8$1$")
+    assert is_password_hash(hashed)
+    assert await verify_password("secret", hashed)
+    assert not await verify_password("wrong", hashed)
+
+
+@pytest.mark.parametrize("hashed", [
+    "plain-text",
+    "bcrypt$1024$8$1$c2FsdA==$aGFzaA==",
+    "scrypt$x$8$1$c2FsdA==$aGFzaA==",
+    "scrypt$1024$8$1$not-base64!$aGFzaA==",
+    "scrypt$1024$8$1$c2FsdA==$aGFzaA",  # неверное дополнение base64
+    "scrypt$1000$8$1$c2FsdA==$aGFzaA==",  # n не степень двойки
+    "scrypt$1024$0$1$c2FsdA==$aGFzaA==",
+])
+async def test_malformed_hash_is_rejected(hashed):
+    assert not await verify_password("secret", hashed)
+
+
+@pytest.mark.parametrize("n, r, p", [(2 ** 30, 8, 1), (2 ** 14, 1024, 1), (2 ** 14, 8, 64)])
+async def test_excessive_cost_is_rejected_without_hashing(monkeypatch, n, r, p):
+    def fail(*args, **kwargs):
+        raise AssertionError("scrypt не должен вычисляться")
+
+    monkeypatch.setattr(security, "_scrypt", fail)
+    hashed = f"scrypt${n}${r}${p}$c2FsdA==$aGFzaA=="
+
+    assert not is_password_hash(hashed)
+    assert not await verify_password("secret", hashed)
+
+
+async def test_hash_with_previous_parameters_is_still_verified(monkeypatch):
+    hashed = await hash_password("secret")
+    monkeypatch.setattr(settings, "PASSWORD_SCRYPT_N", 2 ** 11)
+
+    assert await verify_password("secret", hashed)
@@ -0,0 +1,49 @@
+import datetime
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from sqlalchemy import text
+
+from app.core.serialization import dump_trusted
+from app.modules.orders.schemas import OrderExpanded
+from app.modules.products.repository import ProductRepository
+from app.modules.products.schemas import Product
+
+pytestmark = pytest.mark.anyio
+
+
+def test_dump_matches_schema_serialization_with_nested_objects():
+    product = SimpleNamespace(id=2, name="Товар", description=None, price=1.5, extra="не выводится")
+    orders = [
+        SimpleNamespace(
+            id=1, user_id=3, product_id=2, status="new", created_ad=datetime.datetime(2024, 1, 2, 3, 4, 5),
+            user=None, product=product,
+        ),
+    ]
+
+    data = dump_trusted(OrderExpanded, orders)
+
+    expected = [OrderExpanded.model_validate(order, from_attributes=True).model_dump(mode="json") for order in orders]
+    assert orjson.loads(orjson.dumps(data)) == expected
+
+
+async def test_repository_records_serialize_like_schema(db, create_products):
+    ids = await create_products(1, 2.5)
+    items = await ProductRepository.get_many(ids)
+
+    expected = [Product.model_validate(item).model_dump(mode="json") for item in items]
+    assert orjson.loads(orjson.dumps(dump_trusted(Product, items))) == expected
+
+
+async def test_list_response_is_not_revalidated(client, session, create_products, unique):
+    await create_products(1)
+    # Запись, не соответствующая схеме ответа, не проверяется повторно и не ломает страницу
+    await session.execute(text("INSERT INTO products (name) VALUES (:name)"), {"name": f"{unique}-legacy"})
+    await session.commit()
+
+    response = await client.get("/products/", params={"name_prefix": unique, "sort": "name"})
+
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/json"
+    assert [item["price"] for item in response.json()["items"]] == [1.0, None]
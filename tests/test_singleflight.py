@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+
+from app.core.config.config import settings
+from app.core.database.database import async_session_maker, current_session
+from app.core.singleflight import COALESCED, LEADER, RECENT, SingleFlight
+from app.modules.products.repository import ProductRepository
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_calls_share_one_execution():
+    flight, calls = SingleFlight(), []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*[flight.do("key", call) for _ in range(5)])
+
+    assert len(calls) == 1
+    assert sorted(outcome for _, outcome in results) == [COALESCED] * 4 + [LEADER]
+    assert {value for value, _ in results} == {"result"}
+    assert flight.ratio() == 0.8
+
+
+async def test_error_is_passed_to_waiting_calls():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ValueError("ошибка чтения")
+
+    results = await asyncio.gather(*[flight.do("key", call) for _ in range(3)], return_exceptions=True)
+
+    assert [type(result) for result in results] == [ValueError] * 3
+
+
+async def test_waiting_call_runs_itself_when_leader_is_cancelled():
+    flight, started = SingleFlight(), asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "own result"
+
+    leader = asyncio.create_task(flight.do("key", slow))
+    await started.wait()
+    follower = asyncio.create_task(flight.do("key", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == ("own result", LEADER)
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+async def test_recent_result_is_reused_for_ttl():
+    flight = SingleFlight()
+
+    async def call():
+        return object()
+
+    first, _ = await flight.do("key", call, ttl=0.05)
+    assert await flight.do("key", call, ttl=0.05) == (first, RECENT)
+    await asyncio.sleep(0.1)
+    assert (await flight.do("key", call, ttl=0.05))[1] == LEADER
+
+
+async def test_forget_drops_recent_and_running_results():
+    flight, started, release = SingleFlight(), asyncio.Event(), asyncio.Event()
+
+    async def slow():
+        started.set()
+        await release.wait()
+        return "before change"
+
+    async def call():
+        return "after change"
+
+    await flight.do("other", call, ttl=10)
+    running = asyncio.create_task(flight.do("key", slow, ttl=10))
+    await started.wait()
+    flight.forget(lambda key: key in ("key", "other"))
+    release.set()
+
+    assert await running == ("before change", LEADER)
+    assert await flight.do("key", call, ttl=10) == ("after change", LEADER)
+    assert await flight.do("other", call, ttl=10) == ("after change", LEADER)
+
+
+async def test_identical_repository_reads_run_one_query(db, create_products, unique, statements):
+    await create_products(1, 2)
+    statements.clear()
+
+    counts = await asyncio.gather(*[ProductRepository.count(name__prefix=unique) for _ in range(5)])
+
+    assert counts == [2] * 5
+    assert len([sql for sql in statements if "count(*)" in sql]) == 1
+
+
+async def test_recent_reads_are_not_reused_after_writes_or_when_disabled(
+    db, create_products, unique, statements, monkeypatch,
+):
+    await create_products(1)
+    monkeypatch.setattr(settings, "SINGLEFLIGHT_TTL", 10)
+    statements.clear()
+
+    await ProductRepository.count(name__prefix=unique)
+    await ProductRepository.count(name__prefix=unique)  # недавний результат
+    async with async_session_maker() as session:
+        session.info["writes"] = True
+        token = current_session.set(session)
+        try:
+            await ProductRepository.count(name__prefix=unique)
+        finally:
+            current_session.reset(token)
+    monkeypatch.setattr(settings, "SINGLEFLIGHT_ENABLED", False)
+    await ProductRepository.count(name__prefix=unique)
+
+    assert len([sql for sql in statements if "count(*)" in sql]) == 3
+
+
+async def test_recent_reads_are_dropped_after_repository_writes(db, create_products, unique, monkeypatch, cleanup):
+    await create_products(1)
+    monkeypatch.setattr(settings, "SINGLEFLIGHT_TTL", 10)
+
+    assert await ProductRepository.count(name__prefix=unique) == 1
+    await ProductRepository.create(name=f"{unique}-new", price=1)
+
+    assert await ProductRepository.count(name__prefix=unique) == 2
+
+
+async def test_coalesced_reads_get_own_records(db, create_products, unique):
+    await create_products(1, 2)
+
+    pages = await asyncio.gather(*[ProductRepository.get_page(10, name__prefix=unique) for _ in range(3)])
+
+    first, second, _ = pages
+    assert [item.id for item in first] == [item.id for item in second]
+    assert all(isinstance(item, ProductRepository.schema) for item in first)
+    assert not {id(item) for item in first} & {id(item) for item in second}
@@ -0,0 +1,66 @@
+import contextlib
+
+import pytest
+from sqlalchemy import text
+
+from app.core.database.database import current_session, get_async_session, on_commit, session_scope
+from app.modules.products.repository import ProductRepository
+
+pytestmark = pytest.mark.anyio
+
+request_scope = contextlib.asynccontextmanager(get_async_session)
+
+
+async def product_names(session, unique) -> list[str]:
+    return (await session.execute(
+        text("SELECT name FROM products WHERE name LIKE :pattern ORDER BY name"), {"pattern": f"{unique}%"}
+    )).scalars().all()
+
+
+async def test_repository_calls_share_request_session(db, session, cleanup, unique):
+    async with request_scope() as request_session:
+        created = await ProductRepository.create(name=unique, price=1)
+        async with session_scope() as scope_session:
+            assert scope_session is request_session
+        # Запись видна следующим вызовам в той же транзакции, но еще не зафиксирована
+        assert (await ProductRepository.get_one(id=created.id)).name == unique
+        assert await product_names(session, unique) == []
+
+    assert current_session.get() is None
+    assert await product_names(session, unique) == [unique]
+
+
+async def test_request_error_rolls_back_all_writes(db, session, cleanup, unique):
+    with pytest.raises(RuntimeError):
+        async with request_scope():
+            await ProductRepository.create(name=f"{unique}-1", price=1)
+            await ProductRepository.create(name=f"{unique}-2", price=2)
+            raise RuntimeError("ошибка обработчика")
+
+    assert await product_names(session, unique) == []
+
+
+async def test_on_commit_callbacks_run_after_commit_only(db, session, cleanup, unique):
+    calls = []
+
+    async def callback():
+        calls.append(await product_names(session, unique))
+
+    async with request_scope() as request_session:
+        await ProductRepository.create(name=unique, price=1)
+        on_commit(request_session, callback)
+        assert calls == []
+    assert calls == [[unique]]
+
+    calls.clear()
+    with pytest.raises(RuntimeError):
+        async with request_scope() as request_session:
+            on_commit(request_session, callback)
+            raise RuntimeError("ошибка обработчика")
+    assert calls == []
+
+
+async def test_scope_outside_request_commits_on_exit(db, session, cleanup, unique):
+    await ProductRepository.create(name=unique, price=1)
+
+    assert await product_names(session, unique) == [unique]
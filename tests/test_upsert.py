@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from app.modules.products.repository import ProductRepository
+
+pytestmark = pytest.mark.anyio
+
+
+async def product_prices(session, unique) -> dict[str, float]:
+    rows = await session.execute(
+        text("SELECT name, price FROM products WHERE name LIKE :pattern"), {"pattern": f"{unique}%"}
+    )
+    return dict(rows.all())
+
+
+async def test_concurrent_create_or_ignore_creates_one_record(session, cleanup, unique):
+    results = await asyncio.gather(*[ProductRepository.create_or_ignore(name=unique, price=price) for price in range(5)])
+
+    created = [item for item in results if item is not None]
+    assert len(created) == 1
+    assert await product_prices(session, unique) == {unique: created[0].price}
+
+
+async def test_upsert_creates_then_updates_in_one_statement(session, cleanup, unique, statements):
+    product, created = await ProductRepository.upsert(name=unique, price=1)
+    assert created and product.price == 1
+
+    statements.clear()
+    updated, created = await ProductRepository.upsert(name=unique, price=2)
+
+    assert not created and (updated.id, updated.price) == (product.id, 2)
+    assert len([sql for sql in statements if "products" in sql]) == 1
+    assert await product_prices(session, unique) == {unique: 2}
+
+
+async def test_add_existing_product_is_rejected(client, create_products, unique):
+    await create_products(1)
+
+    response = await client.post("/products/add", params={"name": f"{unique}-0", "price": 5})
+
+    assert response.status_code == 500
+    assert "Такой товар уже существует" in response.json()["detail"]
+
+
+async def test_bulk_create_or_ignore_returns_skipped_rows(session, create_products, unique):
+    await create_products(1)
+    rows = [{"name": f"{unique}-{name}", "price": 2} for name in ("0", "a", "a", "b")]
+
+    ignored = await ProductRepository.bulk_create_or_ignore(rows)
+
+    assert [row["name"] for row in ignored] == [f"{unique}-0", f"{unique}-a"]
+    assert set(await product_prices(session, unique)) == {f"{unique}-0", f"{unique}-a", f"{unique}-b"}
+
+
+async def test_batch_with_duplicates_is_rolled_back(client, session, create_products, unique):
+    await create_products(1)
+    items = [{"name": f"{unique}-new", "price": 1}, {"name": f"{unique}-0", "price": 1}]
+
+    response = await client.post("/products/add/batch", json=items)
+
+    assert response.status_code == 500
+    assert f"{unique}-0" in response.json()["detail"]
+    assert set(await product_prices(session, unique)) == {f"{unique}-0"}
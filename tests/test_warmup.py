@@ -0,0 +1,38 @@
+import httpx
+import pytest
+
+from app.core.config.config import settings
+from app.core.database.base_repository import registry
+from app.core.database.database import dispose_engine, get_engine
+from app.core.database.warmup import warm_up
+from app.main import app
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_warm_up_opens_connections_and_runs_repository_queries(db, statements):
+    await warm_up(2)
+
+    assert get_engine().pool.checkedin() == 2
+    for repository in registry:
+        table = repository.model.__tablename__
+        queries = [sql for sql in statements if f"FROM {table}" in sql]
+        # Каждый запрос выполнен на обоих соединениях
+        assert queries and len(queries) % 2 == 0, table
+    assert not [sql for sql in statements if sql.lstrip().startswith(("INSERT", "UPDATE", "DELETE"))]
+
+
+async def test_worker_is_ready_after_warm_up(db, monkeypatch):
+    monkeypatch.setattr(settings, "DB_WARMUP_CONNECTIONS", 1)
+    await dispose_engine()  # движок создает lifespan приложения
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url=f"http://test{settings.API_V1_STR}") as client:
+        assert (await client.get("/system/ready")).status_code == 503
+
+        async with app.router.lifespan_context(app):
+            assert get_engine().pool.checkedin() == 1
+            response = await client.get("/system/ready")
+            assert response.status_code == 200
+            assert response.json() == {"status": "ready"}
+
+        assert (await client.get("/system/ready")).status_code == 503